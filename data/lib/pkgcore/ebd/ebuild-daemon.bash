@@ -293,15 +293,12 @@ __ebd_process_metadata() {
 		declare -r PKGCORE_QA_SUPPRESSED=false
 		# Wipe __mode; it bleeds from our parent.
 		unset -v __mode
-		local __data
-		local __ret
-		__ebd_read_size "$1" __data
+		local __env
 		local IFS=$'\0'
-		eval "$__data"
-		__ret=$?
-		unset -v __data
-		[[ ${__ret} -ne 0 ]] && exit 1
-		unset -v __ret
+		for __env in "${@:2}"; do
+			eval "${__env}" || exit 1
+		done
+		unset -v __env
 		local IFS=$' \t\n'
 
 		if [[ -n ${PKGCORE_METADATA_PATH} ]]; then
@@ -314,7 +311,7 @@ __ebd_process_metadata() {
 			die "external commands disallowed during metadata regen: '${*}'"
 		}
 
-		__execute_phases "${2:-depend}" && exit 0
+		__execute_phases "${1:-depend}" && exit 0
 		__ebd_process_sandbox_results
 		exit 1
 	)
@@ -328,7 +325,7 @@ __make_preloaded_eclass_func() {
 }
 
 __ebd_main_loop() {
-	PKGCORE_BLACKLIST_VARS+=( __mode com is_depends phases line cont )
+	PKGCORE_BLACKLIST_VARS+=( __mode com is_depends phases line cont __data __base __envs )
 	SANDBOX_ON=1
 	while :; do
 		local com=''
@@ -349,13 +346,14 @@ __ebd_main_loop() {
 			shutdown_daemon)
 				break
 				;;
-			preload_eclass\ *)
+			preload_eclass\ *|preload_verified_eclass\ *)
+				# verified eclasses passed syntax checks in the past, skip them
 				success="succeeded"
-				com=${com#preload_eclass }
-				for e in ${com}; do
+				line=${com#preload_*eclass }
+				for e in ${line}; do
 					x=${e##*/}
 					x=${x%.eclass}
-					if ! $(type -P bash) -n "${e}"; then
+					if [[ ${com} == preload_eclass\ * ]] && ! $(type -P bash) -n "${e}"; then
 						echo "errors detected in '${e}'" >&2
 						success='failed'
 						break
@@ -365,6 +363,21 @@ __ebd_main_loop() {
 				__ebd_write_line "preload_eclass ${success}"
 				unset -v e x success
 				;;
+			fork_processor\ *)
+				# fork a processor sharing our functions and preloaded eclasses,
+				# communicating over the given fifos instead of our coms fds
+				line=${com#fork_processor }
+				(
+					addwrite "${line%% *}"
+					addwrite "${line#* }"
+					eval "exec ${PKGCORE_EBD_READ_FD}<\"\${line%% *}\" ${PKGCORE_EBD_WRITE_FD}>\"\${line#* }\""
+					trap __ebd_sigint_handler SIGINT
+					trap __ebd_sigterm_handler SIGTERM
+					__ebd_main_loop
+					exit 0
+				) &
+				__ebd_write_line "forked $!"
+				;;
 			clear_preloaded_eclasses)
 				unset -v PKGCORE_PRELOADED_ECLASSES
 				declare -A PKGCORE_PRELOADED_ECLASSES
@@ -379,15 +392,41 @@ __ebd_main_loop() {
 				local __mode="depend"
 				local error_output
 				[[ ${com} == gen_ebuild_env* ]] && __mode="generate_env"
+				local __data
 				line=${com#* }
+				__ebd_read_size "${line}" __data
 				# capture sourcing stderr output
-				error_output=$(__ebd_process_metadata "${line}" "${__mode}" 2>&1 1>/dev/null)
+				error_output=$(__ebd_process_metadata "${__mode}" "${__data}" 2>&1 1>/dev/null)
 				if [[ $? -eq 0 ]]; then
 					__ebd_write_line "phases succeeded"
 				else
 					[[ -n ${error_output} ]] || error_output="ebd::${com% *} failed"
 					__ebd_write_line "phases failed ${error_output}"
 				fi
+				unset -v __data
+				;;
+			gen_metadata_batch\ *)
+				# source multiple ebuilds sharing a base env, streaming back the
+				# keys of each; all envs are read upfront so inherit requests
+				# don't interleave with them
+				local __base __data error_output
+				local -a __envs=()
+				line=${com#gen_metadata_batch }
+				__ebd_read_size "${line#* }" __base
+				while (( ${#__envs[@]} < ${line%% *} )); do
+					__ebd_read_line __data
+					__ebd_read_size "${__data}" __data
+					__envs+=( "${__data}" )
+				done
+				for __data in "${__envs[@]}"; do
+					error_output=$(__ebd_process_metadata depend "${__base}" "${__data}" 2>&1 1>/dev/null)
+					if [[ $? -eq 0 ]]; then
+						__ebd_write_line "phases succeeded"
+					else
+						__ebd_write_line "phases failed ${error_output:-ebd::gen_metadata_batch failed}"
+					fi
+				done
+				unset -v __base __data __envs
 				;;
 			alive)
 				__ebd_write_line "yep!"
@@ -112,7 +112,7 @@ class PackagesCacheV0(cache.bulk):
 
     def __init__(self, location, *args, **kwds):
         self._location = location
-        vkeys = {"CPV"}
+        vkeys = {"CPV", "mtime"}
         vkeys.update(self._deserialized_defaults)
         vkeys.update(x.upper() for x in self._stored_chfs)
         kwds["auxdbkeys"] = vkeys
@@ -202,7 +202,7 @@ class PackagesCacheV0(cache.bulk):
             if key != "size":
                 value = "%x" % (value,)
             d[key.upper()] = value
-        d["MTIME"] = str(os.stat(pkg.path).st_mtime)
+        d["MTIME"] = str(int(os.stat(pkg.path).st_mtime))
         return d
 
     def _write_data(self):
@@ -212,7 +212,7 @@ class PackagesCacheV0(cache.bulk):
                 handler = AtomicWriteFile(self._location)
                 self._serialize_to_handle(list(self.data.items()), handler)
                 handler.close()
-            except PermissionError as e:
+            except EnvironmentError as e:
                 logger.error(f"failed writing binpkg cache to {self._location!r}: {e}")
         finally:
             if handler is not None:
@@ -249,11 +249,29 @@ class PackagesCacheV0(cache.bulk):
                     handler.write(f"{write_key}:{spacer}{value}\n")
             handler.write("\n")
 
+    @staticmethod
+    def is_fresh(entry, path):
+        """Determine if a cache entry matches the size and mtime of its binpkg.
+
+        :param entry: cache entry for the binpkg
+        :param path: on disk location of the binpkg
+        """
+        try:
+            st = os.stat(path)
+            return (
+                # indexes written by older versions stored float mtimes
+                int(float(entry["mtime"])) == int(st.st_mtime)
+                and int(entry["SIZE"]) == st.st_size
+            )
+        except (KeyError, ValueError, OSError):
+            return False
+
     def update_from_xpak(self, pkg, xpak):
         # invert the lookups here; if you do .items() on an xpak,
         # it'll load up the contents in full.
         new_dict = {k: xpak[k] for k in self._known_keys if k in xpak}
         new_dict["_chf_"] = xpak._chf_
+        new_dict["mtime"] = str(xpak.mtime)
         chfs = [x for x in self._stored_chfs if x != "mtime"]
         for key, value in zip(chfs, get_chksums(pkg.path, *chfs)):
             if key != "size":
@@ -263,6 +281,13 @@ class PackagesCacheV0(cache.bulk):
         return new_dict
 
     def update_from_repo(self, repo):
+        """Sync the cache with the binpkgs of a repo.
+
+        Entries of unchanged binpkgs are kept, those of modified binpkgs are
+        regenerated from their xpak, and those of removed binpkgs are dropped.
+        """
+        from .repository import StackedXpakDict
+
         # try to collapse certain keys down to the profile preamble
         targets = repo.match(packages.AlwaysTrue, sorter=sorted)
 
@@ -271,6 +296,17 @@ class PackagesCacheV0(cache.bulk):
             open(self._location, "wb").close()
             return
 
+        for pkg in targets:
+            try:
+                fresh = self.is_fresh(self[pkg.cpvstr], pkg.path)
+            except KeyError:
+                fresh = False
+            if not fresh:
+                self.update_from_xpak(pkg, StackedXpakDict(repo, pkg))
+        for cpv in set(self.data).difference(x.cpvstr for x in targets):
+            del self[cpv]
+        self.commit()
+
 
 class PackagesCacheV1(PackagesCacheV0):
     """Cache backend for writing binpkg Packages caches in format version 1.
@@ -18,6 +18,7 @@ from snakeoil.compression import compress_data
 from snakeoil.klass import steal_docs
 from snakeoil.osutils import ensure_dirs, unlink_if_exists
 
+from .. import operations as operations_mod
 from ..fs import tar
 from ..log import logger
 from ..operations import repo as repo_interfaces
@@ -86,7 +87,12 @@ class install(repo_interfaces.install):
             )
         try:
             start(f"generating tarball: {tmp_path}")
-            tar.write_set(pkg.contents, tmp_path, compressor="bzip2", parallelize=True)
+            tar.write_set(
+                pkg.contents,
+                tmp_path,
+                compressor=self.repo.compression,
+                parallelize=True,
+            )
             end("tarball created", True)
             start("writing Xpak")
             # ok... got a tarball.  now add xpak.
@@ -136,3 +142,9 @@ class operations(repo_interfaces.operations):
 
     def _cmd_implementation_replace(self, *args):
         return replace(self.repo, *args)
+
+    @operations_mod.is_standalone
+    def _cmd_api_regen_cache(self, observer=None, **kwargs):
+        """Sync the Packages index with the repo's binpkgs."""
+        self.repo.cache.update_from_repo(self.repo)
+        return 0
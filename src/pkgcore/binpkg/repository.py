@@ -6,6 +6,7 @@ __all__ = ("tree", "ConfiguredTree", "force_unpacking")
 
 import errno
 import os
+import weakref
 from os.path import join as pjoin
 
 from snakeoil import chksum, compression
@@ -20,7 +21,7 @@ from ..ebuild.cpv import VersionedCPV
 from ..fs.contents import contentsSet, offset_rewriter
 from ..fs.livefs import scan
 from ..fs.ops import merge_contents
-from ..fs.tar import generate_contents
+from ..fs.tar import generate_contents, unpack_contents
 from ..merge import engine, triggers
 from ..package import base as pkg_base
 from ..repository import errors, prototype, wrapper
@@ -45,7 +46,13 @@ class force_unpacking(triggers.base):
         merge_cset = cset
         if engine.offset != "/":
             merge_cset = cset.change_offset(engine.offset, "/")
-        merge_contents(merge_cset, offset=op.env["D"])
+        threads = int(os.environ.get("PKGCORE_TRIGGER_PARALLELISM", engine.parallelism))
+        # merge dirs and the like first, then stream the files out of the binpkg
+        files = contentsSet(merge_cset.iterfiles())
+        merge_contents(merge_cset.difference(files), offset=op.env["D"])
+        unpacked = unpack_contents(files, op.env["D"], threads=threads)
+        if files := files.difference(unpacked):
+            merge_contents(files, offset=op.env["D"], threads=threads)
 
         # ok.  they're on disk.
         # now to avoid going back to the binpkg, we rewrite
@@ -124,7 +131,7 @@ class StackedXpakDict(DictMixin):
         if key in self._wipes:
             raise KeyError(self, key)
         if key == "contents":
-            data = generate_contents(self._parent._get_path(self._pkg))
+            data = generate_contents(self._parent._get_path(self._pkg), None)
             object.__setattr__(self, "contents", data)
         elif key == "environment":
             data = self.xpak.get("environment.bz2")
@@ -203,14 +210,20 @@ class tree(prototype.tree):
     cache_name = "Packages"
 
     pkgcore_config_type = ConfigHint(
-        types={"location": "str", "repo_id": "str"}, typename="repo"
+        types={"location": "str", "repo_id": "str", "compression": "str"},
+        typename="repo",
     )
 
-    def __init__(self, location, repo_id=None, cache_version="0"):
+    # compressors binpkgs can be created with, see :obj:`pkgcore.fs.tar`
+    compressors = ("bzip2", "xz", "zstd")
+
+    def __init__(self, location, repo_id=None, cache_version="0", compression="bzip2"):
         """
         :param location: root of the tbz2 repository
         :keyword repo_id: unique repository id to use; else defaults to
             the location
+        :keyword compression: compressor used for binpkgs added to the repo,
+            existing binpkgs using any supported compressor can be read
         """
         super().__init__()
         self.base = self.location = location
@@ -218,6 +231,12 @@ class tree(prototype.tree):
             repo_id = location
         self.repo_id = repo_id
         self._versions_tmp_cache = {}
+        if compression not in self.compressors:
+            raise errors.InitializationError(
+                f"unsupported binpkg compression {compression!r}, "
+                f"supported: {', '.join(self.compressors)}"
+            )
+        self.compression = compression
 
         # XXX rewrite this when snakeoil.osutils grows an access equivalent.
         if not os.access(self.base, os.X_OK | os.R_OK):
@@ -232,6 +251,9 @@ class tree(prototype.tree):
         self.cache = remote.get_cache_kls(cache_version)(
             pjoin(self.base, self.cache_name)
         )
+        # entries refreshed from stale binpkgs are written out in batches by
+        # the cache, with the remainder written once the repo is released
+        weakref.finalize(self, self.cache.commit)
         self.package_class = BinPkg(self)
 
     def configure(self, *args):
@@ -282,12 +304,14 @@ class tree(prototype.tree):
     _get_ebuild_path = _get_path
 
     def _get_metadata(self, pkg, force=False):
+        # the binpkg itself is only opened for keys missing from the Packages
+        # index, e.g. the environment and contents used when installing
         xpak = StackedXpakDict(self, pkg)
         try:
             if force:
                 raise KeyError
             cache_data = self.cache[pkg.cpvstr]
-            if int(cache_data["mtime"]) != int(xpak.mtime):
+            if not self.cache.is_fresh(cache_data, self._get_path(pkg)):
                 raise KeyError
         except KeyError:
             cache_data = self.cache.update_from_xpak(pkg, xpak)
@@ -302,6 +326,9 @@ class tree(prototype.tree):
 
     def notify_remove_package(self, pkg):
         prototype.tree.notify_remove_package(self, pkg)
+        if pkg.cpvstr in self.cache:
+            del self.cache[pkg.cpvstr]
+            self.cache.commit()
         try:
             os.rmdir(pjoin(self.base, pkg.category))
         except OSError as oe:
@@ -27,10 +27,13 @@ class base:
         or queues up updates.
     :ivar cleanse_keys: Boolean controlling whether the template should drop
         empty keys for storing.
+    :ivar batched_lookups: Boolean signifying whether :obj:`_get_many` is
+        overridden to serve multiple entries per read, worth prefetching for.
     """
 
     autocommits = False
     cleanse_keys = False
+    batched_lookups = False
     default_sync_rate = 1
     chf_type = "mtime"
     eclass_chf_types = ("mtime",)
@@ -136,6 +139,32 @@ class base:
         """
         raise NotImplementedError
 
+    def get_many(self, cpvs):
+        """Yield (cpv, values) pairs for all cpvs found in the cache.
+
+        Intended for prefetching, thus missing and corrupt entries are
+        silently skipped; accessing them directly reports any errors.
+        """
+        self._sync_if_needed()
+        for cpv, d in self._get_many(cpvs):
+            if "_eclasses_" in d:
+                try:
+                    d["_eclasses_"] = self.reconstruct_eclasses(cpv, d["_eclasses_"])
+                except errors.CacheCorruption:
+                    continue
+            yield cpv, d
+
+    def _get_many(self, cpvs):
+        """get the values of multiple cpvs, skipping missing or corrupt entries.
+
+        override this in derived classes that can batch lookups.
+        """
+        for cpv in cpvs:
+            try:
+                yield cpv, self._getitem(cpv)
+            except (KeyError, errors.CacheError):
+                continue
+
     def __setitem__(self, cpv, values):
         """set a cpv to values
 
@@ -126,7 +126,8 @@ class database(fs_template.FsBased):
             except EnvironmentError as e:
                 raise KeyError(d, f"access failure: {e}") from e
             for l in subdirs:
-                if l.endswith(".cpickle"):
+                # skip in-progress updates and state files stored alongside the cache
+                if l.endswith(".cpickle") or l.startswith("."):
                     continue
                 p = pjoin(d, l)
                 try:
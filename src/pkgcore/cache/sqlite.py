@@ -0,0 +1,200 @@
+"""
+single file sqlite backend
+
+Stores every cache entry of a repo in one indexed database file instead of a
+file per cpv, avoiding the per-entry open/read/close syscalls the flat_hash
+backends incur on cold page caches.
+"""
+
+__all__ = ("database", "md5_cache")
+
+import os
+import sqlite3
+import threading
+from os.path import join as pjoin
+
+from ..config.hint import ConfigHint
+from . import errors, fs_template
+
+
+class database(fs_template.FsBased):
+    """Stores cache entries as key=value blobs in a single sqlite database."""
+
+    pkgcore_config_type = ConfigHint(
+        types={
+            "readonly": "bool",
+            "location": "str",
+            "label": "str",
+            "auxdbkeys": "list",
+        },
+        required=["location"],
+        positional=["location"],
+        typename="cache",
+    )
+
+    autocommits = False
+    batched_lookups = True
+    # commit every write unless callers batch them via set_sync_rate()
+    default_sync_rate = 1
+    eclass_chf_types = ("eclassdir", "mtime")
+
+    db_filename = "metadata.sqlite"
+    schema_version = 1
+    # allow sqlite to mmap up to 256MB of the db rather than read() pages in
+    mmap_size = 256 * 1024 * 1024
+    # max number of entries pulled per query for batched lookups
+    batch_size = 500
+
+    def __init__(self, *args, **config):
+        super().__init__(*args, **config)
+        self._db_path = pjoin(self.location, self.db_filename)
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+        self._inherited_conns = []
+
+    def _connect(self):
+        """Open the db, creating or upgrading the schema if writable.
+
+        :return: sqlite3 connection, or None if readonly and no usable db exists
+        """
+        exists = os.path.exists(self._db_path)
+        try:
+            if self.readonly:
+                if not exists:
+                    return None
+                conn = sqlite3.connect(
+                    f"file:{self._db_path}?mode=ro",
+                    uri=True,
+                    check_same_thread=False,
+                )
+            else:
+                if not exists and not self._ensure_dirs():
+                    raise errors.InitializationError(
+                        self.__class__, f"failed creating {self.location!r}"
+                    )
+                conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.schema_version:
+                if self.readonly:
+                    if version == 0:
+                        return None
+                    raise errors.InitializationError(
+                        self.__class__,
+                        f"{self._db_path!r}: unsupported schema version {version}",
+                    )
+                conn.executescript(
+                    "DROP TABLE IF EXISTS metadata;"
+                    "CREATE TABLE metadata "
+                    "(cpv TEXT PRIMARY KEY NOT NULL, data TEXT NOT NULL) WITHOUT ROWID;"
+                    f"PRAGMA user_version={self.schema_version};"
+                )
+                if not exists:
+                    self._ensure_access(self._db_path)
+        except sqlite3.Error as e:
+            raise errors.InitializationError(self.__class__, e) from e
+        return conn
+
+    def _execute(self, key, query, args=()):
+        """Run a query serialized against other threads, returning all rows."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Connections can't be used across fork() and closing them
+                # would drop the parent's locks, so keep them referenced.
+                if self._conn is not None:
+                    self._inherited_conns.append(self._conn)
+                self._conn = None
+            if self._conn is None:
+                self._conn = self._connect()
+                self._pid = os.getpid()
+            conn = self._conn
+            if conn is None:
+                return []
+            try:
+                return conn.execute(query, args).fetchall()
+            except sqlite3.Error as e:
+                raise errors.CacheCorruption(key, e) from e
+
+    def _getitem(self, cpv):
+        rows = self._execute(cpv, "SELECT data FROM metadata WHERE cpv=?", (cpv,))
+        if not rows:
+            raise KeyError(cpv)
+        try:
+            return self._parse_data(rows[0][0].split("\n"))
+        except (KeyError, ValueError) as e:
+            raise errors.CacheCorruption(cpv, e) from e
+
+    def _get_many(self, cpvs):
+        cpvs = list(cpvs)
+        # stay well below sqlite's limit on host parameters per query
+        for i in range(0, len(cpvs), self.batch_size):
+            chunk = cpvs[i : i + self.batch_size]
+            try:
+                rows = self._execute(
+                    chunk,
+                    "SELECT cpv, data FROM metadata WHERE cpv IN (%s)"
+                    % ", ".join("?" * len(chunk)),
+                    chunk,
+                )
+            except errors.CacheCorruption:
+                continue
+            for cpv, data in rows:
+                try:
+                    yield cpv, self._parse_data(data.split("\n"))
+                except (KeyError, ValueError):
+                    continue
+
+    def _parse_data(self, data):
+        d = self._cdict_kls()
+        known = self._known_keys
+        for x in data:
+            k, v = x.split("=", 1)
+            if k in known:
+                d[k] = v
+        d[self._chf_key] = self._chf_deserializer(d[self._chf_key])
+        return d
+
+    def _setitem(self, cpv, values):
+        data = "\n".join(f"{k}={v}" for k, v in sorted(values.items()))
+        self._execute(
+            cpv,
+            "INSERT OR REPLACE INTO metadata (cpv, data) VALUES (?, ?)",
+            (cpv, data),
+        )
+
+    def _delitem(self, cpv):
+        with self._lock:
+            if cpv not in self:
+                raise KeyError(cpv)
+            self._execute(cpv, "DELETE FROM metadata WHERE cpv=?", (cpv,))
+
+    def __contains__(self, cpv):
+        return bool(self._execute(cpv, "SELECT 1 FROM metadata WHERE cpv=?", (cpv,)))
+
+    def keys(self):
+        # materialize the list so callers can mutate the cache while iterating
+        rows = self._execute(self._db_path, "SELECT cpv FROM metadata ORDER BY cpv")
+        return (row[0] for row in rows)
+
+    def commit(self, force=False):
+        with self._lock:
+            conn = self._conn
+            if conn is None or self._pid != os.getpid() or not conn.in_transaction:
+                return
+            try:
+                conn.commit()
+            except sqlite3.Error as e:
+                raise errors.GeneralCacheCorruption(e) from e
+
+
+class md5_cache(database):
+    chf_type = "md5"
+    eclass_chf_types = ("md5",)
+    chf_base = 16
+
+    db_filename = "md5-cache.sqlite"
+
+    def __init__(self, location, **config):
+        location = pjoin(location, "metadata")
+        super().__init__(location, **config)
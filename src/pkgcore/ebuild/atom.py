@@ -55,6 +55,7 @@ class atom(boolean.AndRestriction):
         "repo_id",
         "_cpv",
         "_restrictions",
+        "_matcher",
     )
 
     type = restriction.package_type
@@ -358,6 +359,44 @@ class atom(boolean.AndRestriction):
     def is_simple(self) -> bool:
         return len(self.restrictions) == 2
 
+    def compile_match(self):
+        """Return a matcher for the atom, cached across calls.
+
+        Category and package checks are folded into direct string
+        comparisons, with the remaining restrictions compiled individually.
+        """
+        return self._compiled_match
+
+    @klass.jit_attr_named("_matcher")
+    def _compiled_match(self):
+        if self.__class__.match is not boolean.AndRestriction.match:
+            return self.match
+        category, package = self.category, self.package
+        matchers = tuple(
+            restriction.compile_match(r)
+            for r in self.restrictions
+            if not isinstance(r, (restricts.CategoryDep, restricts.PackageDep))
+        )
+        fallback = self.match
+
+        def match(pkg):
+            try:
+                pkg_package = pkg.package
+                pkg_category = pkg.category
+            except AttributeError:
+                return fallback(pkg)
+            if pkg_package != package or pkg_category != category:
+                # non-string attributes are compared via their string form
+                if pkg_package.__class__ is str and pkg_category.__class__ is str:
+                    return False
+                return fallback(pkg)
+            for matcher in matchers:
+                if not matcher(pkg):
+                    return False
+            return True
+
+        return match
+
     @klass.jit_attr
     def restrictions(self):
         # ordering here matters; against 24702 ebuilds for
@@ -446,7 +485,7 @@ class atom(boolean.AndRestriction):
         if c:
             return c
 
-        c = cpv.ver_cmp(self.version, self.revision, other.version, other.revision)
+        c = self._cpv._version_cmp(other._cpv)
         if c:
             return c
 
@@ -1,6 +1,8 @@
 """gentoo ebuild specific base package class"""
 
+import sys
 from collections import UserString
+from functools import lru_cache
 
 from snakeoil.compatibility import cmp
 from snakeoil.delayed import regexp
@@ -122,6 +124,46 @@ class Revision(UserString):
         return self.data >= other
 
 
+_revisions = {}
+
+
+def _get_revision(rev: str) -> Revision:
+    """Return a shared :obj:`Revision` instance for a given revision string."""
+    try:
+        return _revisions[rev]
+    except KeyError:
+        return _revisions.setdefault(rev, Revision(rev))
+
+
+@lru_cache(maxsize=65536)
+def version_key(version: str) -> tuple:
+    """Return a sort key for a version string ordering the same as :obj:`ver_cmp`.
+
+    Revisions aren't included and must be compared separately.
+    """
+    parts = version.split("_")
+    components = parts[0].split(".")
+    if components[-1][-1].isalpha():
+        letter = ord(components[-1][-1])
+        components[-1] = components[-1][:-1]
+    else:
+        letter = -1
+
+    # components with a leading zero are compared as floats so that 1.1 > 1.02
+    comp_key = tuple(
+        (1, int(x)) if x[0] != "0" else (0, x.rstrip("0")) for x in components
+    )
+
+    suffixes = []
+    for suffix in parts[1:]:
+        match = suffix_regexp.match(suffix)
+        suffixes.append((suffix_value[match.group(1)], int("0" + match.group(2))))
+    # sentinel sorting after pre-release suffixes and before patch releases
+    suffixes.append((0,))
+
+    return comp_key, letter, tuple(suffixes)
+
+
 def ver_cmp(ver1: str, rev1: str, ver2: str, rev2: str) -> int:
     # If the versions are the same, comparing revisions will suffice.
     if ver1 == ver2:
@@ -247,6 +289,7 @@ class CPV(base.base):
     :ivar key: strkey (cat/pkg)
     :ivar version: str version
     :ivar revision: str revision
+    :ivar sort_key: tuple sort key
     :ivar versioned_atom: atom matching this exact version
     :ivar unversioned_atom: atom matching all versions of this package
     """
@@ -259,6 +302,7 @@ class CPV(base.base):
         "version",
         "revision",
         "fullver",
+        "_vkey",
     )
 
     def __init__(self, *args, versioned=None):
@@ -300,6 +344,7 @@ class CPV(base.base):
             raise InvalidCPV(cpvstr, "no package or version components")
         if not isvalid_cat_re.match(category):
             raise InvalidCPV(cpvstr, "invalid category name")
+        category = sys.intern(category)
         sf = object.__setattr__
         sf(self, "category", category)
         sf(self, "cpvstr", cpvstr)
@@ -314,7 +359,7 @@ class CPV(base.base):
                     raise InvalidCPV(
                         cpvstr, "missing package name, version, and/or revision"
                     )
-                rev = Revision(pkg_chunks.pop(-1)[1:])
+                rev = _get_revision(pkg_chunks.pop(-1)[1:])
                 if rev == 0:
                     # reset stored cpvstr to drop -r0+
                     sf(self, "cpvstr", f"{category}/{'-'.join(pkg_chunks)}")
@@ -323,11 +368,12 @@ class CPV(base.base):
                     sf(self, "cpvstr", f"{category}/{'-'.join(pkg_chunks)}-r{int(rev)}")
                 sf(self, "revision", rev)
             else:
-                sf(self, "revision", Revision(""))
+                sf(self, "revision", _get_revision(""))
 
             if not isvalid_version_re.match(pkg_chunks[-1]):
                 raise InvalidCPV(cpvstr, f"invalid version '{pkg_chunks[-1]}'")
-            sf(self, "version", pkg_chunks.pop(-1))
+            sf(self, "version", sys.intern(pkg_chunks.pop(-1)))
+            sf(self, "_vkey", (version_key(self.version), self.revision._revint))
             if self.revision:
                 sf(self, "fullver", f"{self.version}-r{self.revision}")
             else:
@@ -335,20 +381,29 @@ class CPV(base.base):
 
             if not isvalid_pkg_name(pkg_chunks):
                 raise InvalidCPV(cpvstr, "invalid package name")
-            sf(self, "package", "-".join(pkg_chunks))
-            sf(self, "key", f"{category}/{self.package}")
+            sf(self, "package", sys.intern("-".join(pkg_chunks)))
+            sf(self, "key", sys.intern(f"{category}/{self.package}"))
         else:
             if not isvalid_pkg_name(pkg_chunks):
                 raise InvalidCPV(cpvstr, "invalid package name")
             sf(self, "revision", None)
             sf(self, "fullver", None)
             sf(self, "version", None)
-            sf(self, "key", cpvstr)
-            sf(self, "package", "-".join(pkg_chunks))
+            sf(self, "_vkey", None)
+            sf(self, "key", sys.intern(cpvstr))
+            sf(self, "package", sys.intern("-".join(pkg_chunks)))
 
     def __hash__(self):
         return hash(self.cpvstr)
 
+    def _version_cmp(self, other):
+        """Compare versions and revisions, using precomputed sort keys if possible."""
+        key = self._vkey
+        other_key = getattr(other, "_vkey", None)
+        if key is not None and other_key is not None:
+            return cmp(key, other_key)
+        return ver_cmp(self.version, self.revision, other.version, other.revision)
+
     def __repr__(self):
         return f"<{self.__class__.__name__} cpvstr={getattr(self, 'cpvstr', None)} @{id(self):#8x}>"
 
@@ -360,10 +415,7 @@ class CPV(base.base):
             if self.cpvstr == other.cpvstr:
                 return True
             if self.category == other.category and self.package == other.package:
-                return (
-                    ver_cmp(self.version, self.revision, other.version, other.revision)
-                    == 0
-                )
+                return self._version_cmp(other) == 0
         except AttributeError:
             pass
         return False
@@ -375,12 +427,7 @@ class CPV(base.base):
         try:
             if self.category == other.category:
                 if self.package == other.package:
-                    return (
-                        ver_cmp(
-                            self.version, self.revision, other.version, other.revision
-                        )
-                        < 0
-                    )
+                    return self._version_cmp(other) < 0
                 return self.package < other.package
             return self.category < other.category
         except AttributeError:
@@ -393,12 +440,7 @@ class CPV(base.base):
         try:
             if self.category == other.category:
                 if self.package == other.package:
-                    return (
-                        ver_cmp(
-                            self.version, self.revision, other.version, other.revision
-                        )
-                        <= 0
-                    )
+                    return self._version_cmp(other) <= 0
                 return self.package < other.package
             return self.category < other.category
         except AttributeError:
@@ -411,12 +453,7 @@ class CPV(base.base):
         try:
             if self.category == other.category:
                 if self.package == other.package:
-                    return (
-                        ver_cmp(
-                            self.version, self.revision, other.version, other.revision
-                        )
-                        > 0
-                    )
+                    return self._version_cmp(other) > 0
                 return self.package > other.package
             return self.category > other.category
         except AttributeError:
@@ -429,12 +466,7 @@ class CPV(base.base):
         try:
             if self.category == other.category:
                 if self.package == other.package:
-                    return (
-                        ver_cmp(
-                            self.version, self.revision, other.version, other.revision
-                        )
-                        >= 0
-                    )
+                    return self._version_cmp(other) >= 0
                 return self.package > other.package
             return self.category > other.category
         except AttributeError:
@@ -443,6 +475,19 @@ class CPV(base.base):
                 f"{self.__class__.__name__!r} and {other.__class__.__name__!r}"
             )
 
+    @property
+    def sort_key(self):
+        """Key ordering CPVs the same as their rich comparisons.
+
+        Unversioned CPVs sort before versioned CPVs of the same package. The
+        key only consists of tuples, strings, and integers, so it can be
+        stored in cache indexes as long as nested lists are converted back
+        to tuples when loaded.
+        """
+        if self._vkey is None:
+            return (self.category, self.package)
+        return (self.category, self.package, self._vkey)
+
     @property
     def versioned_atom(self):
         if self.version is not None:
@@ -41,6 +41,7 @@ from ..repository.util import RepositoryGroup
 from ..restrictions import packages, values
 from ..restrictions.delegated import delegate
 from ..util.parserestrict import ParseError, parse_match
+from . import processor
 from . import repository as ebuild_repo
 from .atom import atom as _atom
 from .eapi import get_latest_PMS_eapi
@@ -859,6 +860,20 @@ class domain(config_domain):
                 )
         return os.path.normpath(path)
 
+    @klass.jit_attr
+    def repo_threads(self):
+        """Number of threads used to match against repo groups concurrently.
+
+        Set via PKGCORE_REPO_THREADS, matching against one repo after another
+        by default.
+        """
+        try:
+            threads = int(self.get_settings_envvar("PKGCORE_REPO_THREADS", 1))
+        except ValueError as e:
+            logger.warning(f"invalid repo threads setting: {e}")
+            return 1
+        return max(threads, 1)
+
     @property
     def pm_tmpdir(self):
         """Temporary directory for the package manager."""
@@ -896,7 +911,40 @@ class domain(config_domain):
                 if exc is None:
                     exc = e
                 logger.warning(f"skipping {r.name!r} repo: {exc}")
-        return RepositoryGroup(repos)
+        self._warm_ebuild_processors(repos)
+        return RepositoryGroup(repos, threads=self.repo_threads)
+
+    def _warm_ebuild_processors(self, repos):
+        """Spawn idle ebuild processors in the background if configured to.
+
+        Processors are preloaded with eclasses from the first ebuild repo,
+        limited to those listed in PKGCORE_EBD_POOL_ECLASSES if set.
+        """
+        try:
+            count = int(self.get_settings_envvar("PKGCORE_EBD_POOL_SIZE", 0))
+            timeout = int(self.get_settings_envvar("PKGCORE_EBD_POOL_TIMEOUT", 300))
+        except ValueError as e:
+            logger.warning(f"invalid ebuild processor pool setting: {e}")
+            return
+        if count <= 0:
+            return
+        eclass_cache = next(
+            (
+                r.eclass_cache
+                for r in repos
+                if isinstance(r, ebuild_repo.UnconfiguredTree)
+            ),
+            None,
+        )
+        eclasses = self.get_settings_envvar("PKGCORE_EBD_POOL_ECLASSES")
+        if eclasses is not None:
+            eclasses = eclasses.split()
+        processor.warm_ebuild_processors(
+            count,
+            eclass_cache=eclass_cache,
+            eclasses=eclasses,
+            timeout=timeout if timeout > 0 else None,
+        )
 
     @klass.jit_attr_named("_jit_repo_installed_repos_raw", uncached_val=None)
     def installed_repos_raw(self):
@@ -904,12 +952,15 @@ class domain(config_domain):
         repos = [r.instantiate() for r in self.__vdb]
         if self.profile.provides_repo is not None:
             repos.append(self.profile.provides_repo)
-        return RepositoryGroup(repos)
+        return RepositoryGroup(repos, threads=self.repo_threads)
 
     @klass.jit_attr_named("_jit_repo_repos_raw", uncached_val=None)
     def repos_raw(self):
         """Group of all repos without filtering."""
-        return RepositoryGroup(chain(self.source_repos_raw, self.installed_repos_raw))
+        return RepositoryGroup(
+            (chain(self.source_repos_raw, self.installed_repos_raw)),
+            threads=self.repo_threads,
+        )
 
     @klass.jit_attr_named("_jit_repo_source_repos", uncached_val=None)
     def source_repos(self):
@@ -920,7 +971,7 @@ class domain(config_domain):
                 repos.append(self._wrap_repo(repo, filtered=True))
             except repo_errors.RepoError as e:
                 logger.warning(f"skipping {repo.repo_id!r} repo: {e}")
-        return RepositoryGroup(repos)
+        return RepositoryGroup(repos, threads=self.repo_threads)
 
     @klass.jit_attr_named("_jit_repo_installed_repos", uncached_val=None)
     def installed_repos(self):
@@ -931,71 +982,90 @@ class domain(config_domain):
                 repos.append(self._wrap_repo(repo, filtered=False))
             except repo_errors.RepoError as e:
                 logger.warning(f"skipping {repo.repo_id!r} repo: {e}")
-        return RepositoryGroup(repos)
+        return RepositoryGroup(repos, threads=self.repo_threads)
 
     @klass.jit_attr_named("_jit_repo_unfiltered_repos", uncached_val=None)
     def unfiltered_repos(self):
         """Group of all configured repos without filtering."""
         repos = chain(self.source_repos, self.installed_repos)
         return RepositoryGroup(
-            (r.raw_repo if r.raw_repo is not None else r) for r in repos
+            ((r.raw_repo if r.raw_repo is not None else r) for r in repos),
+            threads=self.repo_threads,
         )
 
     @klass.jit_attr_named("_jit_repo_repos", uncached_val=None)
     def repos(self):
         """Group of all repos."""
-        return RepositoryGroup(chain(self.source_repos, self.installed_repos))
+        return RepositoryGroup(
+            chain(self.source_repos, self.installed_repos), threads=self.repo_threads
+        )
 
     @klass.jit_attr_named("_jit_repo_ebuild_repos", uncached_val=None)
     def ebuild_repos(self):
         """Group of all ebuild repos bound with configuration data."""
         return RepositoryGroup(
-            x
-            for x in self.source_repos
-            if isinstance(x.raw_repo, ebuild_repo.ConfiguredTree)
+            (
+                x
+                for x in self.source_repos
+                if isinstance(x.raw_repo, ebuild_repo.ConfiguredTree)
+            ),
+            threads=self.repo_threads,
         )
 
     @klass.jit_attr_named("_jit_repo_ebuild_repos_unfiltered", uncached_val=None)
     def ebuild_repos_unfiltered(self):
         """Group of all ebuild repos without package filtering."""
         return RepositoryGroup(
-            x
-            for x in self.unfiltered_repos
-            if isinstance(x, ebuild_repo.ConfiguredTree)
+            (
+                x
+                for x in self.unfiltered_repos
+                if isinstance(x, ebuild_repo.ConfiguredTree)
+            ),
+            threads=self.repo_threads,
         )
 
     @klass.jit_attr_named("_jit_repo_ebuild_repos_raw", uncached_val=None)
     def ebuild_repos_raw(self):
         """Group of all ebuild repos without filtering."""
         return RepositoryGroup(
-            x
-            for x in self.source_repos_raw
-            if isinstance(x, ebuild_repo.UnconfiguredTree)
+            (
+                x
+                for x in self.source_repos_raw
+                if isinstance(x, ebuild_repo.UnconfiguredTree)
+            ),
+            threads=self.repo_threads,
         )
 
     @klass.jit_attr_named("_jit_repo_binary_repos", uncached_val=None)
     def binary_repos(self):
         """Group of all binary repos bound with configuration data."""
         return RepositoryGroup(
-            x
-            for x in self.source_repos
-            if isinstance(x.raw_repo, binary_repo.ConfiguredTree)
+            (
+                x
+                for x in self.source_repos
+                if isinstance(x.raw_repo, binary_repo.ConfiguredTree)
+            ),
+            threads=self.repo_threads,
         )
 
     @klass.jit_attr_named("_jit_repo_binary_repos_unfiltered", uncached_val=None)
     def binary_repos_unfiltered(self):
         """Group of all binary repos without package filtering."""
         return RepositoryGroup(
-            x
-            for x in self.unfiltered_repos
-            if isinstance(x, binary_repo.ConfiguredTree)
+            (
+                x
+                for x in self.unfiltered_repos
+                if isinstance(x, binary_repo.ConfiguredTree)
+            ),
+            threads=self.repo_threads,
         )
 
     @klass.jit_attr_named("_jit_repo_binary_repos_raw", uncached_val=None)
     def binary_repos_raw(self):
         """Group of all binary repos without filtering."""
         return RepositoryGroup(
-            x for x in self.source_repos_raw if isinstance(x, binary_repo.tree)
+            (x for x in self.source_repos_raw if isinstance(x, binary_repo.tree)),
+            threads=self.repo_threads,
         )
 
     # multiplexed repos
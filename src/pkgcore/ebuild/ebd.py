@@ -56,6 +56,9 @@ from .processor import (
 
 
 class ebd:
+    # eclass stack inherits are sourced from, if any
+    eclass_cache = None
+
     def __init__(
         self,
         pkg,
@@ -383,6 +386,7 @@ class ebd:
             extra_handlers=extra_handlers,
             failure_allowed=failure_allowed,
             logging=self.logging,
+            eclass_cache=self.eclass_cache,
         )
 
     def _request_bashrcs(self, ebd):
@@ -510,6 +514,7 @@ def run_generic_phase(
     extra_handlers=None,
     failure_allowed=False,
     logging=None,
+    eclass_cache=None,
     **kwargs,
 ):
     """
@@ -526,6 +531,8 @@ def run_generic_phase(
     :param failure_allowed: allow failure without raising error
     :type failure_allowed: boolean
     :param logging: None or a filepath to log output to
+    :param eclass_cache: :obj:`pkgcore.ebuild.eclass_cache` inherits are
+        sourced from, preloaded eclasses not matching it are dropped
     :return: True when the phase has finished execution
     """
 
@@ -553,6 +560,7 @@ def run_generic_phase(
             sandbox=sandbox,
             logging=logging,
             additional_commands=extra_handlers,
+            eclass_cache=eclass_cache,
         ):
             if not failure_allowed:
                 raise format.GenericBuildError(
@@ -1048,8 +1056,9 @@ class ebuild_operations:
         if "pretend" not in pkg.mandatory_phases:
             return
 
-        commands = None
+        commands = eclass_cache = None
         if not pkg.built:
+            eclass_cache = self._eclass_cache
             commands = {
                 "request_inherit": partial(inherit_handler, self._eclass_cache),
                 "has_version": ebd_ipc.Has_Version(self),
@@ -1078,6 +1087,7 @@ class ebuild_operations:
                     userpriv=True,
                     sandbox=True,
                     extra_handlers=commands,
+                    eclass_cache=eclass_cache,
                 )
             except ProcessorError as e:
                 f.seek(0)
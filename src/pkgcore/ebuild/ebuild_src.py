@@ -5,6 +5,7 @@ package class for buildable ebuilds
 __all__ = ("base", "package", "package_factory")
 
 import os
+from contextlib import contextmanager
 from functools import partial
 from itertools import chain
 from sys import intern
@@ -468,6 +469,8 @@ class package_factory(metadata.factory):
         super().__init__(parent, *args, **kwargs)
         self._cache = cachedb
         self._ecache = eclass_cache
+        # cache entries batch loaded for packages, see prefetched()
+        self._prefetched = {}
 
         if mirrors:
             mirrors = {k: fetch.mirror(v, k) for k, v in mirrors.items()}
@@ -489,18 +492,64 @@ class package_factory(metadata.factory):
     def _get_ebuild_mtime(self, pkg):
         return os.stat(self._get_ebuild_path(pkg)).st_mtime
 
+    @contextmanager
+    def prefetched(self, pkgs):
+        """Batch load cache entries for packages while the context is active.
+
+        Only caches supporting batched lookups are queried for packages lacking
+        loaded metadata. Entries are validated and consumed by the first
+        metadata lookup of their package with any left unused dropped on exit.
+        """
+        pending = set()
+        for pkg in pkgs:
+            try:
+                object.__getattribute__(pkg, "data")
+            except AttributeError:
+                pending.add(pkg.cpvstr)
+        loaded = []
+        for cache in self._cache:
+            if not pending:
+                break
+            if cache is None or not cache.batched_lookups:
+                continue
+            for cpv, data in cache.get_many(sorted(pending)):
+                if cpv in pending:
+                    pending.discard(cpv)
+                    self._prefetched[cpv] = (cache, data)
+                    loaded.append(cpv)
+        try:
+            yield
+        finally:
+            for cpv in loaded:
+                self._prefetched.pop(cpv, None)
+
     def _get_metadata(self, pkg, ebp=None, force_regen=False):
-        caches = self._cache
-        if force_regen:
-            caches = ()
+        if not force_regen:
+            if (data := self._get_cached_metadata(pkg)) is not None:
+                return data
+
+        # no cache entries, regen
+        return self._update_metadata(pkg, ebp=ebp)
+
+    def _get_cached_metadata(self, pkg, prune=True):
+        """Return the first valid cache entry for a package, or None if none exist.
+
+        :param prune: delete invalid entries from writable caches
+        """
+        prefetched = self._prefetched.pop(pkg.cpvstr, None)
         ebuild_hash = chksum.LazilyHashedPath(pkg.path)
-        for cache in caches:
+        for cache in self._cache:
             if cache is not None:
                 try:
+                    if prefetched is not None and prefetched[0] is cache:
+                        data = prefetched[1]
+                        if cache.validate_entry(data, ebuild_hash, self._ecache):
+                            return data
+                        # the cache may have been updated since prefetching
                     data = cache[pkg.cpvstr]
                     if cache.validate_entry(data, ebuild_hash, self._ecache):
                         return data
-                    if not cache.readonly:
+                    if prune and not cache.readonly:
                         del cache[pkg.cpvstr]
                 except KeyError:
                     continue
@@ -508,15 +557,18 @@ class package_factory(metadata.factory):
                     logger.warning("caught cache error: %s", e)
                     del e
                     continue
-
-        # no cache entries, regen
-        return self._update_metadata(pkg, ebp=ebp)
+        return None
 
     def _update_metadata(self, pkg, ebp=None):
         parsed_eapi = pkg.eapi
         if not parsed_eapi.supported:
             return {"EAPI": str(parsed_eapi)}
+        mydata = self._generate_metadata(pkg, ebp=ebp)
+        self._store_metadata(pkg, mydata)
+        return mydata
 
+    def _generate_metadata(self, pkg, ebp=None):
+        """Source a package's metadata, returning it in cache entry form."""
         with processor.reuse_or_request(ebp) as my_proc:
             try:
                 mydata = my_proc.get_keys(pkg, self._ecache)
@@ -524,7 +576,30 @@ class package_factory(metadata.factory):
                 raise metadata_errors.MetadataException(
                     pkg, "data", "failed sourcing ebuild", e
                 )
+        return self._convert_keys(pkg, mydata)
 
+    def _generate_metadata_batch(self, pkgs, ebp):
+        """Source the metadata of packages sharing an EAPI in a single request.
+
+        :return: list of (package, metadata) pairs, with metadata in cache entry
+            form or a :obj:`MetadataException` for failures; packages after
+            one that killed the processor are omitted
+        """
+        results = []
+        for pkg, mydata in ebp.get_keys_batch(pkgs, self._ecache):
+            try:
+                if isinstance(mydata, processor.ProcessorError):
+                    raise metadata_errors.MetadataException(
+                        pkg, "data", "failed sourcing ebuild", mydata
+                    )
+                results.append((pkg, self._convert_keys(pkg, mydata)))
+            except metadata_errors.MetadataException as e:
+                results.append((pkg, e))
+        return results
+
+    def _convert_keys(self, pkg, mydata):
+        """Convert the keys sourced from an ebuild into cache entry form."""
+        parsed_eapi = pkg.eapi
         # Rewrite defined_phases as needed, since we now know the EAPI.
         eapi = get_eapi(mydata.get("EAPI", "0"))
         if parsed_eapi != eapi:
@@ -552,19 +627,34 @@ class package_factory(metadata.factory):
         for x in wipes:
             del mydata[x]
 
-        if self._cache is not None:
-            for cache in self._cache:
-                if not cache.readonly:
-                    try:
-                        cache[pkg.cpvstr] = mydata
-                    except cache_errors.CacheError as e:
-                        logger.warning("caught cache error: %s", e)
-                        del e
-                        continue
-                    break
-
         return mydata
 
+    def _store_metadata(self, pkg, mydata):
+        """Write a package's metadata to the first writable cache."""
+        for cache in self._cache:
+            if cache is not None and not cache.readonly:
+                try:
+                    cache[pkg.cpvstr] = mydata
+                except cache_errors.CacheError as e:
+                    logger.warning("caught cache error: %s", e)
+                    del e
+                    continue
+                break
+
+    def _prime_metadata_chksums(self, mydata):
+        """Force computing the chksums required to store generated metadata.
+
+        Allows the hashing to be done by the process generating the metadata
+        instead of the one writing it to the cache.
+        """
+        for cache in self._cache:
+            if cache is not None and not cache.readonly:
+                getattr(mydata["_chf_"], cache.chf_type, None)
+                for data in mydata.get("_eclasses_", {}).values():
+                    for chf in cache.eclass_chf_types:
+                        getattr(data, chf, None)
+                break
+
     def new_package(self, *args):
         if self._parent_repo.package_cache:
             inst = self._cached_instances.get(args)
@@ -374,24 +374,72 @@ class EclassDoc(AttrDict):
 
     ABI_VERSION = 5
 
-    def __init__(self, path, /, *, sourced=False, repo=None):
+    def __init__(self, path, /, *, sourced=False, repo=None, index=None):
+        """
+        :param path: eclass file path
+        :param sourced: source the eclass to determine its exported functions,
+            variables, and PROPERTIES
+        :param repo: repo used to resolve the eclasses provided by the eclass
+        :param index: :obj:`pkgcore.ebuild.eclass_index.EclassIndex` instance
+            caching parsed artifacts, note that warnings logged during parsing
+            aren't repeated when using cached docs
+        """
         self.mtime = os.path.getmtime(path)
+        chksum = index.chksum(path) if index is not None else None
 
         # parse eclass doc
-        data = self.parse(path)
+        if chksum is None:
+            data = self.parse(path)
+        elif (data := index.get(f"doc-{self.ABI_VERSION}", chksum)) is not None:
+            data = self._load_doc(data)
+        else:
+            data = self.parse(path)
+            index.set(f"doc-{self.ABI_VERSION}", chksum, self._dump_doc(data))
 
         data["provides"] = None
         if repo is not None:
-            data["provides"] = self._get_provides(data["raw_provides"], repo)
+            data["provides"] = self._get_provides(data["raw_provides"], repo, index)
 
         # inject full lists of exported funcs and vars
         if sourced:
-            data.update(self._source_eclass(path))
+            data.update(self._source_eclass(path, index, chksum))
 
         super().__init__(data)
 
     @staticmethod
-    def _get_provides(raw_provides, repo):
+    def _dump_doc(data):
+        """Convert parsed eclass docs to a JSON serializable form."""
+
+        def convert(obj):
+            if isinstance(obj, (AttrDict, dict)):
+                return {k: convert(v) for k, v in obj.items()}
+            elif isinstance(obj, (OrderedSet, tuple, list)):
+                return [convert(x) for x in obj]
+            return obj
+
+        return convert(data)
+
+    @staticmethod
+    def _load_doc(data):
+        """Convert eclass docs loaded from their JSON form to their parsed form."""
+
+        def convert(obj):
+            if isinstance(obj, list):
+                return tuple(map(convert, obj))
+            return obj
+
+        data = {k: convert(v) for k, v in data.items()}
+        data["supported_eapis"] = OrderedSet(data["supported_eapis"])
+        for block_obj in ParseEclassDoc.blocks.values():
+            if block_obj.key is not None:
+                data[block_obj.key] = OrderedSet(
+                    AttrDict({k: convert(v) for k, v in x.items()})
+                    for x in data[block_obj.key]
+                )
+        return data
+
+    @staticmethod
+    def _get_provides(raw_provides, repo, index=None):
         out = OrderedSet()
         to_process = OrderedSet(raw_provides)
         while to_process:
@@ -399,35 +447,41 @@ class EclassDoc(AttrDict):
             if (next_eclass_inst := repo.eclass_cache.get_eclass(next_eclass)) is None:
                 logger.warning(f"'@PROVIDES:' eclass {next_eclass} not found")
                 continue
-            next_eclass_doc = EclassDoc(next_eclass_inst.path)
+            next_eclass_doc = EclassDoc(next_eclass_inst.path, index=index)
             to_process.update(set(next_eclass_doc.raw_provides).difference(out))
         return tuple(out)
 
     @staticmethod
-    def _source_eclass(path):
+    def _source_eclass(path, index=None, chksum=None):
         data = {}
-        # TODO: support this via pkgcore's ebd
-        # source eclass to determine PROPERTIES
-        p = subprocess.run(
-            [
-                "env",
-                "-i",
-                "bash",
-                "-c",
-                f"source {shlex.quote(path)}; "
-                f"compgen -A function; "
-                f'echo "#"; '
-                f"compgen -A variable; "
-                f'echo "#"; '
-                f"echo ${{PROPERTIES}}",
-            ],
-            stderr=subprocess.DEVNULL,
-            stdout=subprocess.PIPE,
-            encoding="utf8",
-        )
-        if p.returncode == 0:
+        if chksum is not None and (stdout := index.get("sourced", chksum)) is not None:
+            returncode = 0
+        else:
+            # TODO: support this via pkgcore's ebd
+            # source eclass to determine PROPERTIES
+            p = subprocess.run(
+                [
+                    "env",
+                    "-i",
+                    "bash",
+                    "-c",
+                    f"source {shlex.quote(path)}; "
+                    f"compgen -A function; "
+                    f'echo "#"; '
+                    f"compgen -A variable; "
+                    f'echo "#"; '
+                    f"echo ${{PROPERTIES}}",
+                ],
+                stderr=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                encoding="utf8",
+            )
+            returncode, stdout = p.returncode, p.stdout
+            if returncode == 0 and chksum is not None:
+                index.set("sourced", chksum, stdout)
+        if returncode == 0:
             eclass_obj = ParseEclassDoc.blocks["@ECLASS:"]
-            funcs, variables, properties = p.stdout.split("#\n")
+            funcs, variables, properties = stdout.split("#\n")
             data["_exported_funcs"] = tuple(funcs.split())
             data["_exported_vars"] = tuple(
                 x for x in variables.split() if x not in eclass_obj.bash_env_vars
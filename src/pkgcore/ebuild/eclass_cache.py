@@ -17,6 +17,7 @@ from snakeoil.mappings import ImmutableDict, OrderedFrozenSet, StackedDict
 from snakeoil.osutils import listdir_files
 
 from ..config.hint import ConfigHint
+from ..package import errors as pkg_errors
 
 
 class base:
@@ -24,12 +25,13 @@ class base:
     Maintains the cache information about eclasses available to an ebuild.
     """
 
-    def __init__(self, location=None, eclassdir=None):
+    def __init__(self, location=None, eclassdir=None, index=None):
         self._eclass_data_inst_cache = WeakValueDictionary()
         # generate this.
         # self.eclasses = {} # {"Name": ("location", "_mtime_")}
         self.location = location
         self.eclassdir = eclassdir
+        self.index = index
 
     def get_eclass_data(self, inherits):
         """Return the cachable entries from a list of inherited eclasses.
@@ -75,6 +77,51 @@ class base:
 
         return d
 
+    def eclass_usage(self, pkgs, regen_state=None, cache=None):
+        """Return a mapping of eclasses to the CPVs of packages inheriting them.
+
+        The reverse index recorded by regen is used for packages whose ebuilds
+        and inherited eclasses are unchanged since, with the metadata of the
+        remaining packages being consulted directly.
+
+        :param pkgs: packages using this eclass cache
+        :param regen_state: :obj:`pkgcore.ebuild.regen_state.RegenState`
+            instance recorded for the packages, if any
+        :param cache: metadata cache the regen state was recorded for
+        """
+        pkgs = list(pkgs)
+        usage = {}
+        if regen_state is not None and regen_state.exists:
+            stale = regen_state.stale(
+                pkgs,
+                regen_state.ebuild_mtimes(pkgs),
+                regen_state.eclass_mtimes(self),
+                cache,
+            )
+            fresh = frozenset(pkg.cpvstr for pkg in pkgs).difference(
+                pkg.cpvstr for pkg in stale
+            )
+            for eclass, cpvs in regen_state.eclass_index().items():
+                usage[eclass] = set(cpvs & fresh)
+        else:
+            stale = pkgs
+
+        for pkg in stale:
+            try:
+                inherited = pkg.inherited
+            except pkg_errors.MetadataException:
+                continue
+            for eclass in inherited:
+                usage.setdefault(eclass, set()).add(pkg.cpvstr)
+        return {k: frozenset(v) for k, v in usage.items() if v}
+
+    def eclass_consumers(self, eclass, pkgs, regen_state=None, cache=None):
+        """Return the CPVs of packages inheriting a given eclass.
+
+        See :py:meth:`eclass_usage` for the parameters.
+        """
+        return self.eclass_usage(pkgs, regen_state, cache).get(eclass, frozenset())
+
     def __getstate__(self):
         d = self.__dict__.copy()
         del d["_eclass_data_inst_cache"]
@@ -90,11 +137,13 @@ class cache(base):
         types={"path": "str", "location": "str"}, typename="eclass_cache"
     )
 
-    def __init__(self, path, location=None):
+    def __init__(self, path, location=None, index=None):
         """
         :param location: ondisk location of the tree we're working with
+        :param index: :obj:`pkgcore.ebuild.eclass_index.EclassIndex` instance
+            caching artifacts parsed from eclasses, disabled by default
         """
-        base.__init__(self, location=location, eclassdir=normpath(path))
+        base.__init__(self, location=location, eclassdir=normpath(path), index=index)
 
     def _load_eclasses(self):
         """Force an update of the internal view of on disk/remote eclasses."""
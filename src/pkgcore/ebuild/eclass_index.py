@@ -0,0 +1,192 @@
+"""
+persistent cache of artifacts parsed from eclasses
+
+Generating eclass docs, sourcing eclasses for the functions they export,
+resolving what they inherit, and syntax checking them before they're preloaded
+into ebuild processors all reparse eclass files that rarely change. This cache
+stores those artifacts in a sqlite database keyed by the md5 of the eclass
+they were derived from, so entries never go stale and are shared between
+repos, eclass stacks, and processes.
+"""
+
+__all__ = ("EclassIndex",)
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import closing
+from os.path import join as pjoin
+
+from snakeoil.chksum import get_chksums, get_handler
+
+from .. import const
+from ..log import logger
+
+# inherit calls at any nesting level of an eclass
+_inherit_re = re.compile(r"(?:^|[;&|()])[ \t]*inherit[ \t]+([^;&|)#\n]+)", re.MULTILINE)
+_md5 = get_handler("md5")
+
+
+def _parse_inherits(data):
+    """Return the eclasses directly inherited by eclass data.
+
+    Inherits nested in conditionals are included while those using variable
+    expansions are skipped since they can't be resolved without sourcing.
+    """
+    eclasses = {}
+    for mo in _inherit_re.finditer(data):
+        for eclass in mo.group(1).split():
+            if not any(x in eclass for x in "$`\\\"'"):
+                eclasses[eclass] = None
+    return tuple(eclasses)
+
+
+class EclassIndex:
+    """Cache of artifacts parsed from eclasses keyed by eclass md5.
+
+    Artifacts are JSON serializable values stored under a given key, e.g. the
+    parsed docs of an eclass. Lookups return None for missing artifacts with
+    failures to access the cache treated as misses.
+    """
+
+    version = 1
+    # max number of chksums pulled per query
+    batch_size = 500
+
+    def __init__(self, path=None):
+        """
+        :param path: file the cache is stored in, defaults to the user's cache dir
+        """
+        if path is None:
+            path = pjoin(const.USER_CACHE_PATH, "pkgcore-eclass-index.sqlite")
+        self.path = path
+
+    @property
+    def writable(self):
+        """Boolean signifying whether the cache can be written out."""
+        if os.path.exists(self.path):
+            return os.access(self.path, os.W_OK)
+        path = os.path.dirname(self.path)
+        while path and not os.path.exists(path):
+            path = os.path.dirname(path)
+        return os.access(path, os.W_OK)
+
+    @staticmethod
+    def chksum(path):
+        """Return the md5 an eclass file's artifacts are keyed by."""
+        return _md5.long2str(get_chksums(path, "md5")[0])
+
+    def _connect(self, readonly=True):
+        """Open the cache, returning None if no usable cache exists."""
+        if readonly:
+            if not os.path.exists(self.path):
+                return None
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == self.version:
+            return conn
+        if readonly:
+            conn.close()
+            return None
+        conn.executescript(
+            "DROP TABLE IF EXISTS artifacts;"
+            "CREATE TABLE artifacts (chksum TEXT NOT NULL, key TEXT NOT NULL, "
+            "data TEXT NOT NULL, PRIMARY KEY (chksum, key)) WITHOUT ROWID;"
+            f"PRAGMA user_version={self.version};"
+        )
+        return conn
+
+    def get_many(self, key, chksums):
+        """Return a mapping of eclass md5s to their cached artifacts for a key."""
+        chksums = sorted(set(chksums))
+        results = {}
+        try:
+            if (conn := self._connect()) is None:
+                return results
+            with closing(conn):
+                for i in range(0, len(chksums), self.batch_size):
+                    batch = chksums[i : i + self.batch_size]
+                    query = ",".join("?" * len(batch))
+                    query = (
+                        "SELECT chksum, data FROM artifacts "
+                        f"WHERE key=? AND chksum IN ({query})"
+                    )
+                    for chksum, data in conn.execute(query, [key] + batch):
+                        results[chksum] = json.loads(data)
+        except (sqlite3.Error, ValueError) as e:
+            logger.debug(f"failed loading eclass index {self.path!r}: {e}")
+        return results
+
+    def get(self, key, chksum):
+        """Return the cached artifact for a key of an eclass md5."""
+        return self.get_many(key, (chksum,)).get(chksum)
+
+    def update(self, key, artifacts):
+        """Store the artifacts for a key of multiple eclasses.
+
+        :param artifacts: mapping of eclass md5s to JSON serializable values
+        :return: True if the cache was written, False otherwise
+        """
+        if not artifacts or not self.writable:
+            return False
+        try:
+            rows = [
+                (chksum, key, json.dumps(data, separators=(",", ":")))
+                for chksum, data in artifacts.items()
+            ]
+            with closing(self._connect(readonly=False)) as conn:
+                with conn:
+                    conn.executemany("REPLACE INTO artifacts VALUES (?, ?, ?)", rows)
+        except (EnvironmentError, sqlite3.Error, TypeError, ValueError) as e:
+            logger.debug(f"failed updating eclass index {self.path!r}: {e}")
+            return False
+        return True
+
+    def set(self, key, chksum, data):
+        """Store the artifact for a key of an eclass md5."""
+        return self.update(key, {chksum: data})
+
+    def inherit_graph(self, eclass_cache, eclasses=None):
+        """Resolve the eclasses inherited by an eclass stack's eclasses.
+
+        :param eclass_cache: :obj:`pkgcore.ebuild.eclass_cache` instance
+        :param eclasses: names of the eclasses to resolve the graph from,
+            defaults to all eclasses in the eclass cache
+        :return: mapping of the eclasses reachable from those requested to the
+            eclasses they directly inherit, skipping those not in the cache
+        """
+        ec = eclass_cache.eclasses
+        if eclasses is None:
+            eclasses = ec.keys()
+        graph = {}
+        to_process = [x for x in eclasses if x in ec]
+        while to_process:
+            chksums = {}
+            for eclass in to_process:
+                try:
+                    chksums[eclass] = self.chksum(ec[eclass].path)
+                except EnvironmentError as e:
+                    logger.warning(f"failed reading eclass {eclass!r}: {e}")
+                    graph[eclass] = ()
+            cached = self.get_many("inherits", chksums.values())
+            missing = {}
+            for eclass, chksum in chksums.items():
+                if (inherits := cached.get(chksum)) is None:
+                    try:
+                        with open(ec[eclass].path) as f:
+                            inherits = _parse_inherits(f.read())
+                    except (EnvironmentError, UnicodeDecodeError) as e:
+                        logger.warning(f"failed reading eclass {eclass!r}: {e}")
+                        inherits = ()
+                    else:
+                        missing[chksum] = inherits
+                graph[eclass] = tuple(inherits)
+            self.update("inherits", missing)
+            to_process = {
+                x for eclass in chksums for x in graph[eclass] if x in ec
+            }.difference(graph)
+        return graph
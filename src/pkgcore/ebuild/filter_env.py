@@ -1,14 +1,38 @@
-"""Filter a bash environment dump."""
+"""Filter a bash environment dump.
+
+Parsing jumps between the characters significant to the current parsing
+context using precompiled regexes instead of inspecting every character.
+"""
 
 __all__ = ("run",)
 
 import io
 import re
+from functools import cache
 
 from ..log import logger
 
 COMMAND_PARSING, SPACE_PARSING = list(range(2))
 
+_space_re = re.compile(r"\s+")
+_word_re = re.compile(r"\w*")
+_brace_expansion_re = re.compile(r"[^}$]*")
+_envvar_re = re.compile(r"[ \t]*([^\0\"'()\- \t\n=]+)=")
+_function_re = re.compile(
+    r"[ \t]*(?:function\s)?+\s*+([^\0 \t\n=\"'()]++)[ \t]*\([ \t]*\)\s*+\{"
+)
+
+
+@cache
+def _skip_re(chars, spaces=False):
+    """Return a regex matching a run of characters insignificant to a parser.
+
+    :param chars: significant characters
+    :param spaces: whitespace is significant
+    """
+    chars = re.escape(chars) + (r"\s" if spaces else "")
+    return re.compile(f"[^{chars}]*")
+
 
 def run(
     out,
@@ -56,67 +80,18 @@ def build_regex_string(tokens, invert=False):
         raise Exception(f"failed compiling {s!r}:\n\nerror: {e}")
 
 
-FUNC_LEN = len("function")
-
-
 def is_function(buff, pos):
     """:return: start, end, pos or None, None, None tuple."""
-    isspace = str.isspace
-    try:
-        while buff[pos] in " \t":
-            pos += 1
-        if buff[pos : pos + FUNC_LEN] == "function":
-            try:
-                if isspace(buff[pos + FUNC_LEN]):
-                    pos += FUNC_LEN + 1
-            except IndexError:
-                # insane, but it could still be a function-
-                # len('f(){:;}') <= FUNC_LEN.
-                pass
-        while isspace(buff[pos]):
-            pos += 1
-        start = pos
-        while buff[pos] not in "\0 \t\n=\"'()":
-            pos += 1
-        end = pos
-        if end == start:
-            return None, None, None
-        while buff[pos] in " \t":
-            pos += 1
-        if buff[pos] != "(":
-            return None, None, None
-        pos += 1
-        while buff[pos] in " \t":
-            pos += 1
-        if buff[pos] != ")":
-            return None, None, None
-        pos += 1
-        while isspace(buff[pos]):
-            pos += 1
-        if buff[pos] != "{":
-            return None, None, None
-        return start, end, pos + 1
-    except IndexError:
-        # can't be a function, ran off the end
+    if (m := _function_re.match(buff, pos)) is None:
         return None, None, None
+    return m.start(1), m.end(1), m.end()
 
 
 def is_envvar(buff, pos):
     """:return: start, end, pos or None, None, None tuple."""
-    try:
-        while buff[pos] in " \t":
-            pos += 1
-        start = pos
-        while True:
-            if buff[pos] in "\0\"'()- \t\n":
-                return None, None, None
-            if buff[pos] == "=":
-                if pos == start:
-                    return None, None, None
-                return start, pos, pos + 1
-            pos += 1
-    except IndexError:
+    if (m := _envvar_re.match(buff, pos)) is None:
         return None, None, None
+    return m.start(1), m.end(1), m.end()
 
 
 def process_scope(
@@ -144,7 +119,7 @@ def process_scope(
         com_start = pos
         ch = buff[pos]
         if isspace(ch):
-            pos += 1
+            pos = _space_re.match(buff, pos).end()
             continue
 
         # Ignore comments.
@@ -155,7 +130,7 @@ def process_scope(
         new_start, new_end, new_p = is_function(buff, pos)
         if new_p is not None:
             func_name = buff[new_start:new_end]
-            logger.debug(f"matched func name {func_name!r}")
+            logger.debug("matched func name %r", func_name)
             new_p = process_scope(
                 None,
                 buff,
@@ -166,11 +141,11 @@ def process_scope(
                 func_callback=func_callback,
                 func_level=func_level + 1,
             )
-            logger.debug(f"ended processing {func_name!r}")
+            logger.debug("ended processing %r", func_name)
             if func_callback is not None:
                 func_callback(func_level, func_name, buff[new_start:new_p])
             if func_match is not None and func_match(func_name):
-                logger.debug(f"filtering func {func_name!r}")
+                logger.debug("filtering func %r", func_name)
                 window_end = com_start
             pos = new_p
             pos += 1
@@ -189,11 +164,11 @@ def process_scope(
             pos = new_p
             if envvar_callback:
                 envvar_callback(var_name)
-            logger.debug(f"matched env assign {var_name!r}")
+            logger.debug("matched env assign %r", var_name)
 
             if var_match is not None and var_match(var_name):
                 # This would be filtered.
-                logger.info(f"filtering var {var_name!r}")
+                logger.info("filtering var %r", var_name)
                 window_end = com_start
 
             if pos >= end:
@@ -235,12 +210,13 @@ def walk_statement_no_parsing(buff, pos, endchar):
 
 def walk_statement_dollared_quote_parsing(buff, pos, endchar):
     end = len(buff)
+    skip = _skip_re("\\" + endchar).match
     while pos < end:
-        if buff[pos] == endchar:
+        pos = skip(buff, pos).end()
+        if pos >= end or buff[pos] == endchar:
             return pos
-        elif buff[pos] == "\\":
-            pos += 1
-        pos += 1
+        # skip escaped chars
+        pos += 2
     return pos
 
 
@@ -262,7 +238,7 @@ def walk_here_statement(buff, pos):
     else:
         end_here = walk_command_complex(buff, pos, " ", SPACE_PARSING)
     here_word = buff[pos:end_here]
-    logger.debug(f"matched len({len(here_word)})/{here_word!r} for a here word")
+    logger.debug("matched len(%i)/%r for a here word", len(here_word), here_word)
     # XXX watch this. Potential for horkage. Need to do the quote
     # removal thing. This sucks.
     end_here += 1
@@ -279,7 +255,8 @@ def walk_here_statement(buff, pos):
                 i -= 1
             if i >= 0 and buff[i] == "\n":
                 break
-        end_here = buff.find(here_word, end_here + here_len)
+        # empty here words are terminated by an empty line
+        end_here = buff.find(here_word, end_here + max(here_len, 1))
 
     if end_here == -1:
         return end
@@ -311,7 +288,14 @@ def walk_command_complex(buff, pos, endchar, interpret_level):
     start = pos
     isspace = str.isspace
     end = len(buff)
+    if interpret_level == COMMAND_PARSING:
+        skip = _skip_re(endchar + ";\n\\<#${(`\"'").match
+    else:
+        skip = _skip_re(endchar + "\\#${`\"'", spaces=True).match
     while pos < end:
+        pos = skip(buff, pos).end()
+        if pos >= end:
+            break
         ch = buff[pos]
         if ch == endchar:
             if endchar != "}":
@@ -338,7 +322,7 @@ def walk_command_complex(buff, pos, endchar, interpret_level):
                 # since it may be an endchar
                 continue
             else:
-                logger.debug(f"noticed <, interpret_level={interpret_level}")
+                logger.debug("noticed <, interpret_level=%i", interpret_level)
         elif ch == "#":
             if start == pos or isspace(buff[pos - 1]) or buff[pos - 1] == ";":
                 pos = walk_statement_pound(buff, pos)
@@ -360,7 +344,14 @@ def walk_command_complex(buff, pos, endchar, interpret_level):
 
 def raw_walk_command_escaped_parsing(buff, pos, endchar):
     end = len(buff)
+    if endchar == '"':
+        skip = _skip_re('"\\`$').match
+    else:
+        skip = _skip_re(endchar + "\\{(`\"'$#").match
     while pos < end:
+        pos = skip(buff, pos).end()
+        if pos >= end:
+            break
         ch = buff[pos]
         if ch == endchar:
             return pos
@@ -400,31 +391,24 @@ def walk_dollar_expansion(buff, pos, end, endchar, disable_quote=False):
         if buff[pos] == "$":
             # short circuit it.
             return pos + 1
-        while pos < end and buff[pos] != endchar:
-            if buff[pos].isspace():
-                return pos
-            if buff[pos] == "$":
-                # shouldn't this be passing disable_quote ?
-                return walk_dollar_expansion(buff, pos + 1, end, endchar)
-            if not buff[pos].isalnum():
-                if buff[pos] != "_":
-                    return pos
-            pos += 1
-
+        pos = _word_re.match(buff, pos).end()
         if pos >= end:
             return end
+        if buff[pos] == "$" and buff[pos] != endchar:
+            # shouldn't this be passing disable_quote ?
+            return walk_dollar_expansion(buff, pos + 1, end, endchar)
         return pos
 
     pos += 1
     # shortcut ${$} to avoid going too deep. ${$a} isn't valid, so no concern
     if pos == "$":
         return pos + 1
-    while pos < end and buff[pos] != "}":
-        if buff[pos] == "$":
-            # disable_quote?
-            pos = walk_dollar_expansion(buff, pos + 1, end, endchar)
-        else:
-            pos += 1
+    while pos < end:
+        pos = _brace_expansion_re.match(buff, pos).end()
+        if pos >= end or buff[pos] == "}":
+            break
+        # disable_quote?
+        pos = walk_dollar_expansion(buff, pos + 1, end, endchar)
     return pos + 1
 
 
@@ -96,6 +96,13 @@ class PortageConfig(DictMixin):
 
     __slots__ = ("_config", "dir", "root", "features")
     _supported_repo_types = {}
+    # repos.conf cache-backend values mapped to their cache modules
+    _supported_cache_backends = ImmutableDict(
+        {
+            "flat": "pkgcore.cache.flat_hash",
+            "sqlite": "pkgcore.cache.sqlite",
+        }
+    )
 
     def __init__(self, location=None, profile_override=None, **kwargs):
         """
@@ -441,6 +448,16 @@ class PortageConfig(DictMixin):
                 finally:
                     repo_conf["priority"] = priority
 
+                # metadata cache backend defaults to a file per package
+                cache_backend = repo_conf.get("cache-backend", "flat")
+                if cache_backend not in cls._supported_cache_backends:
+                    logger.warning(
+                        f"repos.conf: parsing {fp!r}: {name!r} repo has unsupported "
+                        f"cache-backend {cache_backend!r} (defaulting to flat)"
+                    )
+                    cache_backend = "flat"
+                repo_conf["cache-backend"] = cache_backend
+
                 # register repo
                 repos[name] = repo_conf
 
@@ -633,18 +650,19 @@ class PortageConfig(DictMixin):
 
         return base
 
-    def _make_cache(self, cache_format, repo_path):
+    def _make_cache(self, cache_format, repo_path, cache_backend="flat"):
         """Configure repo cache."""
+        module = self._supported_cache_backends[cache_backend]
         # Use md5 cache if it exists or the option is selected, otherwise default
         # to the old flat hash format in /var/cache/edb/dep/*.
         if (
             os.path.exists(pjoin(repo_path, "metadata", "md5-cache"))
             or cache_format == "md5-dict"
         ):
-            kls = "pkgcore.cache.flat_hash.md5_cache"
+            kls = f"{module}.md5_cache"
             cache_parent_dir = pjoin(repo_path, "metadata", "md5-cache")
         else:
-            kls = "pkgcore.cache.flat_hash.database"
+            kls = f"{module}.database"
             repo_path = pjoin("/var/cache/edb/dep", repo_path.lstrip("/"))
             cache_parent_dir = repo_path
 
@@ -700,7 +718,11 @@ class PortageConfig(DictMixin):
         # metadata cache
         if repo_obj.cache_format is not None:
             cache_name = "cache:" + repo_name
-            self[cache_name] = self._make_cache(repo_obj.cache_format, repo_path)
+            self[cache_name] = self._make_cache(
+                repo_obj.cache_format,
+                repo_path,
+                repo_opts.get("cache-backend", "flat"),
+            )
             repo["cache"] = cache_name
 
         if repo_name == defaults["main-repo"]:
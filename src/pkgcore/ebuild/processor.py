@@ -17,7 +17,9 @@ design) reduces regen time by over 40% compared to portage-2.1
 __all__ = (
     "request_ebuild_processor",
     "release_ebuild_processor",
+    "warm_ebuild_processors",
     "EbuildProcessor",
+    "ForkedEbuildProcessor",
     "UnhandledCommand",
     "expected_ebuild_env",
 )
@@ -25,8 +27,11 @@ __all__ = (
 import contextlib
 import errno
 import os
+import shutil
 import signal
+import tempfile
 import threading
+import time
 import traceback
 from functools import partial, wraps
 from itertools import chain
@@ -45,6 +50,39 @@ inactive_ebp_list = []
 active_ebp_list = []
 
 
+class ProcessorStats:
+    """Ebuild processor spawning and reuse statistics.
+
+    :ivar spawned: number of processors spawned
+    :ivar spawn_time: total seconds spent spawning processors, including
+        preloading eclasses for warmed processors
+    :ivar warmed: number of processors spawned in the background
+    :ivar reused: number of requests handed an idle processor
+    :ivar reaped: number of idle processors shut down after timing out
+    """
+
+    __slots__ = ("spawned", "spawn_time", "warmed", "reused", "reaped")
+
+    def __init__(self):
+        self.spawned = self.warmed = self.reused = self.reaped = 0
+        self.spawn_time = 0.0
+
+    def to_dict(self):
+        return {x: getattr(self, x) for x in self.__slots__}
+
+
+stats = ProcessorStats()
+
+# seconds idle processors are kept for before being shut down, None keeps them
+# until exit
+idle_timeout = None
+_reaper = None
+
+# processors with preloaded eclasses that new processors are forked from, keyed
+# by userpriv and sandbox settings and the eclass cache
+_fork_servers = {}
+
+
 def _singled_threaded(functor):
     """Decorator that forces method to run under single thread."""
 
@@ -73,6 +111,15 @@ def shutdown_all_processors():
                 )
             except EnvironmentError:
                 pass
+
+        # forked processors are shut down before the servers they're forked from
+        while _fork_servers:
+            try:
+                _fork_servers.popitem()[1].shutdown_processor(
+                    ignore_keyboard_interrupt=True
+                )
+            except EnvironmentError:
+                pass
     except Exception as e:
         traceback.print_exc()
         logger.error(e)
@@ -82,14 +129,60 @@ def shutdown_all_processors():
 spawn.atexit_register(shutdown_all_processors)
 
 
+def _forget_processors_after_fork():
+    """Drop processors inherited from the parent process.
+
+    They're owned by the parent and must not be shared, so forked children
+    start from scratch, requesting their own processors as needed.
+    """
+    global _global_ebp_lock, _reaper, stats
+    _global_ebp_lock = threading.Lock()
+    del inactive_ebp_list[:]
+    del active_ebp_list[:]
+    _fork_servers.clear()
+    _reaper = None
+    stats = ProcessorStats()
+
+
+os.register_at_fork(after_in_child=_forget_processors_after_fork)
+
+
+def _fork_ebuild_processor(userpriv, sandbox, eclass_cache):
+    """Fork a processor from the server matching the given settings.
+
+    Servers are spawned on first use, preloading all eclasses from the eclass
+    cache so forked processors start with them already defined.
+    """
+    key = (userpriv, sandbox, id(eclass_cache))
+    server = _fork_servers.get(key)
+    if server is None or not server.is_alive:
+        server = EbuildProcessor(userpriv, sandbox)
+        start = time.perf_counter()
+        try:
+            if not server.preload_eclasses(eclass_cache):
+                raise InternalError(msg="failed preloading eclasses")
+        except:
+            server.shutdown_processor(force=True)
+            raise
+        server.spawn_time += time.perf_counter() - start
+        stats.spawn_time += server.spawn_time
+        _fork_servers[key] = server
+    return server.fork()
+
+
 @_singled_threaded
-def request_ebuild_processor(userpriv=False, sandbox=None, fd_pipes=None):
+def request_ebuild_processor(
+    userpriv=False, sandbox=None, fd_pipes=None, eclass_cache=None
+):
     """Request a processor instance, creating a new one if needed.
 
     :return: :obj:`EbuildProcessor`
     :param userpriv: should the processor be deprived to
         :obj:`pkgcore.os_data.portage_gid` and :obj:`pkgcore.os_data.portage_uid`?
     :param sandbox: should the processor be sandboxed?
+    :param eclass_cache: if not None, new processors are forked from a server
+        with all of the eclass cache's eclasses preloaded instead of being
+        spawned from scratch
     """
 
     if sandbox is None:
@@ -102,10 +195,20 @@ def request_ebuild_processor(userpriv=False, sandbox=None, fd_pipes=None):
                 continue
             inactive_ebp_list.remove(ebp)
             active_ebp_list.append(ebp)
+            stats.reused += 1
             break
     else:
-        ebp = EbuildProcessor(userpriv, sandbox, fd_pipes=fd_pipes)
+        ebp = None
+        if eclass_cache is not None and not fd_pipes:
+            try:
+                ebp = _fork_ebuild_processor(userpriv, sandbox, eclass_cache)
+            except (InternalError, EnvironmentError) as e:
+                logger.warning(f"failed forking ebuild processor: {e}")
+        if ebp is None:
+            ebp = EbuildProcessor(userpriv, sandbox, fd_pipes=fd_pipes)
         active_ebp_list.append(ebp)
+        stats.spawned += 1
+        stats.spawn_time += ebp.spawn_time
 
     return ebp
 
@@ -134,10 +237,107 @@ def release_ebuild_processor(ebp):
     if ebp.is_locked or ebp.custom_fds:
         ebp.shutdown_processor()
     else:
+        ebp.idle_since = time.monotonic()
         inactive_ebp_list.append(ebp)
     return True
 
 
+@_singled_threaded
+def reap_idle_processors():
+    """Shut down processors that have been idle longer than :obj:`idle_timeout`.
+
+    :return: number of processors shut down
+    """
+    if idle_timeout is None:
+        return 0
+    now = time.monotonic()
+    reaped = [ebp for ebp in inactive_ebp_list if now - ebp.idle_since >= idle_timeout]
+    for ebp in reaped:
+        inactive_ebp_list.remove(ebp)
+        # idle processors aren't doing anything worth a graceful shutdown
+        ebp.shutdown_processor(force=True, ignore_keyboard_interrupt=True)
+    stats.reaped += len(reaped)
+    return len(reaped)
+
+
+def _reap_idle_processors():
+    while idle_timeout is not None:
+        time.sleep(max(idle_timeout / 2, 1))
+        try:
+            reap_idle_processors()
+        except EnvironmentError as e:
+            logger.debug(f"failed reaping idle ebuild processors: {e}")
+
+
+def _warm_ebuild_processors(count, userpriv, sandbox, eclass_cache, eclasses):
+    with _global_ebp_lock:
+        count -= sum(
+            ebp.userpriv == userpriv and ebp.sandbox == sandbox
+            for ebp in inactive_ebp_list
+        )
+    for _ in range(count):
+        try:
+            ebp = EbuildProcessor(userpriv, sandbox)
+            if eclass_cache is not None:
+                start = time.perf_counter()
+                ebp.preload_eclasses(eclass_cache, limited_to=eclasses)
+                ebp.spawn_time += time.perf_counter() - start
+        except Exception as e:
+            logger.warning(f"failed warming ebuild processor: {e}")
+            return
+        with _global_ebp_lock:
+            ebp.idle_since = time.monotonic()
+            inactive_ebp_list.append(ebp)
+            stats.spawned += 1
+            stats.warmed += 1
+            stats.spawn_time += ebp.spawn_time
+
+
+def warm_ebuild_processors(
+    count, userpriv=False, sandbox=None, eclass_cache=None, eclasses=None, timeout=None
+):
+    """Spawn idle processors in the background, preloading eclasses into them.
+
+    Processors are spawned until the given number of matching processors are
+    idle, ready to be handed out by :obj:`request_ebuild_processor`.
+
+    :param count: number of idle processors to keep available
+    :param userpriv: should the processors be deprived?
+    :param sandbox: should the processors be sandboxed?
+    :param eclass_cache: :obj:`pkgcore.ebuild.eclass_cache` instance to preload
+        eclasses from
+    :param eclasses: names of eclasses to preload, defaults to all eclasses in
+        the eclass cache
+    :param timeout: if not None, seconds idle processors are kept for before
+        being shut down, see :obj:`idle_timeout`
+    :return: :obj:`threading.Thread` instance spawning the processors
+    """
+    global idle_timeout, _reaper
+    if sandbox is None:
+        sandbox = spawn.is_sandbox_capable()
+    if eclass_cache is not None and eclasses is not None:
+        eclasses = [x for x in eclasses if x in eclass_cache.eclasses]
+        if not eclasses:
+            eclass_cache = None
+
+    if timeout is not None:
+        idle_timeout = timeout
+        if _reaper is None:
+            _reaper = threading.Thread(
+                target=_reap_idle_processors, name="ebd-reaper", daemon=True
+            )
+            _reaper.start()
+
+    thread = threading.Thread(
+        target=_warm_ebuild_processors,
+        args=(count, userpriv, sandbox, eclass_cache, eclasses),
+        name="ebd-warm",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
 @_singled_threaded
 def drop_ebuild_processor(ebp):
     """Force a given processor to be dropped from active/inactive lists.
@@ -322,16 +522,8 @@ class EbuildProcessor:
         :param fd_pipes: mapping from existing fd to fd inside the ebd process
         """
         self.lock()
-        self.ebd = e_const.EBUILD_DAEMON_PATH
-        self.sandbox = sandbox
-        self.userpriv = userpriv
-        self.custom_fds = fd_pipes
-
-        self._preloaded_eclasses = {}
-        self._eclass_caching = False
-        self._outstanding_expects = []
-        self._metadata_paths = None
-        self.pid = None
+        start = time.perf_counter()
+        self._setup_state(userpriv, sandbox, fd_pipes)
 
         spawn_opts = {"umask": 0o002}
         if self.userpriv:
@@ -436,9 +628,46 @@ class EbuildProcessor:
         else:
             self.write("no_sandbox")
         self._readonly_vars = frozenset(self.read().split())
+        self.spawn_time = time.perf_counter() - start
         # locking isn't used much, but w/ threading this will matter
         self.unlock()
 
+    def _setup_state(self, userpriv, sandbox, fd_pipes=None):
+        self.ebd = e_const.EBUILD_DAEMON_PATH
+        self.sandbox = sandbox
+        self.userpriv = userpriv
+        self.custom_fds = fd_pipes
+        self.idle_since = None
+
+        self._preloaded_eclasses = {}
+        self._preload_cache = None
+        self._eclass_caching = False
+        self._outstanding_expects = []
+        self._metadata_paths = None
+        # depend phase env strings shared by all ebuilds of an EAPI
+        self._depend_envs = {}
+        self.pid = None
+
+    def fork(self):
+        """Fork a new processor from this processor's daemon.
+
+        :return: :obj:`ForkedEbuildProcessor` instance
+        """
+        return ForkedEbuildProcessor(self)
+
+    def _fork_daemon(self, read_path, write_path):
+        """Fork the daemon, returning the child's pid.
+
+        :param read_path: path of the fifo the child reads commands from
+        :param write_path: path of the fifo the child writes responses to
+        """
+        self.write(f"fork_processor {read_path} {write_path}")
+        line = self.read().rstrip("\n")
+        cmd, _, pid = line.partition(" ")
+        if cmd != "forked" or not pid.isdigit():
+            raise InternalError(line, "failed forking ebuild processor")
+        return int(pid)
+
     def run_phase(
         self,
         phase,
@@ -447,6 +676,7 @@ class EbuildProcessor:
         logging=None,
         additional_commands=None,
         sandbox=True,
+        eclass_cache=None,
     ):
         """Utility function, to initialize the processor for a phase.
 
@@ -460,8 +690,14 @@ class EbuildProcessor:
         :param sandbox: should the sandbox be enabled?
         :param logging: None, or a filepath to log the output from the
             processor to
+        :param eclass_cache: eclass stack the phase inherits from; preloaded
+            eclasses are dropped if they don't match it or if it isn't given
         :return: True for success, False for everything else
         """
+        if eclass_cache is not None:
+            self._check_preloaded_eclasses(eclass_cache)
+        elif self._preloaded_eclasses and not self.clear_preloaded_eclasses():
+            return False
 
         self.write(f"process_ebuild {phase}")
         if not self.send_env(env, tmpdir=tmpdir):
@@ -498,10 +734,17 @@ class EbuildProcessor:
             raise
 
     def _consume_async_expects(self):
+        return all(self._consume_async_results())
+
+    def _consume_async_results(self):
+        """Read the replies to outstanding async expects.
+
+        :return: list of booleans signifying whether each reply was expected
+        """
         if any(x[0] for x in self._outstanding_expects):
             self.ebd_write.flush()
         got = [x.rstrip("\n") for x in self.readlines(len(self._outstanding_expects))]
-        ret = got == [x[1] for x in self._outstanding_expects]
+        ret = [x == want for x, (_flush, want) in zip(got, self._outstanding_expects)]
         self._outstanding_expects = []
         return ret
 
@@ -514,6 +757,9 @@ class EbuildProcessor:
         :param want: string we're expecting
         :return: boolean, was what was read == want?
         """
+        # signal handlers can only be set from the main thread
+        if timeout and threading.current_thread() is not threading.main_thread():
+            timeout = 0
         if timeout:
             signal.signal(signal.SIGALRM, self._timeout_ebp)
             signal.setitimer(signal.ITIMER_REAL, timeout)
@@ -609,12 +855,28 @@ class EbuildProcessor:
     def clear_preloaded_eclasses(self):
         if self.is_responsive:
             self.write("clear_preloaded_eclasses")
-            if not self.expect("clear_preload_eclasses succeeded", flush=True):
+            if not self.expect("clear_preloaded_eclasses succeeded", flush=True):
                 self.shutdown_processor()
                 return False
         self._preloaded_eclasses.clear()
+        self._preload_cache = None
         return True
 
+    def _check_preloaded_eclasses(self, cache):
+        """Clear preloaded eclasses that don't match a given eclass cache.
+
+        Preloaded eclasses are used by name without consulting the python side,
+        so processors reused for a different eclass stack must drop them.
+        """
+        if cache is self._preload_cache or not self._preloaded_eclasses:
+            return
+        ec = cache.eclasses
+        for eclass, path in self._preloaded_eclasses.items():
+            if (data := ec.get(eclass)) is None or data.path != path:
+                self.clear_preloaded_eclasses()
+                break
+        self._preload_cache = cache
+
     def preload_eclasses(self, cache, async_req=False, limited_to=None):
         """Preload an eclass stack's eclasses into bash functions.
 
@@ -622,21 +884,74 @@ class EbuildProcessor:
         (which is heavily inherited) speeds up regen times for
         example.
 
-        :param ec_file: filepath of eclass to preload
+        :param cache: :obj:`pkgcore.ebuild.eclass_cache` instance
+        :param limited_to: names of the eclasses to preload, defaults to all
         :return: boolean, True for success
         """
+        self._check_preloaded_eclasses(cache)
         ec = cache.eclasses
+        index = getattr(cache, "index", None)
         if limited_to:
+            if index is not None:
+                # preload the eclasses inherited by those requested as well
+                limited_to = index.inherit_graph(cache, limited_to)
             i = ((eclass, ec[eclass]) for eclass in limited_to)
         else:
             i = cache.eclasses.items()
+        eclasses = {}
         for eclass, data in i:
             if data.path != self._preloaded_eclasses.get(eclass):
-                if self._preload_eclass(data.path, async_req=True):
-                    self._preloaded_eclasses[eclass] = data.path
+                if os.path.exists(data.path):
+                    eclasses[eclass] = data.path
+                else:
+                    logger.error(f"failed: {data.path}")
+        # preload in a single round trip, paths are whitespace separated
+        batch = {k: v for k, v in eclasses.items() if len(v.split()) == 1}
+        # eclasses that passed syntax checks before are preloaded unchecked
+        verified, chksums = {}, {}
+        success = True
+        if index is not None and batch:
+            try:
+                chksums = {k: index.chksum(v) for k, v in batch.items()}
+            except EnvironmentError as e:
+                logger.warning(f"failed checksumming eclasses: {e}")
+            valid = index.get_many("valid", chksums.values())
+            verified = {k: v for k, v in batch.items() if chksums.get(k) in valid}
+            batch = {k: v for k, v in batch.items() if k not in verified}
+        batches = []
+        if verified:
+            self.write(f"preload_verified_eclass {' '.join(verified.values())}")
+            self.expect("preload_eclass succeeded", async_req=True, flush=True)
+            batches.append(verified)
+        if batch:
+            self.write(f"preload_eclass {' '.join(batch.values())}")
+            self.expect("preload_eclass succeeded", async_req=True, flush=True)
+            batches.append(batch)
+        preloaded = {}
+        if batches:
+            # eclasses are only recorded once their batch is known to succeed
+            results = self._consume_async_results()
+            if not all(results[: -len(batches)]):
+                success = False
+            for eclass_batch, result in zip(batches, results[-len(batches) :]):
+                if result:
+                    preloaded.update(eclass_batch)
+            if chksums and (checked := preloaded.keys() & batch.keys()):
+                index.update("valid", {chksums[k]: True for k in checked})
+            self._preloaded_eclasses.update(preloaded)
+        # failed batches stop at the first broken eclass, so those are preloaded
+        # one at a time along with the eclasses that couldn't be batched
+        for eclass, path in eclasses.items():
+            if eclass in preloaded:
+                continue
+            if self._preload_eclass(path):
+                self._preloaded_eclasses[eclass] = path
+            else:
+                success = False
+        self._preload_cache = cache
         if not async_req:
-            return self._consume_async_expects()
-        return True
+            return self._consume_async_expects() and success
+        return success
 
     def allow_eclass_caching(self):
         self._eclass_caching = True
@@ -823,6 +1138,7 @@ class EbuildProcessor:
         # ebuild is not allowed to run any external programs during
         # depend phases; use /dev/null since "" == "."
         self._ensure_metadata_paths(("/dev/null",))
+        self._check_preloaded_eclasses(eclass_cache)
 
         env = expected_ebuild_env(package_inst, env, depends=True)
         data = self._generate_env_str(env)
@@ -910,6 +1226,87 @@ class EbuildProcessor:
 
         return metadata_keys
 
+    def _depend_env_str(self, eapi):
+        """Return the depend phase env shared by all ebuilds of an EAPI."""
+        if (data := self._depend_envs.get(eapi)) is None:
+            env = {
+                "PKGCORE_EBUILD_PHASES": tuple(eapi.phases.values()),
+                "PKGCORE_METADATA_KEYS": tuple(eapi.metadata_keys),
+            }
+            env.update(eapi.ebd_env)
+            for key in e_const.PKGCORE_DEBUG_VARS:
+                val = os.environ.get(key)
+                if val is not None:
+                    env[key] = val
+            data = self._depend_envs[eapi] = self._generate_env_str(env)
+        return data
+
+    def get_keys_batch(self, pkgs, eclass_cache):
+        """Request the metadata be regenerated from multiple ebuilds.
+
+        All ebuilds are sent in a single request with the env shared by their
+        EAPI only sent once, the daemon streaming back the keys of each
+        ebuild in order.
+
+        :param pkgs: sequence of :obj:`pkgcore.ebuild.ebuild_src.package`
+            instances using the same EAPI
+        :param eclass_cache: :obj:`pkgcore.ebuild.eclass_cache` instance to use
+            for eclass access
+        :return: list of (package, metadata) pairs with metadata being a dict
+            when successful or the raised :obj:`ProcessorError` when failed;
+            if the processor dies, packages after the failing one are omitted
+        """
+        if not pkgs:
+            return []
+        eapi = pkgs[0].eapi
+        if any(pkg.eapi is not eapi for pkg in pkgs):
+            raise ValueError("batched packages must use the same EAPI")
+
+        # ebuild is not allowed to run any external programs during
+        # depend phases; use /dev/null since "" == "."
+        self._ensure_metadata_paths(("/dev/null",))
+        self._check_preloaded_eclasses(eclass_cache)
+
+        base = self._depend_env_str(eapi)
+        data = [f"gen_metadata_batch {len(pkgs)} {len(base)}\n{base}"]
+        for pkg in pkgs:
+            env = self._generate_env_str(_package_env(pkg))
+            data.append(f"{len(env)}\n{env}")
+        self.write("".join(data), append_newline=False)
+
+        updates = None
+        if self._eclass_caching:
+            updates = set()
+        results = []
+        for pkg in pkgs:
+            metadata_keys = {}
+
+            def receive_key(self, line):
+                line = line.split("=", 1)
+                if len(line) != 2:
+                    raise FinishedProcessing(True)
+                metadata_keys[line[0]] = line[1]
+
+            commands = {
+                "key": receive_key,
+                "request_inherit": partial(
+                    inherit_handler, eclass_cache, updates=updates
+                ),
+            }
+            try:
+                self.generic_handler(additional_commands=commands)
+            except ProcessorError as e:
+                results.append((pkg, e))
+                if not self.pid:
+                    # processor was shut down, dropping the remaining ebuilds
+                    break
+                continue
+            results.append((pkg, metadata_keys))
+
+        if updates and self.pid:
+            self.preload_eclasses(eclass_cache, limited_to=updates, async_req=True)
+        return results
+
     # this basically handles all hijacks from the daemon, whether
     # confcache or portageq.
     def generic_handler(self, additional_commands=None):
@@ -981,6 +1378,85 @@ class EbuildProcessor:
             self.unlock()
 
 
+class ForkedEbuildProcessor(EbuildProcessor):
+    """Processor forked from another processor's running daemon.
+
+    Forked processors start with the functions and preloaded eclasses of the
+    daemon they're forked from, skipping sourcing the ebd core and eclasses.
+    Since the forked daemon isn't a child of the python side, communication
+    occurs over fifos and the daemon it's forked from handles reaping it.
+    """
+
+    def __init__(self, server):
+        """
+        :param server: :obj:`EbuildProcessor` instance to fork from
+        """
+        self.lock()
+        start = time.perf_counter()
+        self._setup_state(server.userpriv, server.sandbox)
+        self._readonly_vars = server._readonly_vars
+        if server.sandbox:
+            self._EbuildProcessor__sandbox_log = server._EbuildProcessor__sandbox_log
+        self._preloaded_eclasses = server._preloaded_eclasses.copy()
+        self._preload_cache = server._preload_cache
+
+        tmpdir = tempfile.mkdtemp(prefix="pkgcore-ebd-")
+        try:
+            read_path = pjoin(tmpdir, "read")
+            write_path = pjoin(tmpdir, "write")
+            for path in (read_path, write_path):
+                os.mkfifo(path, 0o600)
+            if server.userpriv:
+                for path in (tmpdir, read_path, write_path):
+                    os.chown(path, os_data.portage_uid, os_data.portage_gid)
+            self.pid = server._fork_daemon(read_path, write_path)
+            # opened in the same order as the forked daemon to avoid deadlocking
+            self.ebd_write = open(read_path, "w")
+            self.ebd_read = open(write_path, "r")
+        finally:
+            shutil.rmtree(tmpdir)
+
+        # verify the forked daemon is running
+        self.write("alive")
+        if not self.expect("yep!"):
+            raise InternalError(
+                "expected 'yep!' response from forked ebd, which wasn't received"
+            )
+        self.spawn_time = time.perf_counter() - start
+        self.unlock()
+
+    @property
+    def is_alive(self):
+        """Return whether the processor is alive."""
+        current_pid = self.pid
+        if current_pid:
+            try:
+                os.kill(current_pid, 0)
+                return True
+            except ProcessLookupError:
+                pass
+            self.pid = False
+        return False
+
+    def shutdown_processor(self, force=False, ignore_keyboard_interrupt=False):
+        """Tell the daemon to shut itself down, and mark this instance as dead."""
+        if self.pid is None:
+            return
+        if not force:
+            try:
+                if self.is_responsive:
+                    self.write("shutdown_daemon", disable_runtime_exceptions=True)
+            except (EnvironmentError, ValueError):
+                force = True
+        if force and self.pid:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(self.pid, signal.SIGKILL)
+        for f in (self.ebd_write, self.ebd_read):
+            with contextlib.suppress(EnvironmentError):
+                f.close()
+        self.pid = None
+
+
 def inherit_handler(ecache, ebp, line=None, updates=None):
     """Callback for implementing inherit digging into eclass_cache.
 
@@ -1011,13 +1487,8 @@ def inherit_handler(ecache, ebp, line=None, updates=None):
         updates.add(line)
 
 
-# TODO: move to base wrapped pkg class once they're reworked
-def expected_ebuild_env(pkg, d=None, env_source_override=None, depends=False):
-    """Setup expected ebuild vars.
-
-    :param d: if None, generates a dict, else modifies a passed in mapping
-    :return: mapping
-    """
+def _package_env(pkg, d=None, env_source_override=None):
+    """Setup package specific ebuild vars."""
     if d is None:
         d = {}
     d["CATEGORY"] = pkg.category
@@ -1037,6 +1508,17 @@ def expected_ebuild_env(pkg, d=None, env_source_override=None, depends=False):
         else:
             # binpkgs don't have ebuild paths
             d["EBUILD"] = ""
+    return d
+
+
+# TODO: move to base wrapped pkg class once they're reworked
+def expected_ebuild_env(pkg, d=None, env_source_override=None, depends=False):
+    """Setup expected ebuild vars.
+
+    :param d: if None, generates a dict, else modifies a passed in mapping
+    :return: mapping
+    """
+    d = _package_env(pkg, d, env_source_override)
 
     # add EAPI specific settings
     d.update(pkg.eapi.ebd_env)
@@ -0,0 +1,113 @@
+"""
+record of the ebuild and eclass state a metadata cache was regenerated against
+
+Validating a metadata cache entry requires hashing its ebuild and checking
+the chksums of every inherited eclass. For incremental regeneration this state
+tracks the ebuild and eclass mtimes seen during the last regen along with the
+eclasses each package inherited, allowing the entries affected by changes to
+be determined via stat() calls and a reverse eclass to package lookup.
+"""
+
+__all__ = ("RegenState",)
+
+from ..util.json_file import JsonFile
+
+
+class RegenState(JsonFile):
+    """Ebuild and eclass state recorded for a metadata cache.
+
+    Packages are stored with their ebuild mtime and inherited eclasses, while
+    eclasses are stored with their mtime alone; packages are looked up by
+    eclass through an inverted copy built on demand.
+    """
+
+    description = "regen state"
+
+    def __init__(self, path):
+        """
+        :param path: file the state is stored in
+        """
+        super().__init__(path)
+        self._consumers = None
+
+    @property
+    def exists(self):
+        """Boolean signifying whether usable state was previously recorded."""
+        return bool(self._data)
+
+    def ebuild_mtimes(self, pkgs):
+        """Return a mapping of package CPV strings to their ebuild's mtime."""
+        return {pkg.cpvstr: self._mtime(pkg.path) for pkg in pkgs}
+
+    def eclass_mtimes(self, eclass_cache):
+        """Return a mapping of eclass names to their file's mtime."""
+        eclasses = eclass_cache.eclasses
+        return {name: self._mtime(eclasses[name].path) for name in eclasses}
+
+    def eclass_index(self):
+        """Return a mapping of eclasses to the packages recorded as inheriting them."""
+        if self._consumers is None:
+            consumers = {}
+            for cpv, (_mtime, inherited) in self._data.get("packages", {}).items():
+                for name in inherited:
+                    consumers.setdefault(name, set()).add(cpv)
+            self._consumers = {k: frozenset(v) for k, v in consumers.items()}
+        return self._consumers
+
+    def consumers(self, eclass):
+        """Return the packages recorded as inheriting a given eclass."""
+        return self.eclass_index().get(eclass, frozenset())
+
+    def stale(self, pkgs, ebuild_mtimes, eclass_mtimes, cache):
+        """Return the packages with potentially outdated cache entries.
+
+        Packages are stale when their ebuild or any inherited eclass changed
+        since the state was recorded, or their cache entry is missing.
+
+        :param pkgs: packages to check
+        :param ebuild_mtimes: mapping as returned by :obj:`ebuild_mtimes`
+        :param eclass_mtimes: mapping as returned by :obj:`eclass_mtimes`
+        :param cache: cache the state was recorded for
+        """
+        if not self.exists:
+            return list(pkgs)
+        old_eclasses = self._data["eclasses"]
+        affected = set()
+        for name in old_eclasses.keys() | eclass_mtimes.keys():
+            if old_eclasses.get(name) != eclass_mtimes.get(name):
+                affected.update(self.consumers(name))
+        packages = self._data["packages"]
+        stale = []
+        for pkg in pkgs:
+            cpv = pkg.cpvstr
+            entry = packages.get(cpv)
+            if (
+                entry is None
+                or cpv in affected
+                or entry[0] != ebuild_mtimes.get(cpv)
+                or cpv not in cache
+            ):
+                stale.append(pkg)
+        return stale
+
+    def update(self, ebuild_mtimes, eclass_mtimes, inherited):
+        """Record new state and write it out.
+
+        Mtimes should be collected before regenerating so changes made during
+        regen are detected on the next run.
+
+        :param ebuild_mtimes: mapping as returned by :obj:`ebuild_mtimes`
+        :param eclass_mtimes: mapping as returned by :obj:`eclass_mtimes`
+        :param inherited: mapping of CPV strings to the eclasses they inherit
+            for packages with updated cache entries, other packages retain
+            their previously recorded eclasses
+        """
+        old_packages = self._data.get("packages", {})
+        packages = {}
+        for cpv, mtime in ebuild_mtimes.items():
+            if cpv in inherited:
+                packages[cpv] = (mtime, sorted(inherited[cpv]))
+            elif cpv in old_packages:
+                packages[cpv] = (mtime, old_packages[cpv][1])
+        self._write({"eclasses": eclass_mtimes, "packages": packages})
+        self._consumers = None
@@ -0,0 +1,117 @@
+"""
+persistent index of an ebuild repo's package directory layout
+
+Listing every category and package directory on startup is slow for large
+repos, especially on cold caches. This index stores the package and version
+listings alongside the mtime of the directory they were read from, allowing
+entries to be revalidated via a single stat() call instead of a listdir().
+"""
+
+__all__ = ("PackageIndex", "package_versions")
+
+import time
+from os.path import join as pjoin
+
+from snakeoil.osutils import listdir_dirs, listdir_files
+
+from ..util.json_file import JsonFile
+
+
+def package_versions(path, package, extension=".ebuild"):
+    """Return the versions of the ebuilds in a package directory.
+
+    Versions aren't validated, invalid ones are reported when their packages
+    are instantiated.
+
+    :param path: on disk location of the package directory
+    :param package: package name
+    :param extension: file extension of packages in the repo
+    """
+    prefix = f"{package}-"
+    lp = len(prefix)
+    ext_len = -len(extension)
+    return tuple(
+        x[lp:ext_len]
+        for x in listdir_files(path)
+        if x[ext_len:] == extension and x[:lp] == prefix
+    )
+
+
+class PackageIndex(JsonFile):
+    """Category to package to version index for an ebuild repo.
+
+    Package listings are keyed to their category directory's mtime and version
+    listings to their package directory's mtime; a None lookup means the repo
+    must be listed directly.
+    """
+
+    description = "package index"
+
+    def __init__(self, location, path, extension=".ebuild", ignore=frozenset()):
+        """
+        :param location: on disk location of the repo
+        :param path: file the index is stored in
+        :param extension: file extension of packages in the repo
+        :param ignore: top level directories that aren't categories
+        """
+        super().__init__(path)
+        self.location = location
+        self.extension = extension
+        self.ignore = frozenset(ignore)
+
+    @property
+    def _categories(self):
+        return self._data.get("categories", {})
+
+    def packages(self, category):
+        """Return the packages of a category, or None if the entry is stale."""
+        entry = self._categories.get(category)
+        if (
+            entry is None
+            or entry[0] is None
+            or entry[0] != self._mtime(pjoin(self.location, category))
+        ):
+            return None
+        return tuple(entry[1])
+
+    def versions(self, category, package):
+        """Return the versions of a package, or None if the entry is stale."""
+        entry = self._categories.get(category)
+        if entry is None:
+            return None
+        entry = entry[2].get(package)
+        if entry is None or entry[0] != self._mtime(
+            pjoin(self.location, category, package)
+        ):
+            return None
+        return tuple(entry[1])
+
+    def _scan(self):
+        # Directories modified within the last second could change again
+        # without altering their mtime on filesystems with coarse timestamps,
+        # so they're left out and always rescanned.
+        cutoff = time.time_ns() - 1_000_000_000
+        categories = {}
+        for category in sorted(listdir_dirs(self.location)):
+            if category.startswith(".") or category in self.ignore:
+                continue
+            cpath = pjoin(self.location, category)
+            mtime = self._mtime(cpath)
+            packages = sorted(listdir_dirs(cpath))
+            versions = {}
+            for package in packages:
+                ppath = pjoin(cpath, package)
+                pkg_mtime = self._mtime(ppath)
+                if pkg_mtime is not None and pkg_mtime < cutoff:
+                    versions[package] = (
+                        pkg_mtime,
+                        sorted(package_versions(ppath, package, self.extension)),
+                    )
+            if mtime is not None and mtime >= cutoff:
+                mtime = None
+            categories[category] = (mtime, packages, versions)
+        return categories
+
+    def update(self):
+        """Regenerate the index from the repo's directories and write it out."""
+        self._write({"categories": self._scan()})
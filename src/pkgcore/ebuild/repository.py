@@ -20,7 +20,7 @@ from snakeoil.data_source import local_source
 from snakeoil.fileutils import readlines_utf8
 from snakeoil.mappings import ImmutableDict
 from snakeoil.obj import make_kls
-from snakeoil.osutils import listdir_dirs, listdir_files
+from snakeoil.osutils import listdir_dirs
 from snakeoil.sequences import iflatten_instance, stable_unique
 from snakeoil.strings import pluralism
 
@@ -32,14 +32,50 @@ from ..operations import repo as _repo_ops
 from ..package import errors as pkg_errors
 from ..repository import configured, errors, prototype, util
 from ..repository.virtual import RestrictionRepo
-from ..restrictions import packages
+from ..restrictions import packages, restriction
+from ..restrictions.util import collect_package_restrictions
 from ..util import packages as pkgutils
-from . import cpv, digest, ebd, ebuild_src, processor, repo_objs, restricts
+from . import (
+    cpv,
+    digest,
+    ebd,
+    ebuild_src,
+    processor,
+    repo_index,
+    repo_objs,
+    restricts,
+)
 from . import eclass_cache as eclass_cache_mod
 from . import errors as ebuild_errors
+from . import regen_state as regen_state_mod
 from .atom import atom
 from .eapi import get_eapi
 
+# package attrs matched without loading metadata
+_cpv_attrs = frozenset(
+    (
+        "category",
+        "package",
+        "key",
+        "cpvstr",
+        "fullver",
+        "version",
+        "revision",
+        "repo.repo_id",
+    )
+)
+
+
+def _matches_metadata(restrict):
+    """Determine if matching a restriction requires package metadata."""
+    for r in collect_package_restrictions(restrict):
+        if isinstance(r, restriction.AlwaysBool):
+            continue
+        attrs = getattr(r, "attrs", None)
+        if attrs is None or not _cpv_attrs.issuperset(attrs):
+            return True
+    return False
+
 
 class repo_operations(_repo_ops.operations):
     def _cmd_implementation_manifest(
@@ -378,6 +414,7 @@ class UnconfiguredTree(prototype.tree):
         )
         self._shared_pkg_cache = WeakValueDictionary()
         self._bad_masked = RestrictionRepo(repo_id="bad_masked")
+        self._eclass_usage = None
         self.projects_xml = repo_objs.LocalProjectsXml(
             pjoin(self.location, "metadata", "projects.xml")
         )
@@ -526,7 +563,65 @@ class UnconfiguredTree(prototype.tree):
             return categories
         return self.category_dirs
 
+    @klass.jit_attr
+    def pkg_index(self):
+        """Persistent index of the repo's package and version directories.
+
+        Stored alongside the first on-disk metadata cache, None if the repo
+        lacks one.
+        """
+        for cache in self.cache:
+            if (location := getattr(cache, "location", None)) is not None:
+                return repo_index.PackageIndex(
+                    self.location,
+                    pjoin(location, ".pkgcore-index.json"),
+                    extension=self.extension,
+                    ignore=self.false_categories,
+                )
+        return None
+
+    @klass.jit_attr
+    def regen_state(self):
+        """Ebuild and eclass state the first writable cache was regenerated against."""
+        for cache in self.cache:
+            if not cache.readonly:
+                # state is stored alongside the cache, in-memory caches lack it
+                if (location := getattr(cache, "location", None)) is None:
+                    break
+                return regen_state_mod.RegenState(
+                    pjoin(location, ".pkgcore-regen.json")
+                )
+        return None
+
+    def eclass_usage(self):
+        """Return a mapping of eclasses to the CPVs of packages inheriting them.
+
+        All packages in the repo are included, see
+        :py:meth:`pkgcore.ebuild.eclass_cache.base.eclass_usage`. The mapping is
+        regenerated on every call and reused by :py:meth:`eclass_consumers`.
+        """
+        pkgs = self.itermatch(packages.AlwaysTrue, pkg_filter=None)
+        cache = next((x for x in self.cache if not x.readonly), None)
+        self._eclass_usage = self.eclass_cache.eclass_usage(
+            pkgs, self.regen_state, cache
+        )
+        return self._eclass_usage
+
+    def eclass_consumers(self, eclass):
+        """Return the CPVs of packages inheriting a given eclass.
+
+        The usage mapping is generated on first use and reused afterwards, call
+        :py:meth:`eclass_usage` to refresh it.
+        """
+        if (usage := self._eclass_usage) is None:
+            usage = self.eclass_usage()
+        return usage.get(eclass, frozenset())
+
     def _get_packages(self, category):
+        if self.pkg_index is not None and (
+            (pkgs := self.pkg_index.packages(category)) is not None
+        ):
+            return pkgs
         cpath = pjoin(self.base, category.lstrip(os.path.sep))
         try:
             return tuple(listdir_dirs(cpath))
@@ -545,17 +640,13 @@ class UnconfiguredTree(prototype.tree):
 
         Ebuilds with mismatched or invalid package names are ignored.
         """
+        if self.pkg_index is not None and (
+            (versions := self.pkg_index.versions(*catpkg)) is not None
+        ):
+            return versions
         cppath = pjoin(self.base, catpkg[0], catpkg[1])
-        pkg = f"{catpkg[-1]}-"
-        lp = len(pkg)
-        extension = self.extension
-        ext_len = -len(extension)
         try:
-            return tuple(
-                x[lp:ext_len]
-                for x in listdir_files(cppath)
-                if x[ext_len:] == extension and x[:lp] == pkg
-            )
+            return repo_index.package_versions(cppath, catpkg[1], self.extension)
         except EnvironmentError as e:
             raise KeyError(
                 "failed fetching versions for package %s: %s"
@@ -602,11 +693,37 @@ class UnconfiguredTree(prototype.tree):
                     continue
                 yield pkg
 
-    def itermatch(self, *args, **kwargs):
+    def _prefetch_metadata(self, pkg_filter, pkgs):
+        """Filter packages with their cache entries batch loaded."""
+        batch = []
+        error = None
+        try:
+            batch.extend(pkgs)
+        except pkg_errors.PackageError as e:
+            # defer invalid cpvs until the preceding pkgs have been yielded
+            error = e
+
+        def iter_pkgs():
+            yield from batch
+            if error is not None:
+                raise error
+
+        with self.package_class.prefetched(batch):
+            yield from pkg_filter(iter_pkgs())
+
+    def itermatch(self, restrict, *args, **kwargs):
         raw = "raw_pkg_cls" in kwargs or not kwargs.get("versioned", True)
         error_callback = kwargs.pop("error_callback", None)
         kwargs.setdefault("pkg_filter", partial(self._pkg_filter, raw, error_callback))
-        return super().itermatch(*args, **kwargs)
+        if (
+            not raw
+            and any(x is not None and x.batched_lookups for x in self.cache)
+            and _matches_metadata(restrict)
+        ):
+            kwargs["pkg_filter"] = partial(
+                self._prefetch_metadata, kwargs["pkg_filter"] or iter
+            )
+        return super().itermatch(restrict, *args, **kwargs)
 
     def _get_ebuild_path(self, pkg):
         return pjoin(
@@ -699,6 +816,7 @@ class UnconfiguredTree(prototype.tree):
             self,
             force=bool(kwds.get("force", False)),
             eclass_caching=bool(kwds.get("eclass_caching", True)),
+            fork_server=bool(kwds.get("fork_server", False)),
         )
 
     def __getstate__(self):
@@ -787,13 +905,22 @@ def tree(
 
 
 class _RegenOpHelper:
-    def __init__(self, repo, force=False, eclass_caching=True):
+    def __init__(self, repo, force=False, eclass_caching=True, fork_server=False):
         self.force = force
         self.eclass_caching = eclass_caching
-        self.ebp = self.request_ebp()
+        # fork processors from a server with the repo's eclasses preloaded
+        self.eclass_cache = repo.eclass_cache if fork_server else None
+        self._ebp = None
+
+    @property
+    def ebp(self):
+        # requested on first use since cache writing helpers never need one
+        if self._ebp is None:
+            self._ebp = self.request_ebp()
+        return self._ebp
 
     def request_ebp(self):
-        ebp = processor.request_ebuild_processor()
+        ebp = processor.request_ebuild_processor(eclass_cache=self.eclass_cache)
         if self.eclass_caching:
             ebp.allow_eclass_caching()
         return ebp
@@ -803,13 +930,89 @@ class _RegenOpHelper:
             return pkg._fetch_metadata(ebp=self.ebp, force_regen=self.force)
         except pkg_errors.MetadataException:
             # ebuild processor is dead, so force a replacement request
-            self.ebp = self.request_ebp()
+            self._ebp = self.request_ebp()
             raise
 
+    def regen_batch(self, pkgs):
+        """Regenerate the metadata of multiple packages, writing it to the cache.
+
+        Stale packages are sourced via batched processor requests, one per
+        EAPI in use.
+
+        :return: iterable of (pkg, exception) pairs for failures
+        """
+        batches = {}
+        for pkg in pkgs:
+            factory = pkg._parent
+            if not self.force and factory._get_cached_metadata(pkg) is not None:
+                continue
+            if not pkg.eapi.supported:
+                continue
+            batches.setdefault((factory, pkg.eapi), []).append(pkg)
+
+        for (factory, _eapi), batch in batches.items():
+            while batch:
+                results = factory._generate_metadata_batch(batch, self.ebp)
+                for pkg, data in results:
+                    if isinstance(data, pkg_errors.MetadataException):
+                        # handled at a higher level by scanning for metadata
+                        # masked pkgs after regen has completed
+                        continue
+                    try:
+                        factory._store_metadata(pkg, data)
+                    except Exception as e:
+                        yield pkg, e
+                if not self.ebp.is_alive:
+                    # ebuild processor is dead, so force a replacement request
+                    self._ebp = self.request_ebp()
+                if not results:
+                    break
+                batch = batch[len(results) :]
+
+    def generate(self, pkg):
+        """Regenerate a package's metadata without writing it to the cache.
+
+        Invalid cache entries are left for the cache writer to remove via
+        :obj:`prune` since only it may modify the cache.
+
+        :return: tuple of the metadata to store, or None if there's nothing to
+            store, and a boolean signifying whether the package's cache
+            entries are stale
+        """
+        factory = pkg._parent
+        if not self.force:
+            if factory._get_cached_metadata(pkg, prune=False) is not None:
+                return None, False
+        if not pkg.eapi.supported:
+            return None, True
+        try:
+            data = factory._generate_metadata(pkg, ebp=self.ebp)
+        except pkg_errors.MetadataException:
+            self._ebp = self.request_ebp()
+            raise
+        factory._prime_metadata_chksums(data)
+        return data, True
+
+    def prune(self, pkg):
+        """Remove a package's invalid cache entries left by :obj:`generate`."""
+        pkg._parent._get_cached_metadata(pkg)
+
+    def store(self, pkg, data):
+        """Write metadata generated via :obj:`generate` to the cache."""
+        pkg._parent._store_metadata(pkg, data)
+
+    def finish(self):
+        """Shut down the helper's processor instead of releasing it for reuse."""
+        if self._ebp is not None:
+            processor.drop_ebuild_processor(self._ebp)
+            self._ebp.shutdown_processor()
+            self._ebp = None
+
     def __del__(self):
-        if self.eclass_caching:
-            self.ebp.disable_eclass_caching()
-        processor.release_ebuild_processor(self.ebp)
+        if self._ebp is not None:
+            if self.eclass_caching:
+                self._ebp.disable_eclass_caching()
+            processor.release_ebuild_processor(self._ebp)
 
 
 class ConfiguredTree(configured.tree):
@@ -154,6 +154,39 @@ class VersionMatch(packages.PackageRestriction):
     def match(self, pkg, *args, **kwds):
         return self.restriction.match(pkg)
 
+    def compile_match(self):
+        if self.__class__.match is not VersionMatch.match:
+            # derivatives overriding matching
+            return self.match
+        r = self.restriction
+        ver, rev, vals, negate = r.ver, r.rev, r.vals, r.negate
+        ver_cmp = cpv.ver_cmp
+        # identical versions always compare equal, skipping ver_cmp()
+        equal = (0 in vals) != negate
+
+        if r.droprev:
+
+            def match(pkg, *args, **kwds):
+                version = pkg.version
+                if version is None:
+                    return False
+                if version == ver:
+                    return equal
+                return (ver_cmp(version, None, ver, None) in vals) != negate
+
+        else:
+
+            def match(pkg, *args, **kwds):
+                revision = pkg.revision
+                version = pkg.version
+                if version is None:
+                    return False
+                if version == ver and revision == rev:
+                    return equal
+                return (ver_cmp(version, revision, ver, rev) in vals) != negate
+
+        return match
+
 
 class SlotDep(packages.PackageRestriction):
     __slots__ = ()
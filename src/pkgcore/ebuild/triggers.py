@@ -27,8 +27,9 @@ from snakeoil.sequences import iflatten_instance, stable_unique
 
 from .. import os_data
 from ..fs import livefs
+from ..fs.contents import contentsSet
 from ..merge import const, errors, triggers
-from ..restrictions import values
+from ..restrictions import packages, values
 from ..system import libtool
 
 colon_parsed = frozenset(
@@ -487,14 +488,31 @@ class ProtectOwned(FileCollision):
         self.vdb = vdb
 
     def collision(self, colliding):
-        real_pkgs = (pkg for repo in self.vdb for pkg in repo if pkg.package_is_real)
         collisions = {}
+        real_pkgs = packages.PackageRestriction(
+            "package_is_real", values.EqualityMatch(True)
+        )
 
-        # TODO: worth parallelizing this vdb scanning?
-        for pkg in real_pkgs:
-            pkg_file_collisions = pkg.contents.intersection(colliding)
-            if pkg_file_collisions:
-                collisions[pkg.cpvstr] = pkg_file_collisions
+        for repo in self.vdb:
+            if (owners := getattr(repo, "owners", None)) is not None:
+                # use the repo's file ownership index when available
+                owned = {}
+                for path, cpvs in owners(x.location for x in colliding).items():
+                    for cpvstr in cpvs:
+                        owned.setdefault(cpvstr, []).append(colliding[path])
+                restrict = packages.AndRestriction(
+                    real_pkgs,
+                    packages.PackageRestriction(
+                        "cpvstr", values.FunctionRestriction(owned.__contains__)
+                    ),
+                )
+                for pkg in repo.itermatch(restrict):
+                    collisions[pkg.cpvstr] = contentsSet(owned[pkg.cpvstr])
+                continue
+            for pkg in repo.itermatch(real_pkgs):
+                pkg_file_collisions = pkg.contents.intersection(colliding)
+                if pkg_file_collisions:
+                    collisions[pkg.cpvstr] = pkg_file_collisions
 
         if collisions:
             pkg_collisions = [
@@ -37,6 +37,14 @@ def check_instance(obj):
     return obj.location, obj
 
 
+def _from_dict(d, mutable):
+    """Create a contentsSet from a location to fs obj mapping, skipping checks."""
+    cset = contentsSet()
+    cset._dict = d
+    cset.mutable = mutable
+    return cset
+
+
 class contentsSet(GenericEquality):
     """set of :class:`pkgcore.fs.fs.fsBase` objects"""
 
@@ -125,6 +133,14 @@ class contentsSet(GenericEquality):
             raise AttributeError(f"{self.__class__} is frozen; no clear functionality")
         self._dict.clear()
 
+    def _keys(self):
+        """Return a set-like view of the locations in the set."""
+        return self._dict.keys()
+
+    def _items(self):
+        """Return an iterable of location, fs obj pairs in the set."""
+        return self._dict.items()
+
     @staticmethod
     def _convert_loc(iterable):
         f = fs.isfs_obj
@@ -142,46 +158,70 @@ class contentsSet(GenericEquality):
                 raise ValueError(f"must be an fsBase derivative: got {x!r}")
             yield x
 
+    # Operations against other contentsSet instances work directly on their
+    # location keys, avoiding per object type checks and path normalization.
+
     def difference(self, other):
-        if not hasattr(other, "__contains__"):
+        if isinstance(other, contentsSet):
+            other = other._keys()
+        elif not hasattr(other, "__contains__"):
             other = set(self._convert_loc(other))
-        return contentsSet(
-            (x for x in self if x.location not in other), mutable=self.mutable
+        return _from_dict(
+            {k: v for k, v in self._items() if k not in other}, self.mutable
         )
 
     def difference_update(self, other):
         if not self.mutable:
             raise TypeError(f"immutable type {self!r}")
 
+        if isinstance(other, contentsSet):
+            d = self._dict
+            for k in d.keys() & other._keys():
+                del d[k]
+            return
+
         rem = self.remove
         for x in other:
             if x in self:
                 rem(x)
 
     def intersection(self, other):
+        if isinstance(other, contentsSet):
+            keys = self._keys()
+            return _from_dict(
+                {k: v for k, v in other._items() if k in keys}, self.mutable
+            )
         return contentsSet((x for x in other if x in self), mutable=self.mutable)
 
     def intersection_update(self, other):
         if not self.mutable:
             raise TypeError(f"immutable type {self!r}")
-        if not hasattr(other, "__contains__"):
+        if isinstance(other, contentsSet):
+            other = other._keys()
+        elif not hasattr(other, "__contains__"):
             other = set(self._convert_loc(other))
 
-        l = [x for x in self if x.location not in other]
-        for x in l:
-            self.remove(x)
+        d = self._dict
+        for k in [k for k in d if k not in other]:
+            del d[k]
 
     def issubset(self, other):
+        if isinstance(other, contentsSet):
+            return self._keys() <= other._keys()
         if not hasattr(other, "__contains__"):
             other = set(self._convert_loc(other))
         return all(x in other for x in self._dict)
 
     def issuperset(self, other):
+        if isinstance(other, contentsSet):
+            return self._keys() >= other._keys()
         if not hasattr(other, "__contains__"):
             other = set(self._convert_loc(other))
         return all(x in self for x in other)
 
     def isdisjoint(self, other):
+        if isinstance(other, contentsSet):
+            return self._keys().isdisjoint(other._keys())
         if not hasattr(other, "__contains__"):
             other = set(self._convert_loc(other))
         return not any(x in other for x in self._dict)
@@ -207,6 +247,13 @@ class contentsSet(GenericEquality):
     def symmetric_difference_update(self, other):
         if not self.mutable:
             raise TypeError(f"immutable type {self!r}")
+        if isinstance(other, contentsSet):
+            d = self._dict
+            common = d.keys() & other._keys()
+            d.update((k, v) for k, v in other._items() if k not in common)
+            for k in common:
+                del d[k]
+            return
         if not hasattr(other, "__contains__"):
             other = contentsSet(self._ensure_fsbase(other))
         l = []
@@ -223,6 +270,9 @@ class contentsSet(GenericEquality):
         del l, rem
 
     def update(self, iterable):
+        if isinstance(iterable, contentsSet):
+            self._dict.update(iterable._items())
+            return
         d = self._dict
         for x in iterable:
             d[x.location] = x
@@ -4,6 +4,7 @@ filesystem entry abstractions
 
 import fnmatch
 import stat
+import sys
 from functools import total_ordering
 from os.path import abspath, basename, dirname, normpath, realpath
 from os.path import join as pjoin
@@ -66,7 +67,9 @@ class fsBase(immutable.Simple):
     )
 
     def __init__(self, location, strict=True, **d):
-        d["location"] = normpath(location)
+        # csets of the same package share paths, and interning speeds up
+        # the location keyed lookups their set operations are built on
+        d["location"] = sys.intern(normpath(location))
 
         if strict:
             for k in self.__attrs__:
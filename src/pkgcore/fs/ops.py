@@ -6,10 +6,15 @@ Shouldn't be accessed directly for the most part, use
 """
 
 import errno
+import fcntl
 import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from os.path import join as pjoin
 
+from snakeoil.data_source import local_source
 from snakeoil.osutils import ensure_dirs, unlink_if_exists
 from snakeoil.process.spawn import spawn
 
@@ -104,11 +109,99 @@ class CannotOverwrite(FailedCopy):
         return f"cannot write {self.obj} due to {self.existing} existing"
 
 
-def copyfile(obj, mkdirs=False):
+# FICLONE ioctl from linux/fs.h
+_FICLONE = 0x40049409
+
+# errors signifying a kernel copy method is unsupported for the given files
+_unsupported_copy_errnos = frozenset(
+    (
+        errno.EXDEV,
+        errno.ENOSYS,
+        errno.EOPNOTSUPP,
+        errno.ENOTSUP,
+        errno.EINVAL,
+        errno.ENOTTY,
+        errno.EBADF,
+    )
+)
+
+
+def _reflink(src_fd, dst_fd, size):
+    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+
+
+def _copy_file_range(src_fd, dst_fd, size):
+    offset = 0
+    while offset < size:
+        if not (count := os.copy_file_range(src_fd, dst_fd, size - offset)):
+            break
+        offset += count
+
+
+def _sendfile(src_fd, dst_fd, size):
+    offset = 0
+    while offset < size:
+        if not (count := os.sendfile(dst_fd, src_fd, offset, size - offset)):
+            break
+        offset += count
+
+
+# kernel side copy methods in order of preference, falling back to copying
+# through userspace if none are supported
+copy_methods = []
+if sys.platform.startswith("linux"):
+    copy_methods.append(("reflink", _reflink))
+    if hasattr(os, "copy_file_range"):
+        copy_methods.append(("copy_file_range", _copy_file_range))
+    copy_methods.append(("sendfile", _sendfile))
+
+
+def _kernel_copy(src, dest):
+    """Copy a file using the kernel, returning the method used or None."""
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            size = os.fstat(src_fd).st_size
+            for name, func in copy_methods:
+                try:
+                    func(src_fd, dst_fd, size)
+                    return name
+                except OSError as e:
+                    if e.errno not in _unsupported_copy_errnos:
+                        raise
+                    # drop any partially copied data before the next attempt
+                    os.ftruncate(dst_fd, 0)
+                    os.lseek(dst_fd, 0, os.SEEK_SET)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    return None
+
+
+def copy_data(data, path):
+    """Write a data source to a path, copying on the kernel side if possible.
+
+    :param data: :obj:`snakeoil.data_source.base` instance
+    :param path: file path to write to
+    :return: name of the copy method used, one of the names in
+        :obj:`copy_methods` or "copy" if the data was copied through userspace
+    """
+    if copy_methods and isinstance(data, local_source):
+        if (method := _kernel_copy(data.path, path)) is not None:
+            return method
+    data.transfer_to_path(path)
+    return "copy"
+
+
+def copyfile(obj, mkdirs=False, copy_callback=None):
     """
     copy a :class:`pkgcore.fs.fs.fsBase` to its stated location.
 
     :param obj: :class:`pkgcore.fs.fs.fsBase` instance, exempting :class:`fsDir`
+    :param copy_callback: if not None, callable given regular files and the name
+        of the method used to copy their data, see :func:`copy_data`
     :return: true if success, else an exception is thrown
     :raise EnvironmentError: permission errors
 
@@ -142,7 +235,9 @@ def copyfile(obj, mkdirs=False):
         fp = existent_fp = obj.location + "#new"
 
     if fs.isreg(obj):
-        obj.data.transfer_to_path(fp)
+        method = copy_data(obj.data, fp)
+        if copy_callback is not None:
+            copy_callback(obj, method)
     elif fs.issym(obj):
         os.symlink(obj.target, fp)
     elif fs.isfifo(obj):
@@ -197,7 +292,22 @@ def do_link(src, trg):
     return True
 
 
-def merge_contents(cset, offset=None, callback=None):
+def _load_chksums(obj):
+    # chksums are lazily generated for all types in a single pass over the data
+    chksums = obj.chksums
+    for key in chksums.keys():
+        chksums[key]
+        break
+
+
+def _merge_file(obj, copy_callback=None, load_chksums=False):
+    copyfile(obj, mkdirs=True, copy_callback=copy_callback)
+    if load_chksums:
+        # generate chksums while the file data is likely still cached
+        _load_chksums(obj)
+
+
+def merge_contents(cset, offset=None, callback=None, threads=1, copy_callback=None):
     """
     merge a :class:`pkgcore.fs.contents.contentsSet` instance to the livefs
 
@@ -206,6 +316,12 @@ def merge_contents(cset, offset=None, callback=None):
         Think of it as target dir.
     :param callback: callable to report each entry being merged; given a single arg,
         the fs object being merged.
+    :param threads: number of threads to copy regular files and generate their
+        chksums with; directories, symlinks, and hardlinks are still merged
+        in order from the calling thread.
+    :param copy_callback: callable given each copied regular file and the name of
+        the method used to copy it, see :func:`copy_data`. It's called from
+        worker threads when threads is greater than one.
     :raise EnvironmentError: Thrown for permission failures.
     """
 
@@ -252,44 +368,93 @@ def merge_contents(cset, offset=None, callback=None):
             ensure_perms(x)
     del d
 
-    # might look odd, but what this does is minimize the try/except cost
-    # to one time, assuming everything behaves, rather then per item.
-    i = iterate(cset.iterdirs(invert=True))
-    merged_inodes = {}
-    while True:
-        try:
-            for x in i:
-                callback(x)
-
-                if x.is_reg:
-                    key = (x.dev, x.inode)
-                    # This logic could be made smarter- instead of
-                    # blindly trying candidates, we could inspect the st_dev
-                    # of the final location.  This however can be broken by
-                    # overlayfs's potentially.  Brute force is in use either
-                    # way.
-                    candidates = merged_inodes.setdefault(key, [])
-                    if any(
-                        target._can_be_hardlinked(x) and do_link(target, x)
-                        for target in candidates
-                    ):
-                        continue
-                    candidates.append(x)
-
-                copyfile(x, mkdirs=True)
+    if threads > 1:
+        executor = ThreadPoolExecutor(max_workers=threads)
+        merge_file = partial(
+            _merge_file, copy_callback=copy_callback, load_chksums=offset is None
+        )
+    else:
+        executor = None
+    # in-flight file copies, bounded to limit memory usage
+    copies = deque()
+    # file copies hardlinks may be created from
+    link_sources = {}
+    created_dirs = set()
+
+    def wait(future):
+        if future is not None:
+            future.result()
+        return True
 
-            break
-        except CannotOverwrite as cf:
-            if not fs.issym(x):
-                raise
+    def merge_reg(x):
+        if executor is None:
+            copyfile(x, mkdirs=True, copy_callback=copy_callback)
+            return
+        # create missing parent dirs here so workers can't race on them
+        parent = os.path.dirname(x.location)
+        if parent not in created_dirs:
+            if not os.path.exists(parent) and not ensure_dirs(
+                parent, mode=0o750, minimal=True
+            ):
+                raise FailedCopy(x, f"failed creating {parent!r}")
+            created_dirs.add(parent)
+        if len(copies) >= threads * 4:
+            copies.popleft().result()
+        future = executor.submit(merge_file, x)
+        copies.append(future)
+        if x.inode is not None:
+            link_sources[x.location] = future
 
-            # by this time, all directories should've been merged.
-            # thus we can check the target
+    try:
+        # might look odd, but what this does is minimize the try/except cost
+        # to one time, assuming everything behaves, rather then per item.
+        i = iterate(cset.iterdirs(invert=True))
+        merged_inodes = {}
+        while True:
             try:
-                if not fs.isdir(gen_obj(pjoin(x.location, x.target))):
+                for x in i:
+                    callback(x)
+
+                    if x.is_reg:
+                        key = (x.dev, x.inode)
+                        # This logic could be made smarter- instead of
+                        # blindly trying candidates, we could inspect the st_dev
+                        # of the final location.  This however can be broken by
+                        # overlayfs's potentially.  Brute force is in use either
+                        # way.
+                        candidates = merged_inodes.setdefault(key, [])
+                        if any(
+                            target._can_be_hardlinked(x)
+                            and wait(link_sources.get(target.location))
+                            and do_link(target, x)
+                            for target in candidates
+                        ):
+                            continue
+                        candidates.append(x)
+                        merge_reg(x)
+                        continue
+
+                    copyfile(x, mkdirs=True)
+
+                break
+            except CannotOverwrite as cf:
+                # failures from threaded copies are for other entries
+                if not fs.issym(x) or cf.obj is not x:
                     raise
-            except OSError:
-                raise cf
+
+                # by this time, all directories should've been merged.
+                # thus we can check the target
+                try:
+                    if not fs.isdir(gen_obj(pjoin(x.location, x.target))):
+                        raise
+                except OSError:
+                    raise cf
+
+        while copies:
+            copies.popleft().result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
     return True
 
 
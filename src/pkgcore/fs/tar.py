@@ -3,17 +3,24 @@ binpkg tar utilities
 """
 
 import os
+import shutil
 import stat
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from itertools import count
+from os.path import join as pjoin
 
 from snakeoil import compression
 from snakeoil.compatibility import cmp, sorted_cmp
-from snakeoil.data_source import invokable_data_source
+from snakeoil.data_source import bytes_data_source, invokable_data_source, local_source
+from snakeoil.process import CommandNotFound
 
 from . import contents
 from ._tar import tarfile
 from .fs import fsDev, fsDir, fsFifo, fsFile, fsSymlink
+from .ops import copyfile
 
 _unique_inode = count(2**32).__next__
 
@@ -23,15 +30,223 @@ known_compressors = {
     None: tarfile.TarFile.open,
 }
 
+# leading bytes of the compressed streams binpkg tarballs are known to use
+compression_magic = (
+    (b"BZh", "bzip2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
 
-def write_set(
-    contents_set, filepath, compressor="bzip2", absolute_paths=False, parallelize=False
-):
+# default compression levels, snakeoil's level is used for unlisted compressors
+compression_levels = {"zstd": 3}
+
+# members larger than this are written out as they're read rather than being
+# buffered in memory for a worker thread
+max_buffered_member = 16 * 1024 * 1024
+# total size of the members buffered in memory for worker threads
+max_buffered_bytes = 64 * 1024 * 1024
+
+# zstd errors for data trailing its frames, e.g. binpkg xpak segments
+_zstd_trailing_data_errors = ("unsupported format", "unknown header")
+
+
+def _zstd():
+    if (path := shutil.which("zstd")) is None:
+        raise CommandNotFound("zstd")
+    return path
+
+
+def _has_xpak(filepath):
+    """Determine if a file ends with a binpkg xpak segment."""
+    with open(filepath, "rb") as f:
+        try:
+            f.seek(-16, os.SEEK_END)
+        except OSError:
+            # too short to hold an xpak trailer
+            return False
+        trailer = f.read()
+    return trailer[:8] == b"XPAKSTOP" and trailer[12:] == b"STOP"
+
+
+class _ProcessHandle:
+    """
+    file handle piping data to or from a (de)compression process
+
+    Forward seeks are done by reading or writing data, backward seeks for
+    reads restart the process.
+
+    :param filepath: string path to location on disk
+    :param args: command line of the process
+    :param is_read: read decompressed data from the file, otherwise compressed
+        data is written to it
+    :param allowed_errors: error messages the process is allowed to exit
+        nonzero with once all data has been read, e.g. for data trailing the
+        compressed stream
+    """
+
+    def __init__(self, filepath, args, is_read=False, allowed_errors=()):
+        self.filepath = filepath
+        self.args = tuple(args)
+        self.is_read = is_read
+        self.allowed_errors = tuple(allowed_errors)
+        self._start()
+
+    def _start(self):
+        self.position = 0
+        self._eof = False
+        with open(self.filepath, "rb" if self.is_read else "wb") as f:
+            if self.is_read:
+                kwds = {"stdin": f, "stdout": subprocess.PIPE}
+            else:
+                kwds = {"stdin": subprocess.PIPE, "stdout": f}
+            self._process = subprocess.Popen(
+                self.args, stderr=subprocess.PIPE, close_fds=True, **kwds
+            )
+        self.handle = self._process.stdout if self.is_read else self._process.stdin
+
+    def read(self, amount=-1):
+        data = self.handle.read(amount)
+        if amount is None or amount < 0 or (not data and amount):
+            self._eof = True
+        self.position += len(data)
+        return data
+
+    def write(self, data):
+        self.handle.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def seek(self, position=0):
+        if position < self.position:
+            if not self.is_read:
+                raise OSError(
+                    f"{self.args[0]}: can't seek backwards in a compression stream"
+                )
+            self._terminate()
+            self._start()
+        while (offset := min(position - self.position, 64 * 1024)) > 0:
+            if self.is_read:
+                if not self.read(offset):
+                    break
+            else:
+                self.write(b"\0" * offset)
+        return self.position
+
+    def _terminate(self):
+        self.handle.close()
+        self._process.stderr.close()
+        if self._process.poll() is None:
+            self._process.terminate()
+        self._process.wait()
+
+    def close(self):
+        if self.handle.closed:
+            return
+        if self.is_read and not self._eof:
+            # the reader stopped early, the exit status is meaningless
+            self._terminate()
+            return
+        self.handle.close()
+        with self._process.stderr:
+            error = self._process.stderr.read().decode(errors="replace").strip()
+        returncode = self._process.wait()
+        if not returncode or (
+            self.is_read and any(x in error for x in self.allowed_errors)
+        ):
+            return
+        msg = f"{self.args[0]} exited with status {returncode}: {self.filepath!r}"
+        if error:
+            msg += f": {error}"
+        raise OSError(msg)
+
+    def __del__(self):
+        if getattr(self, "handle", None) is not None and not self.handle.closed:
+            self._terminate()
+
+
+def compress_handle(compressor, filepath, level=None, parallelize=False):
+    """
+    return a handle compressing data written to it out to a file
+
+    :param compressor: name of the compressor to use, None for no compression
+    :param filepath: string path to location on disk
+    :param parallelize: compress using all available cpus if supported
+    """
+    if compressor == "bz2":
+        compressor = "bzip2"
+    if level is None:
+        level = compression_levels.get(compressor, 9)
+    if compressor is None:
+        return open(filepath, "wb")
+    elif compressor == "zstd":
+        args = (_zstd(), f"-{level}c", "-q")
+        if parallelize:
+            args += ("-T0",)
+        return _ProcessHandle(filepath, args)
+    return compression.compress_handle(
+        compressor, filepath, level=level, parallelize=parallelize
+    )
+
+
+def decompress_handle(compressor, filepath, parallelize=False):
+    """
+    return a handle reading decompressed data from a file
+
+    :param compressor: name of the compressor used, None for no compression
+    :param filepath: string path to location on disk
+    :param parallelize: decompress using all available cpus if supported
+    """
     if compressor == "bz2":
         compressor = "bzip2"
+    if compressor is None:
+        return open(filepath, "rb")
+    # binpkgs append an xpak segment to the compressed stream
+    xpak = compressor in ("zstd", "xz") and _has_xpak(filepath)
+    allowed_errors = ()
+    if compressor == "zstd":
+        args = (_zstd(), "-dcq")
+        # zstd lacks an option to stop after the last frame
+        if xpak:
+            allowed_errors = _zstd_trailing_data_errors
+    elif compressor == "xz" and parallelize and (xz := shutil.which("xz")):
+        args = (xz, "-dcq", "-T0")
+        if xpak:
+            args += ("--single-stream",)
+    else:
+        return compression.decompress_handle(
+            compressor, filepath, parallelize=parallelize
+        )
+    return _ProcessHandle(filepath, args, is_read=True, allowed_errors=allowed_errors)
 
+
+def detect_compressor(filepath, default="bzip2"):
+    """
+    determine the compressor used for a tarball from its leading bytes
+
+    :param filepath: string path to location on disk
+    :param default: compressor returned for unknown or uncompressed data
+    """
+    with open(filepath, "rb") as f:
+        data = f.read(8)
+    for magic, compressor in compression_magic:
+        if data.startswith(magic):
+            return compressor
+    return default
+
+
+def write_set(
+    contents_set,
+    filepath,
+    compressor="bzip2",
+    absolute_paths=False,
+    parallelize=False,
+    level=None,
+):
     tar_handle = None
-    handle = compression.compress_handle(compressor, filepath, parallelize=parallelize)
+    handle = compress_handle(compressor, filepath, level=level, parallelize=parallelize)
     try:
         tar_handle = tarfile.TarFile(name=filepath, fileobj=handle, mode="w")
         add_contents_to_tarfile(contents_set, tar_handle)
@@ -70,7 +285,39 @@ def add_contents_to_tarfile(contents_set, tar_fd, absolute_paths=False):
             tar_fd.addfile(t)
 
 
-def archive_to_fsobj(src_tar):
+class _ArchiveMember(invokable_data_source):
+    """
+    data source for a regular file in a tarball
+
+    :ivar member: location of the archive member holding the data, the hardlink
+        target for hardlinks
+    :ivar source: (filepath, compressor) tuple the archive can be reread from,
+        None if unknown
+    """
+
+    __slots__ = ("member", "source")
+
+    def __init__(self, src_tar, name, member, source=None):
+        invokable_data_source.__init__(
+            self,
+            partial(
+                self._simple_wrapper,
+                partial(src_tar.extractfile, name),
+                None,
+                False,
+                True,
+            ),
+        )
+        self.member = member
+        self.source = source
+
+
+def _member_location(name):
+    psep = os.path.sep
+    return os.path.abspath(os.path.join(psep, name.strip(psep)))
+
+
+def archive_to_fsobj(src_tar, source=None):
     psep = os.path.sep
     dev = _unique_inode()
     # inode cache used for supporting hardlinks.
@@ -78,6 +325,8 @@ def archive_to_fsobj(src_tar):
     # consistent inode numbers), we have to normalize the path lookup into this cache
     # via abspath(os.path.join('/', key))...
     inodes = {}
+    # locations of the members actually holding the data for hardlinks
+    members = {}
     for member in src_tar:
         d = {
             "uid": member.uid,
@@ -85,7 +334,7 @@ def archive_to_fsobj(src_tar):
             "mtime": member.mtime,
             "mode": member.mode,
         }
-        location = os.path.abspath(os.path.join(psep, member.name.strip(psep)))
+        location = _member_location(member.name)
         if member.isdir():
             if member.name.strip(psep) == ".":
                 continue
@@ -110,10 +359,10 @@ def archive_to_fsobj(src_tar):
             # to ensure 'y' is in the cache alongside it's target z to support 'x'
             # later lookup.
             inodes[location] = inode
-            d["data"] = invokable_data_source.wrap_function(
-                partial(src_tar.extractfile, member.name),
-                returns_text=False,
-                returns_handle=True,
+            if member.islnk():
+                members[location] = members.get(target, target)
+            d["data"] = _ArchiveMember(
+                src_tar, member.name, members.get(location, location), source
             )
             yield fsFile(location, **d)
         elif member.issym() or member.islnk():
@@ -166,16 +415,17 @@ def generate_contents(filepath, compressor="bz2", parallelize=True):
 
     :param filepath: string path to location on disk
     :param compressor: defaults to bz2; decompressor to use, see
-        :obj:`known_compressors` for list of valid compressors
+        :obj:`compression_magic` for list of valid compressors. If None, the
+        compressor is detected from the tarball.
     """
 
-    if compressor == "bz2":
+    if compressor is None:
+        compressor = detect_compressor(filepath)
+    elif compressor == "bz2":
         compressor = "bzip2"
 
     tar_handle = None
-    handle = compression.decompress_handle(
-        compressor, filepath, parallelize=parallelize
-    )
+    handle = decompress_handle(compressor, filepath, parallelize=parallelize)
 
     try:
         tar_handle = tarfile.TarFile(name=filepath, fileobj=handle, mode="r")
@@ -183,16 +433,103 @@ def generate_contents(filepath, compressor="bz2", parallelize=True):
         if not e.message.endswith("empty header"):
             raise
         tar_handle = []
-    return convert_archive(tar_handle)
+    return convert_archive(tar_handle, source=(filepath, compressor))
+
+
+def _unpack_member(objs, data, offset):
+    for obj in objs:
+        obj = obj.change_attributes(
+            location=pjoin(offset, obj.location.lstrip(os.path.sep)), data=data
+        )
+        copyfile(obj, mkdirs=True)
+        # further hardlinks to the member are copied from the first one
+        data = local_source(obj.location)
+
+
+def _unpack_archive(source, members, offset, threads):
+    filepath, compressor = source
+    handle = decompress_handle(compressor, filepath, parallelize=True)
+    executor = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+    # in-flight writes and their sizes, bounded to limit memory usage
+    writes = deque()
+    buffered = 0
+    unpacked = []
+    try:
+        # stream the archive; seeking back to each member would restart
+        # decompression from the beginning of the archive
+        archive = tarfile.open(fileobj=handle, mode="r|")
+        for member in archive:
+            if not (member.isreg() and members):
+                continue
+            objs = members.pop(_member_location(member.name), None)
+            if objs is None:
+                continue
+            unpacked.extend(objs)
+            if executor is None or member.size > max_buffered_member:
+                data = invokable_data_source.wrap_function(
+                    partial(archive.extractfile, member),
+                    returns_text=False,
+                    returns_handle=True,
+                )
+                _unpack_member(objs, data, offset)
+                continue
+            while writes and buffered + member.size > max_buffered_bytes:
+                future, size = writes.popleft()
+                future.result()
+                buffered -= size
+            data = bytes_data_source(archive.extractfile(member).read())
+            writes.append(
+                (executor.submit(_unpack_member, objs, data, offset), member.size)
+            )
+            buffered += member.size
+        while writes:
+            writes.popleft()[0].result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        handle.close()
+    return unpacked
+
+
+def unpack_contents(cset, offset, threads=1):
+    """
+    extract the regular files of a contentset generated from tarballs
+
+    Every tarball is decompressed once, reading members in archive order rather
+    than seeking back to each one in turn. File data is written out to the
+    offset from a pool of threads while the archive is being read.
+
+    Directories, symlinks, and the like aren't extracted; files are expected to
+    be merged after their parent directories.
+
+    :param cset: :obj:`contents.contentsSet` instance, see :func:`generate_contents`
+    :param offset: directory to extract files to
+    :param threads: number of threads to write files with
+    :return: :obj:`contents.contentsSet` of the extracted files, files in
+        the cset that aren't backed by a known tarball are skipped
+    """
+    archives = {}
+    for x in cset.iterfiles():
+        if isinstance(x.data, _ArchiveMember) and x.data.source is not None:
+            members = archives.setdefault(x.data.source, {})
+            members.setdefault(x.data.member, []).append(x)
+
+    unpacked = []
+    for source, members in archives.items():
+        unpacked.extend(_unpack_archive(source, members, offset, threads))
+        if members:
+            missing = ", ".join(sorted(members))
+            raise ValueError(f"{source[0]!r}: missing archive members: {missing}")
+    return contents.contentsSet(unpacked)
 
 
-def convert_archive(archive):
+def convert_archive(archive, source=None):
     # regarding the usage of del in this function... bear in mind these sets
     # could easily have 10k -> 100k entries in extreme cases; thus the del
     # usage, explicitly trying to ensure we don't keep refs long term.
 
     # this one is a bit fun.
-    raw = list(archive_to_fsobj(archive))
+    raw = list(archive_to_fsobj(archive, source=source))
     # we use the data source as the unique key to get position.
     files_ordering = list(enumerate(x for x in raw if x.is_reg))
     files_ordering = {x.data: idx for idx, x in files_ordering}
@@ -429,7 +429,17 @@ class merge(base):
     suppress_exceptions = False
 
     def trigger(self, engine, merging_cset):
-        return merge_contents(merging_cset, callback=engine.observer.installing_fs_obj)
+        threads = int(os.environ.get("PKGCORE_TRIGGER_PARALLELISM", engine.parallelism))
+        observer = engine.observer
+        if threads > 1:
+            # file copies are reported from worker threads
+            observer = threadsafe_repo_observer(observer)
+        return merge_contents(
+            merging_cset,
+            callback=observer.installing_fs_obj,
+            threads=threads,
+            copy_callback=observer.copied_fs_obj,
+        )
 
 
 class unmerge(base):
@@ -148,6 +148,10 @@ class repo_observer(phase_observer):
     def removing_fs_obj(self, obj):
         self._output.write(f"<<< {obj}\n")
 
+    def copied_fs_obj(self, obj, method):
+        """Report the method used to copy a merged file's data."""
+        self.debug(f"copied {obj.location} via {method}")
+
 
 def _reflection_func(attr, self, *args, **kwds):
     return self._invoke(attr, *args, **kwds)
@@ -1,3 +1,6 @@
+import multiprocessing
+import queue
+
 from snakeoil.compatibility import IGNORED_EXCEPTIONS
 
 from ..package.errors import MetadataException
@@ -20,7 +23,46 @@ def regen_iter(iterable, regen_func, observer):
             yield pkg, e
 
 
-def regen_repository(repo, pkgs, observer, threads=1, pkg_attr="keywords", **kwargs):
+def regen_batch_iter(iterable, regen_func, observer):
+    regen_batch = getattr(regen_func, "regen_batch", None)
+    for pkgs in iterable:
+        if regen_batch is None:
+            yield from regen_iter(pkgs, regen_func, observer)
+            continue
+        try:
+            yield from regen_batch(pkgs)
+        except IGNORED_EXCEPTIONS as e:
+            if isinstance(e, KeyboardInterrupt):
+                return
+            raise
+        except Exception as e:
+            # the batch was aborted, leaving all its pkgs unregenerated
+            for pkg in pkgs:
+                yield pkg, e
+
+
+def regen_repository(
+    repo,
+    pkgs,
+    observer,
+    threads=1,
+    pkg_attr="keywords",
+    multiprocess=False,
+    batch_size=1,
+    **kwargs,
+):
+    """Regenerate the metadata cache entries for the given packages of a repo.
+
+    :param threads: number of threads, or worker processes when using
+        multiprocessing, to regenerate with
+    :param multiprocess: regenerate metadata in worker processes, streaming
+        results back to the calling process for writing to the cache; requires
+        the repo's helper to support it
+    :param batch_size: number of packages passed to each call of the repo
+        helper's ``regen_batch`` method, if it has one; unused when
+        multiprocessing
+    :return: iterable of (pkg, exception) pairs for failures
+    """
     helpers = []
 
     def _get_repo_helper():
@@ -31,10 +73,94 @@ def regen_repository(repo, pkgs, observer, threads=1, pkg_attr="keywords", **kwa
         helpers.append(helper)
         return helper
 
+    if multiprocess and hasattr(repo, "_regen_operation_helper"):
+        yield from _regen_processes(repo, pkgs, threads, _get_repo_helper)
+        return
+
     def get_args():
         return (_get_repo_helper(), observer)
 
-    errors = map_async(pkgs, regen_iter, threads=threads, per_thread_args=get_args)
+    if batch_size > 1 and hasattr(repo, "_regen_operation_helper"):
+        pkgs = list(pkgs)
+        batches = [pkgs[i : i + batch_size] for i in range(0, len(pkgs), batch_size)]
+        errors = map_async(
+            batches, regen_batch_iter, threads=threads, per_thread_args=get_args
+        )
+    else:
+        errors = map_async(pkgs, regen_iter, threads=threads, per_thread_args=get_args)
 
     # yield any errors that occurred during metadata generation
     yield from errors
+
+
+class RegenWorkerError(Exception):
+    """Error raised in a regen worker process, passed back by message."""
+
+
+def _regen_worker(pkgs, get_helper, tasks, results):
+    """Generate metadata for the requested pkgs, streaming back the results."""
+    helper = get_helper()
+    try:
+        for i in iter(tasks.get, None):
+            try:
+                results.put((i, *helper.generate(pkgs[i]), None))
+            except MetadataException:
+                # handled at a higher level by scanning for metadata masked pkgs
+                results.put((i, None, True, None))
+            except Exception as e:
+                results.put((i, None, True, str(e)))
+    finally:
+        helper.finish()
+
+
+def _regen_processes(repo, pkgs, processes, get_helper):
+    """Regenerate metadata via worker processes with a single cache writer.
+
+    Workers are forked, inheriting the repo and package list so only package
+    indexes and generated metadata have to be passed between processes.
+    """
+    pkgs = list(pkgs)
+    processes = max(min(len(pkgs), processes), 1)
+    ctx = multiprocessing.get_context("fork")
+    tasks, results = ctx.Queue(), ctx.Queue()
+    workers = [
+        ctx.Process(
+            target=_regen_worker, args=(pkgs, get_helper, tasks, results), daemon=True
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    writer = get_helper()
+    pending = set(range(len(pkgs)))
+    try:
+        for i in range(len(pkgs)):
+            tasks.put(i)
+        for _ in workers:
+            tasks.put(None)
+
+        while pending:
+            try:
+                i, data, stale, error = results.get(timeout=1)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    break
+                continue
+            pending.discard(i)
+            # workers leave invalid cache entries for the writer to remove
+            if stale:
+                writer.prune(pkgs[i])
+            if error is not None:
+                yield pkgs[i], RegenWorkerError(error)
+            elif data is not None:
+                writer.store(pkgs[i], data)
+
+        for i in sorted(pending):
+            writer.prune(pkgs[i])
+            yield pkgs[i], RegenWorkerError("worker process died unexpectedly")
+    finally:
+        for worker in workers:
+            if pending and worker.is_alive():
+                worker.terminate()
+            worker.join()
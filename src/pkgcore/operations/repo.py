@@ -227,7 +227,9 @@ class operations(sync_operations):
                 del cache[p]
 
     @operations_mod.is_standalone
-    def _cmd_api_regen_cache(self, observer=None, threads=1, **kwargs):
+    def _cmd_api_regen_cache(
+        self, observer=None, threads=1, incremental=False, **kwargs
+    ):
         cache = getattr(self.repo, "cache", None)
         if not cache and not kwargs.get("force", False):
             return
@@ -240,7 +242,23 @@ class operations(sync_operations):
             # Force usage of unfiltered repo to include pkgs with metadata issues.
             # Matches are collapsed directly to a list to avoid threading issues such
             # as EBADF since the repo iterator isn't thread-safe.
-            pkgs = list(self.repo.itermatch(packages.AlwaysTrue, pkg_filter=None))
+            all_pkgs = pkgs = list(
+                self.repo.itermatch(packages.AlwaysTrue, pkg_filter=None)
+            )
+
+            # Record the ebuild and eclass state the cache is regenerated
+            # against, allowing incremental runs to only regen entries affected
+            # by changes. Mtimes are collected upfront so changes made during
+            # regen are caught by the next run.
+            state = getattr(self.repo, "regen_state", None)
+            state_cache = next((x for x in self._get_caches() if not x.readonly), None)
+            if state is not None and state_cache is not None:
+                ebuild_mtimes = state.ebuild_mtimes(pkgs)
+                eclass_mtimes = state.eclass_mtimes(self.repo.eclass_cache)
+                if incremental:
+                    pkgs = state.stale(pkgs, ebuild_mtimes, eclass_mtimes, state_cache)
+            else:
+                state = None
 
             observer = self._get_observer(observer)
             for pkg, e in regen.regen_repository(
@@ -249,9 +267,18 @@ class operations(sync_operations):
                 observer.error(f"caught exception {e} while processing {pkg.cpvstr}")
                 errors += 1
 
-            # report pkgs with bad metadata -- relies on iterating over the
-            # unfiltered repo to populate the masked repo
-            pkgs = frozenset(pkg.cpvstr for pkg in self.repo)
+            regenerated = frozenset(pkg.cpvstr for pkg in pkgs)
+            if len(pkgs) < len(all_pkgs):
+                # only regenerated pkgs can have changed metadata validity
+                valid = {x.cpvstr for x in all_pkgs if x.cpvstr not in regenerated}
+                for x in pkgs:
+                    valid.update(
+                        pkg.cpvstr for pkg in self.repo.itermatch(x.versioned_atom)
+                    )
+            else:
+                # report pkgs with bad metadata -- relies on iterating over the
+                # unfiltered repo to populate the masked repo
+                valid = frozenset(pkg.cpvstr for pkg in self.repo)
             for pkg in sorted(self.repo._bad_masked):
                 observer.error(
                     f"{pkg.cpvstr}: {pkg.data.msg(verbosity=observer.verbosity)}"
@@ -259,7 +286,20 @@ class operations(sync_operations):
                 errors += 1
 
             # remove old/invalid cache entries
-            self._cmd_implementation_clean_cache(pkgs)
+            self._cmd_implementation_clean_cache(valid)
+
+            if state is not None:
+                inherited = {
+                    cpv: [eclass for eclass, _chfs in data.get("_eclasses_", ())]
+                    for cpv, data in state_cache.get_many(sorted(regenerated))
+                }
+                try:
+                    state.update(ebuild_mtimes, eclass_mtimes, inherited)
+                except EnvironmentError as e:
+                    observer.error(
+                        f"failed writing regen state {state.path!r}: {e.strerror}"
+                    )
+                    errors += 1
 
             return errors
         finally:
@@ -1,4 +1,4 @@
-__all__ = ("Installed", "VersionedInstalled")
+__all__ = ("Installed", "VersionedInstalled", "FileOwners")
 
 import operator
 
@@ -33,3 +33,46 @@ class VersionedInstalled(_Base):
 
     pkgcore_config_type = ConfigHint(types={"vdb": "refs:repo"}, typename="pkgset")
     getter = operator.attrgetter("versioned_atom")
+
+
+class FileOwners(_Base):
+    """Set of packages holding slotted atoms of installed packages owning given files.
+
+    Uses the file ownership index of vdbs supporting it, falling back to
+    scanning package contents otherwise.
+    """
+
+    pkgcore_config_type = ConfigHint(
+        types={"vdb": "refs:repo", "files": "list"}, typename="pkgset"
+    )
+    getter = operator.attrgetter("slotted_atom")
+
+    def __init__(self, vdb, files):
+        super().__init__(vdb)
+        self.files = tuple(files)
+
+    def __iter__(self):
+        for repo in self.vdbs:
+            if (owners := getattr(repo, "owners", None)) is not None:
+                cpvs = frozenset().union(*owners(self.files).values())
+                restrict = packages.PackageRestriction(
+                    "cpvstr", values.FunctionRestriction(cpvs.__contains__)
+                )
+            else:
+                files = frozenset(self.files)
+                restrict = packages.PackageRestriction(
+                    "contents",
+                    values.AnyMatch(
+                        values.GetAttrRestriction(
+                            "location", values.FunctionRestriction(files.__contains__)
+                        )
+                    ),
+                )
+            restrict = packages.AndRestriction(
+                packages.PackageRestriction(
+                    "package_is_real", values.EqualityMatch(True)
+                ),
+                restrict,
+            )
+            for pkg in repo.itermatch(restrict):
+                yield self.getter(pkg)
@@ -30,6 +30,7 @@ class tree(prototype.tree):
         if not isinstance(restrict, restriction.base):
             raise errors.InitializationError(f"{restrict} is not a restriction")
         self.restrict = restrict
+        self._match = restrict.compile_match()
         self.raw_repo = repo
         if sentinel_val:
             self._filterfunc = filter
@@ -43,9 +44,7 @@ class tree(prototype.tree):
         # the repo, determine what can be done without cost
         # (determined by repo's attributes) versus what does cost
         # (metadata pull for example).
-        return self._filterfunc(
-            self.restrict.match, self.raw_repo.itermatch(restrict, **kwds)
-        )
+        return self._filterfunc(self._match, self.raw_repo.itermatch(restrict, **kwds))
 
     itermatch.__doc__ = prototype.tree.itermatch.__doc__.replace(
         "@param", "@keyword"
@@ -78,7 +77,7 @@ class tree(prototype.tree):
 
     def __getitem__(self, key):
         v = self.raw_repo[key]
-        if self.restrict.match(v) != self.sentinel_val:
+        if self._match(v) != self.sentinel_val:
             raise KeyError(key)
         return v
 
@@ -57,11 +57,10 @@ class restrict_repo:
         """
         self.raw_repo = repo
         self.restrict = restrict
+        self._match = restrict.compile_match()
 
     def itermatch(self, *a, **kwds):
-        return (
-            x for x in self.raw_repo.itermatch(*a, **kwds) if not self.restrict.match(x)
-        )
+        return (x for x in self.raw_repo.itermatch(*a, **kwds) if not self._match(x))
 
     def match(self, *a, **kwds):
         return list(self.itermatch(*a, **kwds))
@@ -5,6 +5,10 @@ repository that combines multiple repos together
 __all__ = ("tree", "operations")
 
 import os
+import queue
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from itertools import chain
 from operator import itemgetter
@@ -67,6 +71,8 @@ class tree(prototype.tree):
 
     Args:
         trees (list): :obj:`pkgcore.repository.prototype.tree` instances
+        threads (int): number of threads used to match against the trees
+            concurrently, by default trees are matched one after another
 
     Attributes:
         frozen_settable (bool): controls whether frozen is able to be set
@@ -74,14 +80,17 @@ class tree(prototype.tree):
         operations_kls: callable to generate a repo operations instance
 
         trees (list): :obj:`pkgcore.repository.prototype.tree` instances
+        threads (int): number of threads used for matching
     """
 
     frozen_settable = False
     operations_kls = operations
 
-    pkgcore_config_type = ConfigHint(types={"repos": "refs:repo"}, typename="repo")
+    pkgcore_config_type = ConfigHint(
+        types={"repos": "refs:repo", "threads": "int"}, typename="repo"
+    )
 
-    def __init__(self, *trees, repos=()):
+    def __init__(self, *trees, repos=(), threads=1):
         super().__init__()
         trees = trees + tuple(repos)
         for x in trees:
@@ -90,6 +99,65 @@ class tree(prototype.tree):
                     f"{x} is not a repository tree derivative"
                 )
         self.trees = trees
+        self.threads = threads
+
+    @klass.cached_property
+    def _executor(self):
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.threads, len(self.trees)),
+            thread_name_prefix="pkgcore-multiplex",
+        )
+        # workers don't reference the tree, so shut them down alongside it
+        weakref.finalize(self, executor.shutdown, wait=False, cancel_futures=True)
+        return executor
+
+    def _concurrent_itermatch(self, restrict, **kwds):
+        """Match against all trees concurrently, returning per-tree iterators.
+
+        Worker threads stream back each tree's matches as they're found,
+        iterating over a tree's results only blocks until its next match is
+        available. Workers stop matching once iteration is abandoned.
+        """
+        cancelled = threading.Event()
+
+        def match(repo, matches):
+            try:
+                for pkg in repo.itermatch(restrict, **kwds):
+                    if cancelled.is_set():
+                        return
+                    matches.put((pkg, None))
+            except Exception as e:
+                matches.put((None, e))
+            finally:
+                matches.put(None)
+
+        def results(matches):
+            try:
+                while (item := matches.get()) is not None:
+                    pkg, exc = item
+                    if exc is not None:
+                        raise exc
+                    yield pkg
+            except GeneratorExit:
+                cancelled.set()
+                raise
+
+        repo_iters = []
+        for repo in self.trees:
+            matches = queue.SimpleQueue()
+            self._executor.submit(match, repo, matches)
+            repo_iters.append(results(matches))
+        return repo_iters
+
+    def itermatch_repos(self, restrict, **kwds):
+        """Return an iterable of each tree's matches in tree order.
+
+        Trees are matched concurrently when using multiple threads, otherwise
+        each tree is matched once its preceding tree's matches are consumed.
+        """
+        if self.threads > 1 and len(self.trees) > 1:
+            return self._concurrent_itermatch(restrict, **kwds)
+        return (repo.itermatch(restrict, **kwds) for repo in self.trees)
 
     def _get_categories(self):
         d = set()
@@ -149,7 +217,14 @@ class tree(prototype.tree):
 
     def itermatch(self, restrict, **kwds):
         sorter = kwds.get("sorter", iter)
+        if self.threads > 1 and len(self.trees) > 1:
+            repo_iters = self._concurrent_itermatch(restrict, **kwds)
+        else:
+            repo_iters = None
+
         if sorter is iter:
+            if repo_iters is not None:
+                return chain.from_iterable(repo_iters)
             return (
                 match
                 for repo in self.trees
@@ -164,7 +239,9 @@ class tree(prototype.tree):
             return -1
 
         f = post_curry(sorted_cmp, f, key=itemgetter(0))
-        return iter_sort(f, *[repo.itermatch(restrict, **kwds) for repo in self.trees])
+        if repo_iters is None:
+            repo_iters = [repo.itermatch(restrict, **kwds) for repo in self.trees]
+        return iter_sort(f, *repo_iters)
 
     itermatch.__doc__ = prototype.tree.itermatch.__doc__.replace(
         "@param", "@keyword"
@@ -270,7 +270,7 @@ class tree:
             candidates = self._identify_candidates(restrict, sorter)
 
         if force is None:
-            match = restrict.match
+            match = restrict.compile_match()
         elif force:
             match = restrict.force_True
         else:
@@ -65,16 +65,19 @@ class RepositoryGroup(DictMixin):
     Args:
         repos (iterable): repo instances
         combined: combined repo, if None a multiplex repo is created
+        threads (int): number of threads the created multiplex repo matches
+            against the repos with
     """
 
-    __slots__ = ("repos", "combined")
+    __slots__ = ("repos", "combined", "threads")
 
     __externally_mutable__ = False
 
-    def __init__(self, repos=(), combined=None):
+    def __init__(self, repos=(), combined=None, threads=1):
         self.repos = tuple(repos)
+        self.threads = threads
         if combined is None:
-            combined = multiplex.tree(*self.repos)
+            combined = multiplex.tree(*self.repos, threads=threads)
         self.combined = combined
 
     itermatch = klass.alias_attr("combined.itermatch")
@@ -121,9 +124,11 @@ class RepositoryGroup(DictMixin):
                 self.combined += other
             return self
         elif isinstance(other, RepositoryGroup):
-            return RepositoryGroup(self.repos + other.repos)
+            return RepositoryGroup(
+                self.repos + other.repos, threads=max(self.threads, other.threads)
+            )
         elif isinstance(other, (list, tuple)):
-            return RepositoryGroup(self.repos + tuple(other))
+            return RepositoryGroup(self.repos + tuple(other), threads=self.threads)
         raise TypeError(
             "cannot add '%s' and '%s' objects"
             % (self.__class__.__name__, other.__class__.__name__)
@@ -136,9 +141,11 @@ class RepositoryGroup(DictMixin):
                 self.combined = other + self.combined
             return self
         elif isinstance(other, RepositoryGroup):
-            return RepositoryGroup(other.repos + self.repos)
+            return RepositoryGroup(
+                other.repos + self.repos, threads=max(self.threads, other.threads)
+            )
         elif isinstance(other, (list, tuple)):
-            return RepositoryGroup(tuple(other) + self.repos)
+            return RepositoryGroup(tuple(other) + self.repos, threads=self.threads)
         raise TypeError(
             "cannot add '%s' and '%s' objects"
             % (other.__class__.__name__, self.__class__.__name__)
@@ -150,11 +157,11 @@ class RepositoryGroup(DictMixin):
 
     @property
     def real(self):
-        return RepositoryGroup(get_virtual_repos(self, False))
+        return RepositoryGroup(get_virtual_repos(self, False), threads=self.threads)
 
     @property
     def virtual(self):
-        return RepositoryGroup(get_virtual_repos(self))
+        return RepositoryGroup(get_virtual_repos(self), threads=self.threads)
 
     def repo_match(self, path):
         """Find the repo containing a path.
@@ -169,7 +169,7 @@ class RestrictionRepo(tree):
         if isinstance(restrict, atom.atom):
             func = restrict.intersects
         else:
-            func = restrict.match
+            func = restrict.compile_match()
 
         # yield any matching pkgs already injected into the repo
         for pkg in self._injected_pkgs:
@@ -40,7 +40,7 @@ class PigeonHoledSlots:
     def find_atom_matches(self, atom, key=None):
         if key is None:
             key = atom.key
-        return list(filter(atom.match, self.slot_dict.get(key, ())))
+        return list(filter(atom.compile_match(), self.slot_dict.get(key, ())))
 
     def add_limiter(self, atom, key=None):
         """add a limiter, returning any conflicting objs"""
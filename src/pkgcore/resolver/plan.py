@@ -28,8 +28,9 @@ def dprint(handle, fmt, args=None, label=None):
 
 
 # iter/pkg sorting functions for selection strategy
-pkg_sort_highest = partial(sorted, reverse=True)
-pkg_sort_lowest = sorted
+pkg_sort_key = operator.attrgetter("sort_key")
+pkg_sort_highest = partial(sorted, key=pkg_sort_key, reverse=True)
+pkg_sort_lowest = partial(sorted, key=pkg_sort_key)
 
 pkg_grabber = operator.itemgetter(0)
 
@@ -42,19 +43,11 @@ def highest_iter_sort(l, pkg_grabber=pkg_grabber):
     :return: sorted list of packages
     """
 
-    def f(x, y):
-        c = cmp(x, y)
-        if c:
-            return c
-        elif x.repo.livefs:
-            if y.repo.livefs:
-                return 0
-            return 1
-        elif y.repo.livefs:
-            return -1
-        return 0
+    def key(item):
+        pkg = pkg_grabber(item)
+        return pkg.sort_key, pkg.repo.livefs
 
-    sort_cmp(l, f, key=pkg_grabber, reverse=True)
+    l.sort(key=key, reverse=True)
     return l
 
 
@@ -66,6 +59,8 @@ def downgrade_iter_sort(restrict, l, pkg_grabber=pkg_grabber):
     :return: sorted list of packages
     """
 
+    match = restrict.compile_match()
+
     def f(x, y):
         c = cmp(x, y)
         if x.repo.livefs:
@@ -74,11 +69,11 @@ def downgrade_iter_sort(restrict, l, pkg_grabber=pkg_grabber):
             return -1
         elif y.repo.livefs:
             return 1
-        elif restrict.match(x):
-            if restrict.match(y):
+        elif match(x):
+            if match(y):
                 return 1
             return -1
-        elif restrict.match(y):
+        elif match(y):
             return 1
         return c
 
@@ -94,19 +89,11 @@ def lowest_iter_sort(l, pkg_grabber=pkg_grabber):
     :return: sorted list of packages
     """
 
-    def f(x, y):
-        c = cmp(x, y)
-        if c:
-            return c
-        elif x.repo.livefs:
-            if y.repo.livefs:
-                return 0
-            return -1
-        elif y.repo.livefs:
-            return 1
-        return 0
+    def key(item):
+        pkg = pkg_grabber(item)
+        return pkg.sort_key, not pkg.repo.livefs
 
-    sort_cmp(l, f, key=pkg_grabber)
+    l.sort(key=key)
     return l
 
 
@@ -119,6 +106,37 @@ class MutableContainmentRestriction(values.base):
         sf(self, "match", self._blacklist.__contains__)
 
 
+class query_cache:
+    """Memoized repository matches shared across a resolver's choice points.
+
+    Results are keyed by the repository and atom queried, and are only valid
+    as long as the queried repositories don't change.
+    """
+
+    __slots__ = ("_cache", "hits", "misses")
+
+    def __init__(self):
+        self._cache = {}
+        self.hits = self.misses = 0
+
+    def match(self, dbs, atom):
+        key = (id(dbs), atom)
+        matches = self._cache.get(key)
+        if matches is None:
+            self.misses += 1
+            matches = self._cache[key] = caching_iter(dbs.itermatch(atom))
+        else:
+            self.hits += 1
+        return matches
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+
 class resolver_frame:
     __slots__ = (
         "parent",
@@ -303,6 +321,7 @@ class merge_plan:
         debug=False,
         debug_handle=None,
         pdb_intercept=None,
+        profile=None,
     ):
         if debug:
             if debug_handle is None:
@@ -343,6 +362,7 @@ class merge_plan:
         )
 
         self.insoluble = set()
+        self.query_cache = query_cache()
         self.vdb_preloaded = False
         self._ensure_livefs_is_loaded = self._ensure_livefs_is_loaded_nonpreloaded
         self.drop_cycles = drop_cycles
@@ -355,6 +375,24 @@ class merge_plan:
             self._debugging_depth = 0
             self._debugging_drop_cycles = False
 
+        self.profile = profile
+        if profile is not None:
+            profile.query_cache = self.query_cache
+            self._rec_add_atom = partial(profile.rec_add_atom, self._rec_add_atom)
+            self.check_for_cycles = partial(
+                profile.check_for_cycles, self.check_for_cycles
+            )
+            self._query_dbs = partial(profile.query_dbs, self._query_dbs)
+            self.notify_trying_choice = partial(
+                profile.notify_trying_choice, self.notify_trying_choice
+            )
+            self.notify_choice_failed = partial(
+                profile.notify_choice_failed, self.notify_choice_failed
+            )
+            self.state.backtrack = partial(
+                profile.backtrack, self.state.backtrack, self.state
+            )
+
     @property
     def forced_restrictions(self):
         return frozenset(self.state.forced_restrictions)
@@ -667,7 +705,7 @@ class merge_plan:
                 ret = ((True,), {"pre_solved": True})
             else:
                 # not in the plan thus far.
-                matches = caching_iter(dbs.itermatch(atom))
+                matches = self._query_dbs(dbs, atom)
                 if matches:
                     choices = choice_point(atom, matches)
                     # ignore what dropped out, at this juncture we don't care.
@@ -705,6 +743,12 @@ class merge_plan:
             return None
         return choices, matches
 
+    def _query_dbs(self, dbs, atom):
+        if dbs is self.livefs_dbs:
+            # livefs matches vary with the vdb filter, so can't be memoized
+            return caching_iter(dbs.itermatch(atom))
+        return self.query_cache.match(dbs, atom)
+
     def check_for_cycles(self, stack, cur_frame):
         """Check the current stack for cyclical issues.
 
@@ -1000,6 +1044,11 @@ class merge_plan:
         return None
 
     def free_caches(self):
+        self._dprint(
+            "query cache: %i hits, %i misses",
+            (self.query_cache.hits, self.query_cache.misses),
+        )
+        self.query_cache.clear()
         for repo in self.all_raw_dbs:
             repo.clear()
 
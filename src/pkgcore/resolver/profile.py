@@ -0,0 +1,165 @@
+"""
+resolver profiling support
+
+Records time spent resolving each atom along with choice, backtrack, cycle
+check, and repository query statistics for a :obj:`pkgcore.resolver.plan.merge_plan`
+instance. Results can be exported as JSON or as folded stacks for flamegraph
+tools such as flamegraph.pl, inferno, or speedscope.
+"""
+
+__all__ = ("ResolverProfile",)
+
+import json
+from collections import defaultdict
+from time import perf_counter
+
+
+class _AtomStats:
+    __slots__ = ("calls", "time", "self_time", "choices", "failures", "backtracks")
+
+    def __init__(self):
+        self.calls = self.choices = self.failures = self.backtracks = 0
+        self.time = self.self_time = 0.0
+
+    def to_dict(self):
+        return {x: getattr(self, x) for x in self.__slots__}
+
+
+class ResolverProfile:
+    """Collect profiling data from a resolver.
+
+    Pass an instance to :obj:`pkgcore.resolver.plan.merge_plan` via its
+    ``profile`` argument; resolver methods are only wrapped when profiling is
+    enabled so there's no overhead otherwise.
+
+    Atom timings are inclusive of nested dependency resolution while self
+    times exclude it. Folded stack frames are named by dependency type and
+    atom, with cycle checks and repository queries as separate leaf frames.
+    """
+
+    counters = ("choices", "failures", "backtracks", "cycle_checks", "repo_queries")
+
+    def __init__(self, clock=perf_counter):
+        self.clock = clock
+        self.counts = dict.fromkeys(self.counters, 0)
+        self.timings = {"cycle_checks": 0.0, "repo_queries": 0.0}
+        self.atoms = defaultdict(_AtomStats)
+        self.stacks = defaultdict(float)
+        self.total_time = 0.0
+        # set by the resolver being profiled
+        self.query_cache = None
+        # entries are [frame name, atom key, start time, time spent in children]
+        self._frames = []
+
+    def _enter(self, name, key=None):
+        self._frames.append([name, key, self.clock(), 0.0])
+
+    def _exit(self):
+        elapsed = self.clock() - self._frames[-1][2]
+        self_time = elapsed - self._frames[-1][3]
+        self.stacks[";".join(x[0] for x in self._frames)] += self_time
+        self._frames.pop()
+        if self._frames:
+            self._frames[-1][3] += elapsed
+        else:
+            self.total_time += elapsed
+        return elapsed, self_time
+
+    def _current_atom(self):
+        for frame in reversed(self._frames):
+            if frame[1] is not None:
+                return self.atoms[frame[1]]
+        return None
+
+    def rec_add_atom(self, func, atom, stack, dbs, mode="none", **kwds):
+        """Wrapper for :obj:`merge_plan._rec_add_atom`."""
+        key = str(atom)
+        name = key if mode == "none" else f"{mode}:{key}"
+        stats = self.atoms[key]
+        stats.calls += 1
+        self._enter(name, key)
+        try:
+            return func(atom, stack, dbs, mode=mode, **kwds)
+        finally:
+            elapsed, self_time = self._exit()
+            stats.time += elapsed
+            stats.self_time += self_time
+
+    def check_for_cycles(self, func, *args, **kwds):
+        """Wrapper for :obj:`merge_plan.check_for_cycles`."""
+        self.counts["cycle_checks"] += 1
+        self._enter("cycle-check")
+        try:
+            return func(*args, **kwds)
+        finally:
+            self.timings["cycle_checks"] += self._exit()[0]
+
+    def query_dbs(self, func, dbs, atom):
+        """Wrapper for :obj:`merge_plan._query_dbs`."""
+        self.counts["repo_queries"] += 1
+        self._enter("repo-query")
+        try:
+            matches = func(dbs, atom)
+            # pull the first match so lazy repo matching is accounted for
+            bool(matches)
+            return matches
+        finally:
+            self.timings["repo_queries"] += self._exit()[0]
+
+    def notify_trying_choice(self, func, stack, atom, choices):
+        """Wrapper for :obj:`merge_plan.notify_trying_choice`."""
+        self.counts["choices"] += 1
+        self.atoms[str(atom)].choices += 1
+        return func(stack, atom, choices)
+
+    def notify_choice_failed(self, func, stack, atom, *args, **kwds):
+        """Wrapper for :obj:`merge_plan.notify_choice_failed`."""
+        self.counts["failures"] += 1
+        self.atoms[str(atom)].failures += 1
+        return func(stack, atom, *args, **kwds)
+
+    def backtrack(self, func, plan_state, state_pos):
+        """Wrapper for :obj:`pkgcore.resolver.state.plan_state.backtrack`."""
+        if len(plan_state.plan) != state_pos:
+            self.counts["backtracks"] += 1
+            stats = self._current_atom()
+            if stats is not None:
+                stats.backtracks += 1
+        return func(state_pos)
+
+    def to_dict(self):
+        """Return the profiling data as a JSON serializable dict."""
+        atoms = sorted(self.atoms.items(), key=lambda x: x[1].time, reverse=True)
+        data = {
+            "total_time": self.total_time,
+            "counts": dict(self.counts),
+            "timings": dict(self.timings),
+        }
+        if self.query_cache is not None:
+            data["query_cache"] = {
+                "hits": self.query_cache.hits,
+                "misses": self.query_cache.misses,
+                "entries": len(self.query_cache),
+            }
+        data["atoms"] = [dict(atom=atom, **stats.to_dict()) for atom, stats in atoms]
+        return data
+
+    def write_json(self, handle):
+        json.dump(self.to_dict(), handle, indent=2)
+        handle.write("\n")
+
+    def write_folded(self, handle):
+        """Write folded stacks with self times in microseconds."""
+        for stack, self_time in sorted(self.stacks.items()):
+            if (usecs := round(self_time * 1e6)) > 0:
+                handle.write(f"{stack} {usecs}\n")
+
+    formats = {"json": write_json, "folded": write_folded}
+
+    def write(self, handle, format="json"):
+        """Write the profiling data to a file handle in a given format."""
+        try:
+            writer = self.formats[format]
+        except KeyError:
+            raise ValueError(f"unknown profile format: {format!r}")
+        writer(self, handle)
@@ -298,6 +298,24 @@ class AndRestriction(base):
                 return self.negate
         return not self.negate
 
+    def compile_match(self):
+        if self.__class__.match is not AndRestriction.match:
+            # derivatives overriding matching
+            return self.match
+        if not isinstance(self.restrictions, tuple):
+            # unfinalized instances can still be modified
+            return self.match
+        matchers = tuple(map(restriction.compile_match, self.restrictions))
+        negate = self.negate
+
+        def match(vals):
+            for matcher in matchers:
+                if not matcher(vals):
+                    return negate
+            return not negate
+
+        return match
+
     def force_True(self, pkg, *vals):
         pvals = [pkg]
         pvals.extend(vals)
@@ -474,6 +492,24 @@ class OrRestriction(base):
                 return not self.negate
         return self.negate
 
+    def compile_match(self):
+        if self.__class__.match is not OrRestriction.match:
+            # derivatives overriding matching
+            return self.match
+        if not isinstance(self.restrictions, tuple):
+            # unfinalized instances can still be modified
+            return self.match
+        matchers = tuple(map(restriction.compile_match, self.restrictions))
+        negate = self.negate
+
+        def match(vals):
+            for matcher in matchers:
+                if matcher(vals):
+                    return not negate
+            return negate
+
+        return match
+
     def cnf_solutions(self, full_solution_expansion=False):
         """Returns a list in CNF (conjunctive normalized form) of this instance.
 
@@ -72,6 +72,42 @@ class PackageRestriction(klass.GenericEquality, restriction.base):
             return self.negate
         return self.restriction.match(attr) != self.negate
 
+    def compile_match(self):
+        if self.__class__.match is not PackageRestriction.match:
+            # derivatives overriding matching
+            return self.match
+        child = restriction.compile_match(self.restriction)
+        negate = self.negate
+        if (
+            len(self._attr_split) > 1
+            or self.__class__._pull_attr is not PackageRestriction._pull_attr
+        ):
+            pull_attr = self._pull_attr
+            sentinel = klass.sentinel
+
+            def match(pkg):
+                attr = pull_attr(pkg)
+                if attr is sentinel:
+                    return negate
+                return child(attr) != negate
+
+            return match
+
+        name = self._attr_split[0]
+        fallback = self.match
+
+        def match(pkg):
+            try:
+                attr = getattr(pkg, name)
+            except IGNORED_EXCEPTIONS:
+                raise
+            except Exception:
+                # the generic path handles logging and missing attributes
+                return fallback(pkg)
+            return child(attr) != negate
+
+        return match
+
     def _handle_exception(self, pkg, exc, attr_split):
         if isinstance(exc, AttributeError):
             if not self.ignore_missing:
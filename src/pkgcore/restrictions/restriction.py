@@ -38,6 +38,15 @@ class base(klass.SlotsPicklingMixin, immutable.Simple, memoize.WeaklyCachedABC):
     def force_True(self, *arg, **kwargs) -> bool:
         return self.match(*arg, **kwargs)
 
+    def compile_match(self) -> typing.Callable[..., bool]:
+        """Return a callable equivalent to :obj:`match`.
+
+        Derivatives override this to return closures with their state bound
+        as locals, avoiding repeated attribute lookups and generic dispatch
+        when matching many objects against the same restriction.
+        """
+        return self.match
+
     # TODO: deprecate this exact call.  It has no meaning, len exists
     # due to early restriction subsystem development- introspection tools
     # should instead exist, or a saner protocol.
@@ -45,6 +54,17 @@ class base(klass.SlotsPicklingMixin, immutable.Simple, memoize.WeaklyCachedABC):
         return 1
 
 
+def compile_match(restrict) -> typing.Callable[..., bool]:
+    """Return a compiled matcher for a restriction.
+
+    Objects that aren't :obj:`base` derivatives, e.g. duck typed restrictions
+    or restriction classes, fall back to their :obj:`match` method.
+    """
+    if isinstance(restrict, base):
+        return restrict.compile_match()
+    return restrict.match
+
+
 class AlwaysBool(base):
     """restriction that always yields a specific boolean"""
 
@@ -105,6 +125,17 @@ class Negate(base, caching=False):
     def match(self, *a, **kw):
         return not self._restrict.match(*a, **kw)
 
+    def compile_match(self):
+        if self.__class__.match is not Negate.match:
+            # derivatives overriding matching
+            return self.match
+        child = compile_match(self._restrict)
+
+        def match(*a, **kw):
+            return not child(*a, **kw)
+
+        return match
+
     def __str__(self):
         return "not (%s)" % self._restrict
 
@@ -169,6 +169,23 @@ class StrExactMatch(_HashedGenericEquality, base):
         else:
             return (self.exact == value.lower()) != self.negate
 
+    def compile_match(self):
+        if self.__class__.match is not StrExactMatch.match:
+            # derivatives overriding matching
+            return self.match
+        exact, negate = self.exact, self.negate
+        if self.case_sensitive:
+
+            def match(value):
+                return (exact == str(value)) != negate
+
+        else:
+
+            def match(value):
+                return (exact == str(value).lower()) != negate
+
+        return match
+
     def intersect(self, other):
         s1, s2 = self.exact, other.exact
         if other.case_sensitive and not self.case_sensitive:
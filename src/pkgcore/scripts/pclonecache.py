@@ -54,5 +54,8 @@ def main(options, out, err):
                 out.write(f"deleting {x}")
             del target[x]
 
+    if not target.autocommits:
+        target.commit()
+
     if options.verbosity > 0:
         out.write("took %i seconds" % int(time.time() - start))
@@ -27,6 +27,7 @@ from .. import fetch
 from ..ebuild import inspect_profile
 from ..ebuild import portageq as _portageq
 from ..package import errors
+from ..repository import filtered
 from ..restrictions import packages
 from ..util import commandline
 
@@ -276,12 +277,26 @@ license_usage = subparsers.add_parser(
 license_usage.bind_class(license_usage_kls())
 
 
+def _filtered_repo(repo):
+    """Determine if a repo, or any repo it wraps, filters its packages."""
+    while repo is not None:
+        if isinstance(repo, filtered.tree):
+            return True
+        repo = getattr(repo, "raw_repo", None)
+    return False
+
+
 class eclass_usage_kls(histo_data):
     per_repo_format = "eclass: %(key)r %(val)s pkgs found, %(percent)s of the repo"
 
     summary_format = "eclass: %(key)r %(val)s pkgs found, %(percent)s of all repos"
 
     def get_data(self, repo, options):
+        # use the repo's reverse eclass index when its packages aren't filtered
+        eclass_usage = getattr(repo, "eclass_usage", None)
+        if eclass_usage is not None and not _filtered_repo(repo):
+            data = {eclass: len(cpvs) for eclass, cpvs in eclass_usage().items()}
+            return data, len(repo)
         pos, data = 0, defaultdict(lambda: 0)
         for pos, pkg in enumerate(repo):
             for eclass in getattr(pkg, "inherited", ()):
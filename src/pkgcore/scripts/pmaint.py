@@ -13,11 +13,12 @@ from snakeoil.contexts import patch
 from snakeoil.fileutils import AtomicWriteFile
 from snakeoil.sequences import unique_stable
 
-from ..cache.flat_hash import md5_cache
+from ..cache import flat_hash, sqlite
 from ..ebuild import repository as ebuild_repo
 from ..ebuild import triggers
 from ..ebuild.cpv import CPV
 from ..ebuild.eclass import EclassDoc
+from ..ebuild.eclass_index import EclassIndex
 from ..exceptions import PkgcoreUserException
 from ..fs import contents, livefs
 from ..merge import triggers as merge_triggers
@@ -85,6 +86,7 @@ sync.add_argument(
 def sync_main(options, out, err):
     """Update local repos to match their remotes."""
     succeeded, failed = [], []
+    observer = observer_mod.formatter_output(out)
 
     for repo_name, repo in unique_stable(options.repos):
         # rewrite the name if it has the usual prefix
@@ -113,6 +115,8 @@ def sync_main(options, out, err):
         else:
             succeeded.append(repo_name)
             out.write(f"*** synced {repo_name}")
+            if (pkg_index := getattr(repo, "pkg_index", None)) is not None:
+                update_pkg_index(pkg_index, observer)
 
     out.flush()
     err.flush()
@@ -300,6 +304,23 @@ def update_pkg_desc_index(repo, observer):
     return ret
 
 
+def update_pkg_index(pkg_index, observer):
+    """Update a repo's package directory index stored alongside its metadata cache.
+
+    Silently skipped for indexes lacking write access.
+    """
+    if not pkg_index.writable:
+        return 0
+    try:
+        pkg_index.update()
+    except EnvironmentError as e:
+        observer.error(
+            f"Unable to update package index file {pkg_index.path!r}: {e.strerror}"
+        )
+        return os.EX_IOERR
+    return 0
+
+
 regen = subparsers.add_parser(
     "regen", parents=shared_options_domain, description="regenerate repository caches"
 )
@@ -336,6 +357,68 @@ regen_opts.add_argument(
         available processors.
     """,
 )
+regen_opts.add_argument(
+    "-m",
+    "--multiprocess",
+    action="store_true",
+    default=False,
+    help="regenerate using worker processes instead of threads",
+    docs="""
+        Regenerate metadata in separate worker processes, the number of which
+        is set via --threads, with a single process writing the results to the
+        cache. This avoids threads contending for the GIL while processing
+        metadata, allowing regeneration to scale across all available cores.
+    """,
+)
+regen_opts.add_argument(
+    "--batch-size",
+    type=int,
+    default=16,
+    help="number of ebuilds sourced per ebuild processor request",
+    docs="""
+        Number of ebuilds passed to an ebuild processor in a single request
+        when regenerating metadata, avoiding a round trip per ebuild. Setting
+        it to 1 sources each ebuild separately. Unused with --multiprocess.
+    """,
+)
+regen_opts.add_argument(
+    "--fork-server",
+    action="store_true",
+    default=False,
+    help="fork ebuild processors from one with all eclasses preloaded",
+    docs="""
+        Spawn a single ebuild processor that loads all of the repo's eclasses
+        up front, forking the processors used for regeneration from it. Every
+        processor then starts with all eclasses already defined instead of
+        loading them separately, keeping startup costs constant regardless of
+        the number of threads used.
+    """,
+)
+regen_opts.add_argument(
+    "--eclass-index",
+    action="store_true",
+    default=False,
+    help="reuse eclass artifacts cached in the user's cache dir",
+    docs="""
+        Use the persistent eclass index stored in the user's cache dir, shared
+        with pmaint eclass, when preloading eclasses into ebuild processors.
+        Eclasses that passed syntax checks during previous runs are preloaded
+        unchecked and the eclasses they inherit are preloaded alongside them.
+    """,
+)
+regen_opts.add_argument(
+    "-i",
+    "--incremental",
+    action="store_true",
+    default=False,
+    help="only regenerate entries affected by ebuild and eclass changes",
+    docs="""
+        Only regenerate cache entries for packages whose ebuild or inherited
+        eclasses changed since the last regen, determined by comparing file
+        mtimes against the state recorded by the previous run. Falls back to
+        regenerating the entire cache if no previous state exists.
+    """,
+)
 regen_opts.add_argument(
     "--force",
     action="store_true",
@@ -348,6 +431,18 @@ regen_opts.add_argument(
     type=arghparse.create_dir,
     help="use separate directory to store repository caches",
 )
+regen_opts.add_argument(
+    "--cache-backend",
+    choices=("flat", "sqlite"),
+    default="flat",
+    help="cache backend to use with --dir",
+    docs="""
+        Metadata cache backend used for caches stored in the directory
+        specified via --dir. The default, flat, stores a file per package
+        while sqlite stores all of a repo's entries in a single indexed
+        database file.
+    """,
+)
 regen_opts.add_argument(
     "--rsync",
     action="store_true",
@@ -368,17 +463,27 @@ regen_opts.add_argument(
 )
 
 
+_cache_backends = {
+    "flat": flat_hash.md5_cache,
+    "sqlite": sqlite.md5_cache,
+}
+
+
 @regen.bind_main_func
 def regen_main(options, out, err):
     """Regenerate a repository cache."""
     ret = []
 
     observer = observer_mod.formatter_output(out)
+    index = EclassIndex() if options.eclass_index else None
     for repo in unique_stable(options.repos):
         if options.cache_dir is not None:
             # recreate new repo object with cache dir override
-            cache = (md5_cache(pjoin(options.cache_dir.rstrip(os.sep), repo.repo_id)),)
+            cache_kls = _cache_backends[options.cache_backend]
+            cache = (cache_kls(pjoin(options.cache_dir.rstrip(os.sep), repo.repo_id)),)
             repo = ebuild_repo.tree(options.config, repo.config, cache=cache)
+        if index is not None and getattr(repo, "eclass_cache", None) is not None:
+            repo.eclass_cache.index = index
         if not repo.operations.supports("regen_cache"):
             out.write(f"repo {repo} doesn't support cache regeneration")
             continue
@@ -390,6 +495,10 @@ def regen_main(options, out, err):
         ret.append(
             repo.operations.regen_cache(
                 threads=options.threads,
+                multiprocess=options.multiprocess,
+                fork_server=options.fork_server,
+                batch_size=options.batch_size,
+                incremental=options.incremental,
                 observer=observer,
                 force=options.force,
                 eclass_caching=(not options.disable_eclass_caching),
@@ -413,6 +522,8 @@ def regen_main(options, out, err):
                 )
                 ret.append(os.EX_IOERR)
 
+        if (pkg_index := getattr(repo, "pkg_index", None)) is not None:
+            ret.append(update_pkg_index(pkg_index, observer))
         if options.use_local_desc:
             ret.append(update_use_local_desc(repo, observer))
         if options.pkg_desc_index:
@@ -550,6 +661,8 @@ def _eclass_main(options, out, err):
     # determine output file extension
     ext_map = {"man": "5"}
     ext = ext_map.get(options.format, options.format)
+    # reuse docs parsed for unchanged eclasses
+    index = EclassIndex()
 
     for path in options.eclasses:
         try:
@@ -563,7 +676,7 @@ def _eclass_main(options, out, err):
             out.write("Compiling: ", path)
             os.makedirs(os.path.dirname(filename), exist_ok=True)
             with open(filename, "wt") as f:
-                obj = EclassDoc(path, sourced=True)
+                obj = EclassDoc(path, sourced=True, index=index)
                 convert_func = getattr(obj, f"to_{options.format}")
                 f.write(convert_func())
         except NotImplementedError as e:
@@ -22,6 +22,7 @@ from ..merge import errors as merge_errors
 from ..operations import format, observer
 from ..repository.util import get_raw_repos
 from ..repository.virtual import RestrictionRepo
+from ..resolver.profile import ResolverProfile
 from ..resolver.util import reduce_to_failures
 from ..restrictions import packages
 from ..restrictions.boolean import OrRestriction
@@ -406,6 +407,32 @@ debug_options.add_argument(
     """,
 )
 
+debug_options.add_argument(
+    "--resolver-profile",
+    metavar="FILE",
+    help="write resolver profiling data to a file",
+    docs="""
+        Record per-atom resolution timings along with choice, backtrack, cycle
+        check, and repository query statistics, writing them to the given
+        file once resolution finishes.
+
+        This is primarily used for tracking down which atoms and dependency
+        branches are responsible for slow resolutions.
+    """,
+)
+debug_options.add_argument(
+    "--resolver-profile-format",
+    choices=tuple(ResolverProfile.formats),
+    default="json",
+    help="resolver profiling data format (defaults to json)",
+    docs="""
+        Output format for --resolver-profile data. The ``json`` format
+        contains overall statistics and per-atom timings sorted by time spent
+        while ``folded`` outputs folded stacks with self times in microseconds
+        for use with flamegraph tools.
+    """,
+)
+
 
 class AmbiguousQuery(parserestrict.ParseError):
     """Exception for multiple matches where a single match is required."""
@@ -914,6 +941,8 @@ def main(options, out, err):
     #    hp.setrelheap()
 
     extra_kwargs["pdb_intercept"] = tuple(x[1] for x in options.pdb_intercept)
+    if options.resolver_profile is not None:
+        extra_kwargs["profile"] = ResolverProfile()
 
     resolver_inst = options.resolver_kls(
         vdbs=installed_repos,
@@ -959,6 +988,13 @@ def main(options, out, err):
         ret = resolver_inst.add_atoms(atoms, finalize=True)
     resolve_time = time() - resolve_time
 
+    if options.resolver_profile is not None:
+        try:
+            with open(options.resolver_profile, "w") as f:
+                resolver_inst.profile.write(f, options.resolver_profile_format)
+        except EnvironmentError as e:
+            out.error(f"failed writing resolver profile: {e}")
+
     if failures:
         out.write()
         out.write("Failures encountered:")
@@ -900,7 +900,6 @@ def parse_eapi(value):
     return packages.PackageRestriction("eapi", values.StrExactMatch(value))
 
 
-@bind_add_query("--owns", action="append", help="exact match on an owned file/dir")
 def parse_owns(value):
     return packages.PackageRestriction(
         "contents",
@@ -910,6 +909,41 @@ def parse_owns(value):
     )
 
 
+@bind_add_query(
+    "--owns",
+    action="append",
+    type=None,
+    bind="final_converter",
+    help="exact match on an owned file/dir",
+)
+def owns_finalize(sequence, namespace):
+    """Match packages owning files via their repo's file ownership index.
+
+    Repos lacking an index fall back to scanning package contents.
+    """
+    if not sequence:
+        return []
+    repos = list(namespace.repos)
+    l = []
+    for repo in repos:
+        if (owners := getattr(repo, "owners", None)) is None:
+            r = packages.OrRestriction(*map(parse_owns, sequence))
+        else:
+            cpvs = frozenset().union(*owners(sequence).values())
+            r = packages.PackageRestriction(
+                "cpvstr", values.FunctionRestriction(cpvs.__contains__)
+            )
+        if len(repos) > 1:
+            r = packages.AndRestriction(
+                packages.PackageRestriction(
+                    "repo.repo_id", values.StrExactMatch(repo.repo_id)
+                ),
+                r,
+            )
+        l.append(r)
+    return l
+
+
 @bind_add_query(
     "--owns-re", action="append", help='like "owns" but using a regexp for matching'
 )
@@ -1243,11 +1277,10 @@ def main(
 
     if options.query is None:
         return 0
-    for repo in options.repos:
+    repos = multiplex.tree(*options.repos, threads=options.domain.repo_threads)
+    for matches in repos.itermatch_repos(options.query, sorter=sorted):
         try:
-            for pkgs in pkgutils.groupby_pkg(
-                repo.itermatch(options.query, sorter=sorted)
-            ):
+            for pkgs in pkgutils.groupby_pkg(matches):
                 pkgs = list(pkgs)
                 if options.noversion:
                     print_packages_noversion(options, out, err, pkgs)
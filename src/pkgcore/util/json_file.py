@@ -0,0 +1,87 @@
+"""
+versioned json documents used to persist indexes and cached state
+
+Documents are loaded lazily, discarded when written by an incompatible
+version of their format, and written out atomically so readers never see
+partial updates.
+"""
+
+__all__ = ("JsonFile",)
+
+import json
+import os
+
+from snakeoil.fileutils import AtomicWriteFile
+
+from ..log import logger
+
+
+class JsonFile:
+    """Lazily loaded json document stored with a format version.
+
+    :cvar version: format version, documents with differing versions are
+        treated as missing
+    :cvar description: name of the document used in log messages
+    """
+
+    version = 1
+    description = "json file"
+
+    def __init__(self, path):
+        """
+        :param path: file the document is stored in
+        """
+        self.path = path
+        self._doc = None
+
+    @property
+    def _data(self):
+        if self._doc is None:
+            self._doc = self._load()
+        return self._doc
+
+    @property
+    def writable(self):
+        """Boolean signifying whether the document can be written out."""
+        path = os.path.dirname(self.path)
+        while path and not os.path.exists(path):
+            path = os.path.dirname(path)
+        return os.access(path, os.W_OK)
+
+    def _load(self):
+        """Return the stored document, or an empty dict if it's unusable."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (EnvironmentError, ValueError) as e:
+            logger.warning(f"failed loading {self.description} {self.path!r}: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return {}
+        return data
+
+    def _write(self, data):
+        """Atomically write out a document, replacing the loaded one.
+
+        :param data: mapping to store, tagged with the format version
+        :raises EnvironmentError: on failure writing the document
+        """
+        data = {"version": self.version, **data}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        f = AtomicWriteFile(self.path)
+        try:
+            json.dump(data, f, separators=(",", ":"))
+            f.close()
+        finally:
+            f.discard()
+        self._doc = data
+
+    @staticmethod
+    def _mtime(path):
+        """Return the mtime of a path in nanoseconds, or None if it's inaccessible."""
+        try:
+            return os.stat(path).st_mtime_ns
+        except EnvironmentError:
+            return None
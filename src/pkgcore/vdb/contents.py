@@ -1,11 +1,13 @@
-__all__ = ("LookupFsDev", "ContentsFile")
+__all__ = ("LookupFsDev", "ContentsFile", "iter_contents", "iter_paths")
 
+import mmap
 import os
 import stat
+from os.path import normpath
 
 from snakeoil import data_source
 from snakeoil.chksum import get_handler
-from snakeoil.fileutils import AtomicWriteFile, readlines_utf8
+from snakeoil.fileutils import AtomicWriteFile
 
 from .. import os_data
 from ..fs import fs
@@ -33,25 +35,164 @@ class LookupFsDev(fs.fsDev):
         super().__init__(path, **kwds)
 
 
+def _iter_lines(source, use_mmap=False):
+    if not isinstance(source, str):
+        with source.text_fileobj() as f:
+            for line in f:
+                if line := line.strip():
+                    yield line
+        return
+    if not use_mmap:
+        with open(source, encoding="utf8") as f:
+            for line in f:
+                if line := line.strip():
+                    yield line
+        return
+    with open(source, "rb") as f:
+        try:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            return
+    with m:
+        for line in iter(m.readline, b""):
+            if line := line.strip():
+                yield line.decode("utf8")
+
+
+def _parse_line(line):
+    s = line.split(" ")
+    if s[0] in ("dir", "dev", "fif"):
+        path = " ".join(s[1:])
+        if s[0] == "dir":
+            return fs.fsDir(path, strict=False)
+        elif s[0] == "dev":
+            return LookupFsDev(path, strict=False)
+        return fs.fsFifo(path, strict=False)
+    elif s[0] == "obj":
+        path = " ".join(s[1:-2])
+        return fs.fsFile(
+            path,
+            chksums={"md5": int(s[-2], 16)},
+            mtime=int(s[-1]),
+            strict=False,
+        )
+    elif s[0] == "sym":
+        try:
+            p = s.index("->")
+            return fs.fsLink(
+                " ".join(s[1:p]),
+                " ".join(s[p + 1 : -1]),
+                mtime=int(s[-1]),
+                strict=False,
+            )
+        except ValueError:
+            # XXX throw a corruption error
+            raise
+    raise Exception(f"unknown entry type {line!r}")
+
+
+def iter_contents(source, use_mmap=False):
+    """Yield fs objects for the entries of a CONTENTS file as they're parsed.
+
+    :param source: file path or :obj:`snakeoil.data_source.base` instance
+    :param use_mmap: read file paths via mmap rather than buffered reads
+    """
+    for line in _iter_lines(source, use_mmap):
+        yield _parse_line(line)
+
+
+def iter_paths(source, use_mmap=False):
+    """Yield the paths of the entries of a CONTENTS file without creating fs objects.
+
+    :param source: file path or :obj:`snakeoil.data_source.base` instance
+    :param use_mmap: read file paths via mmap rather than buffered reads
+    """
+    for line in _iter_lines(source, use_mmap):
+        kind, _, entry = line.partition(" ")
+        if kind == "obj":
+            # obj <path> <md5> <mtime>
+            entry = entry.rsplit(" ", 2)[0]
+        elif kind == "sym":
+            # sym <path> -> <target> <mtime>
+            entry = entry.partition(" -> ")[0]
+        yield normpath(entry)
+
+
 class ContentsFile(contentsSet):
-    """class wrapping a contents file"""
+    """class wrapping a contents file
 
-    def __init__(self, source, mutable=False, create=False):
+    Entries are parsed lazily; iteration streams fs objects from the file and
+    membership tests only collect entry paths. The full set of fs objects is
+    built on first modification or lookup of a specific entry.
+    """
+
+    def __init__(self, source, mutable=False, create=False, use_mmap=False):
         if not isinstance(source, (data_source.base, str)):
             raise TypeError("source must be either data_source, or a filepath")
-        super().__init__(mutable=True)
         self._source = source
+        self._use_mmap = use_mmap
+        # created files start out empty
+        self._loaded = create
+        self._paths = None
+        super().__init__(mutable=True)
+        self.mutable = mutable
 
-        if not create:
-            self.update(self._iter_contents())
+    @property
+    def _dict(self):
+        if not self._loaded:
+            self._entries.update((x.location, x) for x in self._iter_contents())
+            self._loaded = True
+            self._paths = None
+        return self._entries
 
-        self.mutable = mutable
+    @_dict.setter
+    def _dict(self, value):
+        self._entries = value
+
+    def _iter_contents(self):
+        return iter_contents(self._source, self._use_mmap)
+
+    def _get_paths(self):
+        if self._paths is None:
+            self._paths = frozenset(iter_paths(self._source, self._use_mmap))
+        return self._paths
+
+    def _keys(self):
+        if self._loaded:
+            return super()._keys()
+        return self._get_paths()
+
+    def _items(self):
+        if self._loaded:
+            return super()._items()
+        return ((x.location, x) for x in self._iter_contents())
+
+    def __iter__(self):
+        if self._loaded:
+            return super().__iter__()
+        return self._iter_contents()
+
+    def __contains__(self, key):
+        if self._loaded:
+            return super().__contains__(key)
+        if fs.isfs_obj(key):
+            return key.location in self._get_paths()
+        return normpath(key) in self._get_paths()
+
+    def __len__(self):
+        if self._loaded:
+            return super().__len__()
+        return len(self._get_paths())
 
     def clone(self, empty=False):
-        # create is used to block it from reading.
-        cset = self.__class__(self._source, mutable=True, create=True)
+        # create is used to block it from reading; clones are snapshots of the
+        # parsed entries, which are kept so later clones don't reparse the file.
+        cset = self.__class__(
+            self._source, mutable=True, create=True, use_mmap=self._use_mmap
+        )
         if not empty:
-            cset.update(self)
+            cset.update(self._dict.values())
         return cset
 
     def add(self, obj):
@@ -62,72 +203,31 @@ class ContentsFile(contentsSet):
 
         contentsSet.add(self, obj)
 
-    def _get_fd(self, write=False):
+    def _get_fd(self):
         if isinstance(self._source, str):
-            if write:
-                return AtomicWriteFile(
-                    self._source,
-                    uid=os_data.root_uid,
-                    gid=os_data.root_gid,
-                    perms=0o644,
-                )
-            return readlines_utf8(self._source, True)
-        fobj = self._source.text_fileobj(writable=write)
-        if write:
-            fobj.seek(0, 0)
-            fobj.truncate(0)
+            return AtomicWriteFile(
+                self._source,
+                uid=os_data.root_uid,
+                gid=os_data.root_gid,
+                perms=0o644,
+            )
+        fobj = self._source.text_fileobj(writable=True)
+        fobj.seek(0, 0)
+        fobj.truncate(0)
         return fobj
 
     def flush(self):
         return self._write()
 
-    def _iter_contents(self):
-        self.clear()
-        for line in self._get_fd():
-            if not line:
-                continue
-            s = line.split(" ")
-            if s[0] in ("dir", "dev", "fif"):
-                path = " ".join(s[1:])
-                if s[0] == "dir":
-                    obj = fs.fsDir(path, strict=False)
-                elif s[0] == "dev":
-                    obj = LookupFsDev(path, strict=False)
-                else:
-                    obj = fs.fsFifo(path, strict=False)
-            elif s[0] == "obj":
-                path = " ".join(s[1:-2])
-                obj = fs.fsFile(
-                    path,
-                    chksums={"md5": int(s[-2], 16)},
-                    mtime=int(s[-1]),
-                    strict=False,
-                )
-            elif s[0] == "sym":
-                try:
-                    p = s.index("->")
-                    obj = fs.fsLink(
-                        " ".join(s[1:p]),
-                        " ".join(s[p + 1 : -1]),
-                        mtime=int(s[-1]),
-                        strict=False,
-                    )
-
-                except ValueError:
-                    # XXX throw a corruption error
-                    raise
-            else:
-                raise Exception(f"unknown entry type {line!r}")
-
-            yield obj
-
     def _write(self):
         md5_handler = get_handler("md5")
+        # read any unparsed entries before the source is truncated
+        entries = sorted(self)
         outfile = None
         try:
-            outfile = self._get_fd(True)
+            outfile = self._get_fd()
 
-            for obj in sorted(self):
+            for obj in entries:
                 if obj.is_reg:
                     s = " ".join(
                         (
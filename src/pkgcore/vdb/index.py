@@ -0,0 +1,194 @@
+"""
+persistent index of installed packages and their commonly used metadata
+
+Loading the vdb requires listing every category directory and reading a
+separate file for every metadata key of every installed package. This index
+stores the installed package list alongside the SLOT, USE, repository, and
+dependency metadata of each package. Entries are validated against the mtime
+of the directory they were read from, with stale entries falling back to
+reading the vdb directly.
+"""
+
+__all__ = ("VdbIndex",)
+
+from os.path import join as pjoin
+
+from snakeoil.fileutils import readfile
+from snakeoil.osutils import listdir_dirs
+
+from ..ebuild.cpv import VersionedCPV
+from ..ebuild.errors import InvalidCPV
+from ..log import logger
+from ..util.json_file import JsonFile
+
+
+def _skip_pkg_dir(name):
+    return name.startswith((".tmp.", "-MERGING-")) or name.endswith(".lockfile")
+
+
+class VdbIndex(JsonFile):
+    """Installed package index for a vdb.
+
+    Each package's metadata is keyed to its package directory's mtime, so
+    packages merged or unmerged by other package managers are detected and
+    read from the vdb instead of the index.
+    """
+
+    description = "vdb index"
+
+    # metadata files stored in the index
+    keys = (
+        "EAPI",
+        "SLOT",
+        "USE",
+        "repository",
+        "BDEPEND",
+        "DEPEND",
+        "RDEPEND",
+        "PDEPEND",
+        "IDEPEND",
+    )
+
+    def __init__(self, location, path):
+        """
+        :param location: on disk location of the vdb
+        :param path: file the index is stored in, must be outside the vdb
+            since writing it would otherwise alter the vdb's mtime
+        """
+        super().__init__(path)
+        self.location = location
+
+    def _load(self):
+        data = super()._load()
+        # indexes for vdbs under different roots can share a cache location
+        if data.get("location") != self.location:
+            return {}
+        return data
+
+    @property
+    def indexed(self):
+        """Boolean signifying whether an index of the vdb has been written."""
+        return bool(self._data)
+
+    @property
+    def fresh(self):
+        """Boolean signifying whether the category list is up to date."""
+        mtime = self._data.get("mtime")
+        return mtime is not None and mtime == self._mtime(self.location)
+
+    def categories(self):
+        """Return the vdb's categories, or None if the entry is stale."""
+        if not self.fresh:
+            return None
+        return tuple(self._data["categories"])
+
+    def _category(self, category):
+        entry = self._data.get("categories", {}).get(category)
+        if entry is None or entry[0] != self._mtime(pjoin(self.location, category)):
+            return None
+        return entry[1]
+
+    def packages(self, category):
+        """Return a mapping of a category's packages to their versions.
+
+        Returns None if the entry is stale.
+        """
+        pkgs = self._category(category)
+        if pkgs is None:
+            return None
+        d = {}
+        # sorted for stable ordering regardless of the order dirs were listed in
+        for pkgdir in sorted(pkgs):
+            _mtime, package, fullver, _metadata = pkgs[pkgdir]
+            d.setdefault(package, []).append(fullver)
+        return d
+
+    def metadata(self, category, pkgdir):
+        """Return the indexed metadata of a package, or None if the entry is stale.
+
+        :param category: package category
+        :param pkgdir: package directory name, e.g. 'foo-1.0-r1'
+        """
+        entry = self._data.get("categories", {}).get(category)
+        if entry is None or (entry := entry[1].get(pkgdir)) is None:
+            return None
+        if entry[0] != self._mtime(pjoin(self.location, category, pkgdir)):
+            return None
+        return entry[3]
+
+    def _read_metadata(self, path):
+        metadata = {}
+        for key in self.keys:
+            data = readfile(pjoin(path, key), True)
+            if data is not None:
+                metadata[key] = data.rstrip("\n")
+        return metadata
+
+    def _scan_category(self, category, old):
+        cpath = pjoin(self.location, category)
+        mtime = self._mtime(cpath)
+        if mtime is None:
+            return None
+        old = old[1] if old is not None else {}
+        pkgs = {}
+        for pkgdir in sorted(listdir_dirs(cpath)):
+            if _skip_pkg_dir(pkgdir):
+                continue
+            path = pjoin(cpath, pkgdir)
+            pkg_mtime = self._mtime(path)
+            if (entry := old.get(pkgdir)) is not None and entry[0] == pkg_mtime:
+                pkgs[pkgdir] = entry
+                continue
+            try:
+                pkg = VersionedCPV(f"{category}/{pkgdir}")
+            except InvalidCPV:
+                # leave invalid entries for the vdb itself to complain about
+                return None
+            pkgs[pkgdir] = (
+                pkg_mtime,
+                pkg.package,
+                pkg.fullver,
+                self._read_metadata(path),
+            )
+        return mtime, pkgs
+
+    def update(self, categories=None):
+        """Rescan stale entries and write out the index.
+
+        :param categories: categories to rescan, e.g. those of merged or
+            unmerged packages, defaults to rescanning all categories
+        :return: True if the index was written, False otherwise
+        """
+        mtime = self._mtime(self.location)
+        if mtime is None:
+            return False
+        old = self._data.get("categories", {})
+        try:
+            listing = sorted(
+                x for x in listdir_dirs(self.location) if not x.startswith(".")
+            )
+            if categories is None:
+                scan, entries = listing, {}
+            else:
+                scan = sorted(set(categories).intersection(listing))
+                entries = {k: v for k, v in old.items() if k in listing}
+            for category in scan:
+                entries.pop(category, None)
+                entry = self._scan_category(category, old.get(category))
+                if entry is not None:
+                    entries[category] = entry
+        except EnvironmentError as e:
+            logger.warning(f"failed scanning vdb {self.location!r}: {e}")
+            return False
+        # unindexed categories leave the whole listing stale
+        if entries.keys() != set(listing):
+            mtime = None
+        categories = dict(sorted(entries.items()))
+
+        data = {"location": self.location, "mtime": mtime, "categories": categories}
+        try:
+            self._write(data)
+        except EnvironmentError as e:
+            logger.debug(f"failed writing vdb index {self.path!r}: {e}")
+            return False
+        return True
@@ -6,7 +6,7 @@ import stat
 from functools import partial
 from os.path import join as pjoin
 
-from snakeoil import data_source
+from snakeoil import data_source, klass
 from snakeoil.fileutils import readfile
 from snakeoil.mappings import IndeterminantDict
 from snakeoil.osutils import listdir_dirs
@@ -20,6 +20,8 @@ from ..package import base as pkg_base
 from ..repository import errors, prototype, wrapper
 from . import repo_ops
 from .contents import ContentsFile
+from .index import VdbIndex
+from .owners import OwnersIndex
 
 
 class tree(prototype.tree):
@@ -73,7 +75,53 @@ class tree(prototype.tree):
     def configure(self, *args):
         return ConfiguredTree(self, *args)
 
+    @klass.jit_attr
+    def index(self):
+        """Persistent index of installed packages, None if caching is disabled."""
+        if self.cache_location is None:
+            return None
+        return VdbIndex(self.location, pjoin(self.cache_location, "pkgcore-index.json"))
+
+    def update_index(self, categories=None):
+        """Rescan stale vdb index entries and write the index out.
+
+        :param categories: categories to rescan, defaults to all categories
+        :return: True if the index was written, False otherwise
+        """
+        if self.index is None:
+            return False
+        return self.index.update(categories)
+
+    @klass.jit_attr
+    def owners_index(self):
+        """Persistent reverse file ownership index, None if caching is disabled."""
+        if self.cache_location is None:
+            return None
+        return OwnersIndex(
+            self.location, pjoin(self.cache_location, "pkgcore-owners.sqlite")
+        )
+
+    def owners(self, paths):
+        """Return a mapping of owned paths to the cpvs of the packages owning them.
+
+        :param paths: iterable of absolute file paths
+        """
+        if self.owners_index is not None:
+            return self.owners_index.owners(paths)
+        paths = {os.path.normpath(x) for x in paths}
+        d = {}
+        for pkg in self:
+            for path in paths.intersection(x.location for x in pkg.contents):
+                d.setdefault(path, set()).add(pkg.cpvstr)
+        return d
+
     def _get_categories(self):
+        if self.index is not None:
+            # stale entries fall back to the vdb, only missing indexes are built
+            if not self.index.indexed and self.index.writable:
+                self.update_index()
+            if (categories := self.index.categories()) is not None:
+                return categories
         try:
             try:
                 return tuple(
@@ -85,6 +133,12 @@ class tree(prototype.tree):
             pass
 
     def _get_packages(self, category):
+        if self.index is not None:
+            if (pkgs := self.index.packages(category)) is not None:
+                self._versions_tmp_cache.update(
+                    ((category, k), v) for k, v in pkgs.items()
+                )
+                return tuple(pkgs)
         cpath = pjoin(self.location, category.lstrip(os.path.sep))
         l = set()
         d = {}
@@ -157,15 +211,26 @@ class tree(prototype.tree):
     }
 
     def _get_metadata(self, pkg):
+        pkgdir = f"{pkg.package}-{pkg.fullver}"
+        indexed = None
+        if self.index is not None:
+            indexed = self.index.metadata(pkg.category, pkgdir)
         return IndeterminantDict(
             partial(
                 self._internal_load_key,
-                pjoin(self.location, pkg.category, f"{pkg.package}-{pkg.fullver}"),
+                pjoin(self.location, pkg.category, pkgdir),
+                indexed=indexed,
             )
         )
 
-    def _internal_load_key(self, path, key):
+    def _internal_load_key(self, path, key, indexed=None):
         key = self._metadata_rewrites.get(key, key)
+        if indexed is not None and key in VdbIndex.keys:
+            try:
+                return indexed[key]
+            except KeyError:
+                # file didn't exist when indexed
+                raise KeyError((path, key))
         if key == "contents":
             data = ContentsFile(pjoin(path, "CONTENTS"), mutable=True)
         elif key == "environment":
@@ -208,6 +273,18 @@ class tree(prototype.tree):
                     raise
                 # silently swallow it;
                 del oe
+        self._update_indexes(pkg)
+
+    def notify_add_package(self, pkg):
+        prototype.tree.notify_add_package(self, pkg)
+        self._update_indexes(pkg)
+
+    def _update_indexes(self, pkg):
+        """Update the persistent indexes for a merged or unmerged package."""
+        if self.index is not None and self.index.indexed:
+            self.update_index(categories=(pkg.category,))
+        if self.owners_index is not None:
+            self.owners_index.update_packages((pkg.cpvstr,))
 
     def __str__(self):
         return f"{self.repo_id}: location {self.location}"
@@ -0,0 +1,225 @@
+"""
+persistent reverse index mapping installed files to their owning packages
+
+Determining which packages own a file otherwise requires parsing the CONTENTS
+file of every installed package. This index stores each package's file paths
+in a sqlite database indexed by path, validated against the mtime of each
+package's CONTENTS file so packages merged or unmerged behind pkgcore's back
+are rescanned rather than misreported.
+"""
+
+__all__ = ("OwnersIndex",)
+
+import os
+import sqlite3
+from collections import defaultdict
+from contextlib import closing
+from os.path import join as pjoin
+from os.path import normpath
+
+from snakeoil.osutils import listdir_dirs
+
+from ..log import logger
+from .contents import iter_paths
+from .index import _skip_pkg_dir
+
+
+class OwnersIndex:
+    """Reverse file ownership index for a vdb."""
+
+    version = 1
+    # max number of paths pulled per query
+    batch_size = 500
+
+    def __init__(self, location, path):
+        """
+        :param location: on disk location of the vdb
+        :param path: file the index is stored in, must be outside the vdb
+        """
+        self.location = location
+        self.path = path
+
+    @property
+    def writable(self):
+        """Boolean signifying whether the index can be written out."""
+        if os.path.exists(self.path):
+            return os.access(self.path, os.W_OK)
+        path = os.path.dirname(self.path)
+        while path and not os.path.exists(path):
+            path = os.path.dirname(path)
+        return os.access(path, os.W_OK)
+
+    def _connect(self, readonly=True):
+        """Open the index, returning None if no usable index exists."""
+        if readonly:
+            if not os.path.exists(self.path):
+                return None
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == self.version:
+            # indexes for vdbs under different roots can share a cache location
+            row = conn.execute("SELECT location FROM info").fetchone()
+            if row is not None and row[0] == self.location:
+                return conn
+        if readonly:
+            conn.close()
+            return None
+        conn.executescript(
+            "DROP TABLE IF EXISTS info;"
+            "DROP TABLE IF EXISTS packages;"
+            "DROP TABLE IF EXISTS files;"
+            "CREATE TABLE info (location TEXT NOT NULL);"
+            "CREATE TABLE packages "
+            "(cpv TEXT PRIMARY KEY NOT NULL, mtime INTEGER) WITHOUT ROWID;"
+            "CREATE TABLE files (path TEXT NOT NULL, cpv TEXT NOT NULL);"
+            "CREATE INDEX files_path ON files (path);"
+            "CREATE INDEX files_cpv ON files (cpv);"
+            f"PRAGMA user_version={self.version};"
+        )
+        with conn:
+            conn.execute("INSERT INTO info VALUES (?)", (self.location,))
+        return conn
+
+    def _scan(self):
+        """Return a mapping of installed package cpvs to their CONTENTS mtimes."""
+        pkgs = {}
+        for category in listdir_dirs(self.location):
+            if category.startswith("."):
+                continue
+            cpath = pjoin(self.location, category)
+            for pkgdir in listdir_dirs(cpath):
+                if _skip_pkg_dir(pkgdir):
+                    continue
+                try:
+                    mtime = os.stat(pjoin(cpath, pkgdir, "CONTENTS")).st_mtime_ns
+                except FileNotFoundError:
+                    mtime = None
+                pkgs[f"{category}/{pkgdir}"] = mtime
+        return pkgs
+
+    def _contents(self, cpv):
+        path = pjoin(self.location, cpv, "CONTENTS")
+        try:
+            yield from iter_paths(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _indexed(conn):
+        return dict(conn.execute("SELECT cpv, mtime FROM packages"))
+
+    def _query(self, conn, paths):
+        rows = []
+        for i in range(0, len(paths), self.batch_size):
+            batch = paths[i : i + self.batch_size]
+            query = ",".join("?" * len(batch))
+            query = f"SELECT path, cpv FROM files WHERE path IN ({query})"
+            rows.extend(conn.execute(query, batch))
+        return rows
+
+    def _update(self, conn, pkgs, removed=None):
+        indexed = self._indexed(conn)
+        stale = [cpv for cpv, mtime in pkgs.items() if indexed.get(cpv, 0) != mtime]
+        if removed is None:
+            removed = indexed.keys() - pkgs.keys()
+        else:
+            removed = indexed.keys() & removed
+        if not (stale or removed):
+            return False
+        with conn:
+            for cpv in removed.union(stale):
+                conn.execute("DELETE FROM files WHERE cpv=?", (cpv,))
+                conn.execute("DELETE FROM packages WHERE cpv=?", (cpv,))
+            for cpv in stale:
+                conn.executemany(
+                    "INSERT INTO files VALUES (?, ?)",
+                    ((path, cpv) for path in set(self._contents(cpv))),
+                )
+                conn.execute("INSERT INTO packages VALUES (?, ?)", (cpv, pkgs[cpv]))
+        return True
+
+    def update(self, pkgs=None):
+        """Rescan packages with changed CONTENTS files and write out the index.
+
+        :param pkgs: mapping of installed package cpvs to their CONTENTS mtimes,
+            scanned from the vdb if not passed
+        :return: True if the index was modified, False otherwise
+        """
+        try:
+            if pkgs is None:
+                pkgs = self._scan()
+            with closing(self._connect(readonly=False)) as conn:
+                return self._update(conn, pkgs)
+        except (EnvironmentError, sqlite3.Error) as e:
+            logger.debug(f"failed updating vdb owners index {self.path!r}: {e}")
+            return False
+
+    def update_packages(self, cpvs):
+        """Rescan the given packages and write out the index.
+
+        Used when merging or unmerging packages, leaving the rest of the index
+        untouched.
+
+        :param cpvs: iterable of package cpvs, packages no longer installed are
+            dropped from the index
+        :return: True if the index was modified, False otherwise
+        """
+        pkgs, removed = {}, set()
+        try:
+            for cpv in cpvs:
+                path = pjoin(self.location, cpv)
+                if not os.path.isdir(path):
+                    removed.add(cpv)
+                    continue
+                try:
+                    pkgs[cpv] = os.stat(pjoin(path, "CONTENTS")).st_mtime_ns
+                except FileNotFoundError:
+                    pkgs[cpv] = None
+            with closing(self._connect(readonly=False)) as conn:
+                return self._update(conn, pkgs, removed)
+        except (EnvironmentError, sqlite3.Error) as e:
+            logger.debug(f"failed updating vdb owners index {self.path!r}: {e}")
+            return False
+
+    def owners(self, paths):
+        """Return a mapping of owned paths to the cpvs of the packages owning them.
+
+        Packages that aren't indexed or have changed since they were indexed
+        are scanned directly if the index isn't writable.
+
+        :param paths: iterable of absolute file paths
+        """
+        paths = {normpath(x) for x in paths}
+        results = defaultdict(set)
+        if not paths:
+            return {}
+        try:
+            pkgs = self._scan()
+        except FileNotFoundError:
+            return {}
+        except EnvironmentError as e:
+            logger.warning(f"failed scanning vdb {self.location!r}: {e}")
+            return {}
+        if self.writable:
+            self.update(pkgs)
+
+        indexed, rows = {}, []
+        try:
+            if (conn := self._connect()) is not None:
+                with closing(conn):
+                    indexed = self._indexed(conn)
+                    rows = self._query(conn, sorted(paths))
+        except sqlite3.Error as e:
+            logger.warning(f"failed loading vdb owners index {self.path!r}: {e}")
+        fresh = {cpv for cpv, mtime in pkgs.items() if indexed.get(cpv, 0) == mtime}
+        for path, cpv in rows:
+            if cpv in fresh:
+                results[path].add(cpv)
+
+        for cpv in pkgs.keys() - fresh:
+            for path in paths.intersection(self._contents(cpv)):
+                results[path].add(cpv)
+        return dict(results)
@@ -0,0 +1,112 @@
+import gc
+import os
+
+from snakeoil.chksum import LazilyHashedPath
+
+from pkgcore.binpkg.remote import PackagesCacheV1
+from pkgcore.binpkg.repository import tree
+from pkgcore.binpkg.xpak import Xpak
+
+
+class FakeXpak(dict):
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self._chf_ = LazilyHashedPath(path)
+        self.mtime = self._chf_.mtime
+
+
+class FakePkg:
+    def __init__(self, cpvstr, path):
+        self.cpvstr = cpvstr
+        self.path = path
+
+
+class TestPackagesCache:
+    def test_update_from_xpak(self, tmp_path):
+        binpkg = tmp_path / "foo-1.tbz2"
+        binpkg.write_bytes(b"binpkg")
+        os.utime(binpkg, (1000, 1000))
+        cache = PackagesCacheV1(str(tmp_path / "Packages"))
+        pkg = FakePkg("cat/foo-1", str(binpkg))
+        cache.update_from_xpak(pkg, FakeXpak(pkg.path, SLOT="1", EAPI="8"))
+        assert cache.is_fresh(cache[pkg.cpvstr], pkg.path)
+        cache.commit()
+
+        # entries read back from the index are validated by size and mtime
+        cache = PackagesCacheV1(str(tmp_path / "Packages"))
+        entry = cache[pkg.cpvstr]
+        assert entry["SLOT"] == "1"
+        assert entry["SIZE"] == "6"
+        assert cache.is_fresh(entry, pkg.path)
+
+        os.utime(binpkg, (2000, 2000))
+        assert not cache.is_fresh(entry, pkg.path)
+        os.utime(binpkg, (1000, 1000))
+        binpkg.write_bytes(b"rebuilt binpkg")
+        os.utime(binpkg, (1000, 1000))
+        assert not cache.is_fresh(entry, pkg.path)
+        binpkg.unlink()
+        assert not cache.is_fresh(entry, pkg.path)
+
+    def test_is_fresh_missing_keys(self, tmp_path):
+        binpkg = tmp_path / "foo-1.tbz2"
+        binpkg.write_bytes(b"binpkg")
+        assert not PackagesCacheV1.is_fresh({}, str(binpkg))
+        assert not PackagesCacheV1.is_fresh({"mtime": "", "SIZE": "6"}, str(binpkg))
+
+    def test_is_fresh_float_mtime(self, tmp_path):
+        binpkg = tmp_path / "foo-1.tbz2"
+        binpkg.write_bytes(b"binpkg")
+        os.utime(binpkg, (1000.5, 1000.5))
+        entry = {"mtime": "1000.5", "SIZE": "6"}
+        assert PackagesCacheV1.is_fresh(entry, str(binpkg))
+
+    def test_update_from_repo(self, tmp_path):
+        (tmp_path / "cat").mkdir()
+        binpkgs = {}
+        for ver in ("1", "2"):
+            binpkgs[ver] = path = tmp_path / "cat" / f"foo-{ver}.tbz2"
+            path.write_bytes(b"binpkg")
+            Xpak.write_xpak(str(path), {"SLOT": ver, "EAPI": "8"})
+            os.utime(path, (1000.5, 1000.5))
+        repo = tree(str(tmp_path))
+        repo.cache.update_from_repo(repo)
+
+        cache = PackagesCacheV1(str(tmp_path / "Packages"))
+        assert sorted(cache.data) == ["cat/foo-1", "cat/foo-2"]
+        for ver, path in binpkgs.items():
+            entry = cache[f"cat/foo-{ver}"]
+            assert entry["SLOT"] == ver
+            assert cache.is_fresh(entry, str(path))
+
+        # entries of removed binpkgs are dropped and modified ones regenerated
+        binpkgs["1"].unlink()
+        Xpak.write_xpak(str(binpkgs["2"]), {"SLOT": "3", "EAPI": "8"})
+        repo = tree(str(tmp_path))
+        repo.cache.update_from_repo(repo)
+        cache = PackagesCacheV1(str(tmp_path / "Packages"))
+        assert list(cache.data) == ["cat/foo-2"]
+        assert cache["cat/foo-2"]["SLOT"] == "3"
+
+        # and the index is synced when regenerating the repo's cache
+        Xpak.write_xpak(str(binpkgs["2"]), {"SLOT": "4", "EAPI": "8"})
+        os.utime(binpkgs["2"], (2000, 2000))
+        assert tree(str(tmp_path)).operations.regen_cache() == 0
+        cache = PackagesCacheV1(str(tmp_path / "Packages"))
+        assert cache["cat/foo-2"]["SLOT"] == "4"
+
+    def test_refreshed_entries(self, tmp_path):
+        (tmp_path / "cat").mkdir()
+        path = tmp_path / "cat" / "foo-1.tbz2"
+        path.write_bytes(b"binpkg")
+        Xpak.write_xpak(str(path), {"SLOT": "1", "EAPI": "8"})
+        repo = tree(str(tmp_path))
+        assert [x.slot for x in repo] == ["1"]
+        assert not (tmp_path / "Packages").exists()
+
+        # entries refreshed from binpkgs are written out once the repo is released
+        del repo
+        gc.collect()
+        cache = PackagesCacheV1(str(tmp_path / "Packages"))
+        assert cache["cat/foo-1"]["SLOT"] == "1"
+        assert cache.is_fresh(cache["cat/foo-1"], str(path))
@@ -127,6 +127,19 @@ class TestBase:
             cache["spork"]["_eclasses_"]
         )
 
+    def test_get_many(self):
+        cache = self.get_db()
+        cache["spork"] = {"foo": "bar"}
+        cache["foon"] = {"_eclasses_": {"spork": _mk_chf_obj(mtime=1)}}
+        # corrupt entries are skipped along with missing ones
+        cache["dork"] = {"foo": "bar"}
+        cache._data["dork"]["_eclasses_"] = "spork"
+        data = dict(cache.get_many(["spork", "foon", "dork", "notaspork"]))
+        assert sorted(data) == ["foon", "spork"]
+        assert data["spork"]["foo"] == "bar"
+        assert data["foon"]["_eclasses_"] == [("spork", (("mtime", 1),))]
+        assert not list(cache.get_many([]))
+
     def test_readonly(self):
         cache = self.get_db()
         cache["spork"] = {"foo": "bar"}
@@ -96,3 +96,12 @@ class TestFlatHash:
         for key, raw_data in self.test_data:
             d = dict(raw_data)
             db[key] = d
+
+    @pytest.mark.parametrize("db", (False,), indirect=True)
+    def test_keys(self, db, tmp_path):
+        for key, raw_data in self.test_data:
+            db[key] = dict(raw_data)
+        # state files and in-progress updates aren't cache entries
+        (tmp_path / ".pkgcore-regen.json").touch()
+        (tmp_path / key.split("/")[0] / ".update.1.foo-1").touch()
+        assert sorted(db.keys()) == sorted(key for key, _ in self.test_data)
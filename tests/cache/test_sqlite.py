@@ -0,0 +1,146 @@
+import os
+
+import pytest
+from snakeoil.chksum import LazilyHashedPath
+
+from pkgcore.cache import errors, sqlite
+
+from . import test_base
+from .test_flat_hash import generic_data
+
+
+class db(sqlite.database):
+    def __setitem__(self, cpv, data):
+        data["_chf_"] = test_base._chf_obj
+        return sqlite.database.__setitem__(self, cpv, data)
+
+    def __getitem__(self, cpv):
+        d = dict(sqlite.database.__getitem__(self, cpv).items())
+        d.pop(f"_{self.chf_type}_", None)
+        return d
+
+
+class TestSqlite:
+    cache_keys = (
+        "DEPEND",
+        "RDEPEND",
+        "EAPI",
+        "HOMEPAGE",
+        "KEYWORDS",
+        "LICENSE",
+        "PDEPEND",
+        "RESTRICT",
+        "SLOT",
+        "SRC_URI",
+        "_eclasses_",
+        "_mtime_",
+    )
+
+    @pytest.fixture
+    def db(self, tmp_path):
+        return db(str(tmp_path), auxdbkeys=self.cache_keys)
+
+    def test_empty(self, db):
+        assert "sys-apps/foo-1" not in db
+        assert list(db) == []
+        with pytest.raises(KeyError):
+            db["sys-apps/foo-1"]
+        with pytest.raises(KeyError):
+            del db["sys-apps/foo-1"]
+
+    def test_roundtrip(self, db, tmp_path):
+        key, raw_data = generic_data
+        db[key] = dict(raw_data)
+        db.commit()
+        assert os.path.exists(tmp_path / db.db_filename)
+
+        d = db[key]
+        assert key in db
+        assert list(db) == [key]
+        assert d["DEPEND"] == "virtual/libc dev-lang/perl"
+        assert d["SLOT"] == "0"
+        # unknown keys are dropped
+        assert "DESCRIPTION" not in d
+        eclasses = dict(raw_data)["_eclasses_"]
+        assert sorted(dict(d["_eclasses_"])) == sorted(eclasses)
+        for eclass, chfs in d["_eclasses_"]:
+            assert dict(chfs)["mtime"] == eclasses[eclass].mtime
+            assert dict(chfs)["eclassdir"] == "/var/gentoo/repos/gentoo"
+
+    def test_persistence(self, db, tmp_path):
+        key, raw_data = generic_data
+        db[key] = dict(raw_data)
+        db.commit()
+
+        # a fresh instance sees committed data, including readonly access
+        for readonly in (False, True):
+            other = db.__class__(
+                str(tmp_path), auxdbkeys=self.cache_keys, readonly=readonly
+            )
+            assert list(other) == [key]
+            assert other[key]["SLOT"] == "0"
+
+    def test_commit(self, db, tmp_path):
+        key, raw_data = generic_data
+        other = db.__class__(str(tmp_path), auxdbkeys=self.cache_keys)
+        # writes are committed by default
+        db[key] = dict(raw_data)
+        assert list(other) == [key]
+
+        # unless they're explicitly batched
+        db.set_sync_rate(100)
+        db[f"{key}-r1"] = dict(raw_data)
+        assert list(other) == [key]
+        db.commit()
+        assert list(other) == [key, f"{key}-r1"]
+
+    def test_get_many(self, db):
+        key, raw_data = generic_data
+        keys = [f"{key}-r{i}" for i in range(1, db.batch_size + 2)]
+        for k in keys:
+            db[k] = dict(raw_data)
+        data = dict(db.get_many(keys + ["sys-apps/foo-1"]))
+        assert sorted(data) == sorted(keys)
+        assert all(d["SLOT"] == "0" for d in data.values())
+        assert len(data[keys[0]]["_eclasses_"]) == 4
+
+    def test_delitem(self, db):
+        key, raw_data = generic_data
+        db[key] = dict(raw_data)
+        del db[key]
+        assert key not in db
+        assert list(db) == []
+
+    def test_readonly(self, tmp_path):
+        cache = db(str(tmp_path), auxdbkeys=self.cache_keys, readonly=True)
+        key, raw_data = generic_data
+        with pytest.raises(errors.ReadOnly):
+            cache[key] = dict(raw_data)
+        # missing db files are treated as empty
+        assert list(cache) == []
+        assert not os.path.exists(tmp_path / cache.db_filename)
+
+    def test_corruption(self, tmp_path):
+        (tmp_path / sqlite.database.db_filename).write_text("garbage" * 1000)
+        cache = db(str(tmp_path), auxdbkeys=self.cache_keys, readonly=True)
+        with pytest.raises(errors.CacheError):
+            list(cache)
+
+
+class TestMd5Cache:
+    def test_validate_entry(self, tmp_path):
+        ebuild = tmp_path / "foo-1.ebuild"
+        ebuild.write_text("EAPI=8\n")
+        ebuild_hash = LazilyHashedPath(str(ebuild))
+
+        cache = sqlite.md5_cache(str(tmp_path))
+        cache["cat/foo-1"] = {"SLOT": "0", "_chf_": ebuild_hash}
+        cache.commit()
+        assert os.path.exists(tmp_path / "metadata" / "md5-cache.sqlite")
+
+        data = cache["cat/foo-1"]
+        assert data["_md5_"] == ebuild_hash.md5
+        assert cache.validate_entry(data, ebuild_hash, None)
+
+        ebuild.write_text("EAPI=8\nSLOT=1\n")
+        assert not cache.validate_entry(data, LazilyHashedPath(str(ebuild)), None)
@@ -2,6 +2,8 @@ from functools import partial
 
 import pytest
 
+from pkgcore import const
+
 
 def pytest_addoption(parser):
     parser.addoption(
@@ -11,6 +13,19 @@ def pytest_addoption(parser):
         default=False,
         help="allow network related tests to run",
     )
+    parser.addoption(
+        "--filter-env-corpus",
+        dest="filter_env_corpus",
+        default=None,
+        metavar="DIR",
+        help="benchmark filtering the environment.bz2 files found under DIR",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _user_cache(tmp_path_factory, monkeypatch):
+    """Keep caches written by tests out of the user's cache dir."""
+    monkeypatch.setattr(const, "USER_CACHE_PATH", str(tmp_path_factory.mktemp("cache")))
 
 
 def mark_network(config, func):
@@ -163,6 +163,28 @@ class TestAtom(TestRestriction):
                 self.assertMatch(a, eq_cpv)
                 self.assertMatch(a, le_cpv)
 
+    def test_compile_match(self):
+        a = self.kls(">=app-arch/tarsync-1.1-r2:0::gentoo")
+        matcher = a.compile_match()
+        # compiled matchers are cached per atom
+        assert a.compile_match() is matcher
+        for ver, slot, repo, result in (
+            ("1.1-r2", "0", "gentoo", True),
+            ("1.2", "0", "gentoo", True),
+            ("1.1-r1", "0", "gentoo", False),
+            ("1.2", "1", "gentoo", False),
+            ("1.2", "0", "other", False),
+        ):
+            pkg = FakePkg(
+                f"app-arch/tarsync-{ver}", slot=slot, repo=FakeRepo(repo_id=repo)
+            )
+            assert matcher(pkg) == result
+            assert a.match(pkg) == result
+        pkg = FakePkg("app-arch/foo-1.2", slot="0", repo=FakeRepo(repo_id="gentoo"))
+        assert not matcher(pkg)
+        # objects lacking the required attributes use the generic path
+        assert not matcher(object())
+
     def test_norev(self):
         astr = "app-arch/tarsync"
         a = self.kls(f"~{astr}-1")
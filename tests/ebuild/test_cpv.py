@@ -328,6 +328,61 @@ class TestCPV:
             "da/ba-6.0-r0", versioned=True
         )
 
+    def test_version_key(self):
+        versions = (
+            "0",
+            "00",
+            "1",
+            "1_alpha",
+            "1_alpha0_p1",
+            "1_beta2",
+            "1_pre",
+            "1_rc1",
+            "1_p",
+            "1_p1_alpha",
+            "1a",
+            "1.0",
+            "1.01",
+            "1.010",
+            "1.02",
+            "1.1",
+            "1.0.0",
+            "6.054",
+            "6.2",
+            "12.2b",
+            "12.2.5",
+        )
+        for v1 in versions:
+            for v2 in versions:
+                expected = cpv.ver_cmp(v1, cpv.Revision(""), v2, cpv.Revision(""))
+                key1, key2 = cpv.version_key(v1), cpv.version_key(v2)
+                assert ((key1 > key2) - (key1 < key2)) == expected, (v1, v2)
+
+    def test_sort_key(self):
+        vkls = cpv.VersionedCPV
+        pkgs = [
+            vkls("da/ba-6.0_alpha0_p1"),
+            vkls("da/ba-6.0_alpha"),
+            vkls("da/ba-6.01.0-r1"),
+            vkls("da/ba-6.1"),
+            vkls("da/ba-6.09"),
+            vkls("da/ba-6.0.1"),
+            vkls("da/bb-1"),
+            vkls("db/ba-1"),
+        ]
+        expected = sorted(pkgs)
+        assert sorted(pkgs, key=lambda x: x.sort_key) == expected
+        assert cpv.UnversionedCPV("da/ba").sort_key < pkgs[0].sort_key
+
+    def test_interned(self):
+        obj1 = cpv.VersionedCPV("".join(["dev-util/", "diffball-1.0-r1"]))
+        obj2 = cpv.VersionedCPV("".join(["dev-util/", "diffball-2.0-r1"]))
+        assert obj1.category is obj2.category
+        assert obj1.package is obj2.package
+        assert obj1.key is obj2.key
+        assert obj1.revision is obj2.revision
+        assert obj1 < obj2
+
     def test_no_init(self):
         """Test if the cpv is in a somewhat sane state if __init__ fails.
 
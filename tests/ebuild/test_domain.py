@@ -25,15 +25,25 @@ class TestDomain:
         self.pkeywordsdir = self.confdir / "package.accept_keywords"
         self.pkeywordsdir.mkdir()
 
-    def mk_domain(self):
+    def mk_domain(self, **settings):
         return domain_mod.domain(
             profiles.OnDiskProfile(str(self.profile_base), "profile1"),
             [],
             [],
             ROOT=self.rootdir,
             config_dir=self.confdir,
+            **settings,
         )
 
+    def test_repo_threads(self, caplog):
+        assert self.mk_domain().repo_threads == 1
+        domain = self.mk_domain(PKGCORE_REPO_THREADS="4")
+        assert domain.repo_threads == 4
+        assert domain.source_repos.threads == 4
+        assert self.mk_domain(PKGCORE_REPO_THREADS="0").repo_threads == 1
+        assert self.mk_domain(PKGCORE_REPO_THREADS="foo").repo_threads == 1
+        assert "invalid repo threads setting" in caplog.text
+
     def test_sorting(self):
         """assert that configuration files are read in alphanum ordering"""
         # assert the base state; no files, no content.
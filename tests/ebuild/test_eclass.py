@@ -1,6 +1,9 @@
 from contextlib import chdir
 
+import pytest
+
 from pkgcore.ebuild import eclass
+from pkgcore.ebuild.eclass_index import EclassIndex
 
 
 class FakeEclass:
@@ -245,3 +248,27 @@ class TestEclassDoc:
                     repo.eclass_cache.get_eclass("foo").path, repo=repo
                 ).provides
             ) == ["bar", "deep1", "deep2"]
+
+    def test_index(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "foo.eclass")
+        (tmp_path / "foo.eclass").write_text(FOO_ECLASS)
+        index = EclassIndex(str(tmp_path / "index.sqlite"))
+        doc = eclass.EclassDoc(path, sourced=True)
+        assert dict(eclass.EclassDoc(path, sourced=True, index=index)) == dict(doc)
+
+        # later parses and sourcing are pulled from the index
+        def fail(*args, **kwargs):
+            raise AssertionError("eclass reparsed")
+
+        monkeypatch.setattr(eclass.EclassDoc, "parse", staticmethod(fail))
+        monkeypatch.setattr(eclass.subprocess, "run", fail)
+        cached = eclass.EclassDoc(path, sourced=True, index=index)
+        assert dict(cached) == dict(doc)
+        assert cached.functions[0].name == "_foo_internal_func"
+        assert cached.exported_function_names == doc.exported_function_names
+        assert cached.to_rst() == doc.to_rst()
+
+        # changed eclasses are reparsed
+        (tmp_path / "foo.eclass").write_text(FOO_ECLASS + "\n")
+        with pytest.raises(AssertionError, match="reparsed"):
+            eclass.EclassDoc(path, index=index)
@@ -6,6 +6,7 @@ from snakeoil import data_source
 from snakeoil.chksum import LazilyHashedPath
 
 from pkgcore.ebuild import eclass_cache
+from pkgcore.package import errors
 
 
 class FakeEclassCache(eclass_cache.base):
@@ -47,6 +48,31 @@ class TestBase:
         data = self.ec.get_eclass_data(["eclass1"])
         assert data == {"eclass1": self.ec.eclasses["eclass1"]}
 
+    def test_eclass_usage(self):
+        class FakePkg:
+            def __init__(self, cpvstr, inherited):
+                self.cpvstr = cpvstr
+                self._inherited = inherited
+
+            @property
+            def inherited(self):
+                if self._inherited is None:
+                    raise errors.MetadataException(self, "inherited", "bad")
+                return self._inherited
+
+        pkgs = [
+            FakePkg("cat/pkg-1", ("eclass1",)),
+            FakePkg("cat/pkg-2", ("eclass1", "eclass2")),
+            FakePkg("cat/pkg-3", ()),
+            FakePkg("cat/pkg-4", None),
+        ]
+        assert self.ec.eclass_usage(iter(pkgs)) == {
+            "eclass1": {"cat/pkg-1", "cat/pkg-2"},
+            "eclass2": {"cat/pkg-2"},
+        }
+        assert self.ec.eclass_consumers("eclass2", pkgs) == {"cat/pkg-2"}
+        assert self.ec.eclass_consumers("eclass3", pkgs) == frozenset()
+
 
 class TestEclassCache(TestBase):
     @pytest.fixture(autouse=True)
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from pkgcore.ebuild.eclass_index import EclassIndex, _parse_inherits
+
+
+def test_parse_inherits():
+    data = """
+inherit foo bar
+case ${EAPI} in
+	7) inherit baz foo ;;
+esac
+[[ -n ${X} ]] && inherit qux || die
+inherit ${VAR} "quoted"
+# inherit commented
+uninherit nope
+"""
+    assert _parse_inherits(data) == ("foo", "bar", "baz", "qux")
+
+
+class TestEclassIndex:
+    @pytest.fixture
+    def index(self, tmp_path):
+        return EclassIndex(str(tmp_path / "cache" / "index.sqlite"))
+
+    @pytest.fixture
+    def eclass_cache(self, tmp_path):
+        eclasses = {}
+        for name, data in (
+            ("foo", "inherit bar\n"),
+            ("bar", "case x in\n\t*) inherit baz missing ;;\nesac\n"),
+            ("baz", ""),
+            ("unused", "inherit foo\n"),
+        ):
+            path = tmp_path / f"{name}.eclass"
+            path.write_text(data)
+            eclasses[name] = SimpleNamespace(path=str(path))
+        return SimpleNamespace(eclasses=eclasses)
+
+    def test_missing(self, index):
+        assert index.get("doc", "0" * 32) is None
+        assert index.get_many("doc", ["0" * 32]) == {}
+        assert not os.path.exists(index.path)
+
+    def test_get_set(self, index):
+        assert index.set("doc", "a" * 32, {"name": "foo", "funcs": ["x", "y"]})
+        assert index.get("doc", "a" * 32) == {"name": "foo", "funcs": ["x", "y"]}
+        # artifacts are separate per key
+        assert index.get("sourced", "a" * 32) is None
+
+        assert index.update("valid", {str(x) * 32: True for x in range(3)})
+        assert index.get_many("valid", ["0" * 32, "2" * 32, "b" * 32]) == {
+            "0" * 32: True,
+            "2" * 32: True,
+        }
+        # empty updates aren't written
+        assert not index.update("valid", {})
+
+    def test_batches(self, index, monkeypatch):
+        monkeypatch.setattr(index, "batch_size", 2)
+        chksums = [f"{x:032x}" for x in range(5)]
+        index.update("valid", dict.fromkeys(chksums, True))
+        assert index.get_many("valid", chksums) == dict.fromkeys(chksums, True)
+
+    def test_version_mismatch(self, index):
+        index.set("doc", "a" * 32, "data")
+        with sqlite3.connect(index.path) as conn:
+            conn.execute("PRAGMA user_version=0")
+        conn.close()
+        assert index.get("doc", "a" * 32) is None
+        # the cache is reset when written
+        index.set("doc", "b" * 32, "data")
+        assert index.get_many("doc", ["a" * 32, "b" * 32]) == {"b" * 32: "data"}
+
+    def test_unwritable(self, tmp_path):
+        (tmp_path / "ro").mkdir(mode=0o555)
+        index = EclassIndex(str(tmp_path / "ro" / "index.sqlite"))
+        if os.access(tmp_path / "ro", os.W_OK):
+            pytest.skip("running with root privileges")
+        assert not index.writable
+        assert not index.set("doc", "a" * 32, "data")
+        assert index.get("doc", "a" * 32) is None
+
+    def test_chksum(self, index, tmp_path):
+        path = tmp_path / "foo.eclass"
+        path.write_text("foo\n")
+        assert index.chksum(str(path)) == "d3b07384d113edec49eaa6238ad5ff00"
+
+    def test_inherit_graph(self, index, eclass_cache):
+        graph = {"foo": ("bar",), "bar": ("baz", "missing"), "baz": ()}
+        assert index.inherit_graph(eclass_cache, ["foo", "missing"]) == graph
+        assert index.inherit_graph(eclass_cache) == dict(graph, unused=("foo",))
+
+        # graphs are resolved from cached artifacts
+        foo = eclass_cache.eclasses["foo"].path
+        assert index.get("inherits", index.chksum(foo)) == ["bar"]
+        os.chmod(foo, 0)
+        if not os.access(foo, os.R_OK):
+            # unreadable eclasses are treated as not inheriting anything
+            assert index.inherit_graph(eclass_cache, ["foo"]) == {"foo": ()}
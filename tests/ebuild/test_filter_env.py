@@ -1,5 +1,8 @@
+import bz2
 import io
+import os
 import textwrap
+import time
 
 import pytest
 
@@ -183,6 +186,11 @@ class TestFilterEnv:
         )
         assert "pkg_foo" not in "".join(self.get_output(data, funcs="pkg_foo"))
 
+        # empty here words are terminated by an empty line
+        data = 'src_install() {\n    cat <<""\n    foo\n\n}\n\npkg_foo() {\n    :\n}\n'
+        assert "pkg_foo" not in "".join(self.get_output(data, funcs="pkg_foo"))
+        assert "src_install" in "".join(self.get_output(data, funcs="pkg_foo"))
+
     def test_vars(self):
         data = textwrap.dedent(
             """\
@@ -268,3 +276,36 @@ class TestFilterEnv:
         l = set()
         self.get_output(data, global_envvar_callback=l.add)
         assert var_list == l
+
+
+def test_corpus(request):
+    """Benchmark filtering real environment dumps.
+
+    Run via ``pytest --filter-env-corpus /var/db/pkg tests/ebuild/test_filter_env.py``.
+    """
+    corpus = request.config.option.filter_env_corpus
+    if corpus is None:
+        pytest.skip("needs --filter-env-corpus option to run")
+    envs = []
+    for dirpath, _dirnames, filenames in os.walk(corpus):
+        if "environment.bz2" in filenames:
+            with bz2.open(os.path.join(dirpath, "environment.bz2"), "rt") as f:
+                envs.append(f.read())
+    if not envs:
+        pytest.skip(f"no environment.bz2 files found under {corpus!r}")
+
+    size = sum(len(x) for x in envs)
+    start = time.perf_counter()
+    for data in envs:
+        main_run(
+            io.BytesIO(),
+            data,
+            ("PKGCORE_.*", "BASH.*", "EUID", "PPID", "UID"),
+            ("__.*",),
+        )
+    elapsed = time.perf_counter() - start
+    reporter = request.config.pluginmanager.get_plugin("terminalreporter")
+    reporter.write_line(
+        f"filtered {len(envs)} environments ({size / 2**20:.1f} MiB) "
+        f"in {elapsed:.2f}s, {size / 2**20 / elapsed:.1f} MiB/s"
+    )
@@ -110,6 +110,27 @@ class TestReposConf:
         assert repos["foo"]["priority"] == 0
         assert "'foo' repo has invalid priority setting" in caplog.text
 
+    def test_cache_backend(self, tmp_path, caplog):
+        # unknown cache backends cause fallback to the default
+        (path := tmp_path / "file").write_text(
+            textwrap.dedent(
+                """\
+            [foo]
+            cache-backend = sqlite
+            location = /var/gentoo/repos/foo
+            [bar]
+            cache-backend = foo
+            location = /var/gentoo/repos/bar
+            [gentoo]
+            location = /var/gentoo/repos/gentoo"""
+            )
+        )
+        defaults, repos = load_repos_conf(path)
+        assert repos["foo"]["cache-backend"] == "sqlite"
+        assert repos["bar"]["cache-backend"] == "flat"
+        assert repos["gentoo"]["cache-backend"] == "flat"
+        assert "'bar' repo has unsupported cache-backend 'foo'" in caplog.text
+
     def test_overriding_defaults_same_file(self, tmp_path):
         # overriding defaults in the same file throws an exception from configparser
         (path := tmp_path / "file").write_text(
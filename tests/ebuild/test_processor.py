@@ -0,0 +1,211 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from pkgcore import const
+from pkgcore.ebuild import eclass_cache as eclass_cache_mod
+from pkgcore.ebuild import processor
+from pkgcore.ebuild.eclass_index import EclassIndex
+
+
+@pytest.fixture
+def eclass_cache(tmp_path):
+    eclasses = {}
+    for name in ("foo", "bar"):
+        path = tmp_path / f"{name}.eclass"
+        path.write_text(f"{name}_func() {{ :; }}\n")
+        eclasses[name] = SimpleNamespace(path=str(path))
+    return SimpleNamespace(eclasses=eclasses)
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.setattr(processor, "stats", processor.ProcessorStats())
+    monkeypatch.setattr(processor, "idle_timeout", None)
+    yield
+    processor.shutdown_all_processors()
+
+
+def test_preload_eclasses(eclass_cache):
+    ebp = processor.request_ebuild_processor(sandbox=False)
+    try:
+        assert ebp.preload_eclasses(eclass_cache)
+        assert ebp._preloaded_eclasses == {
+            k: v.path for k, v in eclass_cache.eclasses.items()
+        }
+
+        # preloads are dropped when used with a differing eclass stack
+        other = SimpleNamespace(eclasses={"foo": eclass_cache.eclasses["foo"]})
+        ebp._check_preloaded_eclasses(other)
+        assert not ebp._preloaded_eclasses
+        assert ebp.is_responsive
+    finally:
+        processor.release_ebuild_processor(ebp)
+
+
+def test_run_phase_preloaded_eclasses(eclass_cache, monkeypatch):
+    class Started(Exception):
+        pass
+
+    ebp = processor.request_ebuild_processor(sandbox=False)
+    write = ebp.write
+
+    def fake_write(string, *args, **kwargs):
+        if string.startswith("process_ebuild"):
+            raise Started
+        return write(string, *args, **kwargs)
+
+    monkeypatch.setattr(ebp, "write", fake_write)
+    try:
+        assert ebp.preload_eclasses(eclass_cache)
+        # phases using the preloaded eclass stack keep its preloads
+        with pytest.raises(Started):
+            ebp.run_phase("setup", {}, eclass_cache=eclass_cache)
+        assert set(ebp._preloaded_eclasses) == {"foo", "bar"}
+
+        # while those from a repo overriding preloaded eclasses drop them
+        eclasses = dict(eclass_cache.eclasses, foo=SimpleNamespace(path="/foo"))
+        with pytest.raises(Started):
+            ebp.run_phase("setup", {}, eclass_cache=SimpleNamespace(eclasses=eclasses))
+        assert not ebp._preloaded_eclasses
+
+        # as do phases lacking an eclass stack
+        assert ebp.preload_eclasses(eclass_cache)
+        with pytest.raises(Started):
+            ebp.run_phase("setup", {})
+        assert not ebp._preloaded_eclasses
+        assert ebp.is_responsive
+    finally:
+        processor.release_ebuild_processor(ebp)
+
+
+def test_preload_eclasses_failure(eclass_cache, tmp_path):
+    (path := tmp_path / "broken.eclass").write_text("broken_func() {\n")
+    eclasses = {"broken": SimpleNamespace(path=str(path))}
+    eclasses.update(eclass_cache.eclasses)
+    eclass_cache.eclasses = eclasses
+    ebp = processor.request_ebuild_processor(sandbox=False)
+    try:
+        # eclasses batched after a broken one are still preloaded
+        assert not ebp.preload_eclasses(eclass_cache)
+        assert set(ebp._preloaded_eclasses) == {"foo", "bar"}
+        assert ebp.is_responsive
+    finally:
+        processor.release_ebuild_processor(ebp)
+
+
+def test_preload_eclasses_unindexed(tmp_path):
+    (tmp_path / "foo.eclass").write_text("inherit bar\nfoo_func() { :; }\n")
+    (tmp_path / "bar.eclass").write_text("bar_func() { :; }\n")
+    ec = eclass_cache_mod.cache(str(tmp_path))
+    ebp = processor.request_ebuild_processor(sandbox=False)
+    try:
+        # eclass caches don't use an index unless one is passed in
+        assert ebp.preload_eclasses(ec, limited_to=["foo"])
+        assert set(ebp._preloaded_eclasses) == {"foo"}
+        assert not os.listdir(const.USER_CACHE_PATH)
+    finally:
+        processor.release_ebuild_processor(ebp)
+
+
+def test_preload_eclasses_index(eclass_cache, tmp_path, monkeypatch):
+    (tmp_path / "foo.eclass").write_text("inherit bar\nfoo_func() { :; }\n")
+    (tmp_path / "broken.eclass").write_text("broken_func() {\n")
+    eclass_cache.eclasses["broken"] = SimpleNamespace(
+        path=str(tmp_path / "broken.eclass")
+    )
+    eclass_cache.index = index = EclassIndex(str(tmp_path / "index.sqlite"))
+    chksums = {k: index.chksum(v.path) for k, v in eclass_cache.eclasses.items()}
+    ebp = processor.request_ebuild_processor(sandbox=False)
+    try:
+        # inherited eclasses are preloaded alongside those requested
+        assert ebp.preload_eclasses(eclass_cache, limited_to=["foo"])
+        assert set(ebp._preloaded_eclasses) == {"foo", "bar"}
+        valid = index.get_many("valid", chksums.values())
+        assert set(valid) == {chksums["foo"], chksums["bar"]}
+
+        # eclasses failing syntax checks aren't recorded as valid
+        assert not ebp.preload_eclasses(eclass_cache, limited_to=["broken"])
+        assert chksums["broken"] not in index.get_many("valid", chksums.values())
+
+        # and those previously checked are preloaded unchecked
+        assert ebp.clear_preloaded_eclasses()
+        commands = []
+        write = ebp.write
+
+        def record_write(data, *args, **kwargs):
+            commands.append(data)
+            return write(data, *args, **kwargs)
+
+        monkeypatch.setattr(ebp, "write", record_write)
+        assert ebp.preload_eclasses(eclass_cache, limited_to=["foo"])
+        assert set(ebp._preloaded_eclasses) == {"foo", "bar"}
+        assert [x.split()[0] for x in commands] == ["preload_verified_eclass"]
+        assert ebp.is_responsive
+    finally:
+        processor.release_ebuild_processor(ebp)
+
+
+def test_warm_ebuild_processors(eclass_cache):
+    processor.warm_ebuild_processors(
+        2, sandbox=False, eclass_cache=eclass_cache, eclasses=["foo", "missing"]
+    ).join()
+    assert processor.stats.warmed == processor.stats.spawned == 2
+    assert processor.stats.spawn_time > 0
+    assert len(processor.inactive_ebp_list) == 2
+    for ebp in processor.inactive_ebp_list:
+        assert list(ebp._preloaded_eclasses) == ["foo"]
+
+    # idle processors are counted towards the pool size
+    processor.warm_ebuild_processors(2, sandbox=False).join()
+    assert processor.stats.warmed == 2
+
+    ebp = processor.request_ebuild_processor(sandbox=False)
+    processor.release_ebuild_processor(ebp)
+    assert processor.stats.reused == 1
+    assert processor.stats.spawned == 2
+
+
+def test_reap_idle_processors(monkeypatch):
+    ebp = processor.request_ebuild_processor(sandbox=False)
+    processor.release_ebuild_processor(ebp)
+    # reaping is disabled by default
+    assert processor.reap_idle_processors() == 0
+
+    monkeypatch.setattr(processor, "idle_timeout", 0)
+    assert processor.reap_idle_processors() == 1
+    assert processor.stats.reaped == 1
+    assert not processor.inactive_ebp_list
+    assert not ebp.is_alive
+
+
+def test_fork_ebuild_processors(eclass_cache):
+    ebps = [
+        processor.request_ebuild_processor(sandbox=False, eclass_cache=eclass_cache)
+        for _ in range(2)
+    ]
+    try:
+        # a single server is spawned that processors are forked from
+        assert len(processor._fork_servers) == 1
+        server = next(iter(processor._fork_servers.values()))
+        assert processor.stats.spawned == 2
+        for ebp in ebps:
+            assert isinstance(ebp, processor.ForkedEbuildProcessor)
+            assert ebp.pid != server.pid
+            assert ebp.is_responsive
+            assert ebp._preloaded_eclasses == server._preloaded_eclasses
+            assert set(ebp._preloaded_eclasses) == {"foo", "bar"}
+    finally:
+        for ebp in ebps:
+            processor.release_ebuild_processor(ebp)
+
+    # forked processors are reused like any other
+    ebp = processor.request_ebuild_processor(sandbox=False, eclass_cache=eclass_cache)
+    processor.release_ebuild_processor(ebp)
+    assert processor.stats.reused == 1
+
+    processor.shutdown_all_processors()
+    assert not processor._fork_servers
+    assert not ebp.is_alive
+    assert not server.is_alive
@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from pkgcore.ebuild import eclass_cache
+from pkgcore.ebuild.regen_state import RegenState
+
+
+class FakePkg:
+    def __init__(self, cpvstr, path):
+        self.cpvstr = cpvstr
+        self.path = path
+
+
+class TestRegenState:
+    @pytest.fixture
+    def repo(self, tmp_path):
+        (tmp_path / "eclass").mkdir()
+        for eclass in ("a", "b"):
+            (tmp_path / "eclass" / f"{eclass}.eclass").touch()
+        (tmp_path / "cat").mkdir()
+        self.pkgs = []
+        for pkg in ("foo-1", "bar-1", "baz-1"):
+            (path := tmp_path / "cat" / f"{pkg}.ebuild").touch()
+            os.utime(path, (1000, 1000))
+            self.pkgs.append(FakePkg(f"cat/{pkg}", str(path)))
+        self.ecache = eclass_cache.cache(str(tmp_path / "eclass"))
+        return tmp_path
+
+    def record(self, path, inherited):
+        state = RegenState(path)
+        state.update(
+            state.ebuild_mtimes(self.pkgs),
+            state.eclass_mtimes(self.ecache),
+            inherited,
+        )
+        return RegenState(path)
+
+    def stale(self, state, cache):
+        return [
+            pkg.cpvstr
+            for pkg in state.stale(
+                self.pkgs,
+                state.ebuild_mtimes(self.pkgs),
+                state.eclass_mtimes(self.ecache),
+                cache,
+            )
+        ]
+
+    def test_missing(self, repo):
+        state = RegenState(str(repo / "state.json"))
+        assert not state.exists
+        assert self.stale(state, ()) == ["cat/foo-1", "cat/bar-1", "cat/baz-1"]
+
+    def test_invalid(self, repo, caplog):
+        (path := repo / "state.json").write_text("{garbage")
+        assert not RegenState(str(path)).exists
+        assert "failed loading regen state" in caplog.text
+
+    def test_stale(self, repo):
+        path = str(repo / "cache" / "state.json")
+        cache = {"cat/foo-1", "cat/bar-1", "cat/baz-1"}
+        state = self.record(path, {"cat/foo-1": ["a", "b"], "cat/bar-1": ["b"]})
+        assert state.exists
+        assert state.consumers("a") == {"cat/foo-1"}
+        assert state.consumers("b") == {"cat/foo-1", "cat/bar-1"}
+        assert state.consumers("c") == frozenset()
+        assert state.eclass_index() == {
+            "a": {"cat/foo-1"},
+            "b": {"cat/foo-1", "cat/bar-1"},
+        }
+        # pkgs lacking recorded entries are always stale
+        assert self.stale(state, cache) == ["cat/baz-1"]
+
+        # ebuild changes
+        state = self.record(path, {"cat/baz-1": []})
+        assert self.stale(state, cache) == []
+        os.utime(self.pkgs[0].path, (2000, 2000))
+        assert self.stale(state, cache) == ["cat/foo-1"]
+        state = self.record(path, {})
+        assert state.consumers("a") == {"cat/foo-1"}
+
+        # eclass changes affect inheriting pkgs
+        os.utime(repo / "eclass" / "a.eclass", (2000, 2000))
+        self.ecache = eclass_cache.cache(str(repo / "eclass"))
+        assert self.stale(state, cache) == ["cat/foo-1"]
+        (repo / "eclass" / "b.eclass").unlink()
+        self.ecache = eclass_cache.cache(str(repo / "eclass"))
+        assert self.stale(state, cache) == ["cat/foo-1", "cat/bar-1"]
+
+        # pkgs missing cache entries
+        state = self.record(path, {})
+        assert self.stale(state, cache) == []
+        assert self.stale(state, {"cat/foo-1"}) == ["cat/bar-1", "cat/baz-1"]
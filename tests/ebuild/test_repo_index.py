@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+from pkgcore.ebuild.repo_index import PackageIndex, package_versions
+
+
+class TestPackageIndex:
+    @pytest.fixture
+    def repo(self, tmp_path):
+        for cat, pkg, vers in (
+            ("cat", "pkg", ("1", "2")),
+            ("cat", "foo", ("1.0-r1",)),
+            ("dev", "bar", ()),
+        ):
+            (pkgdir := tmp_path / cat / pkg).mkdir(parents=True)
+            for ver in vers:
+                (pkgdir / f"{pkg}-{ver}.ebuild").touch()
+            # ignored files
+            (pkgdir / "metadata.xml").touch()
+            (pkgdir / f"other-{pkg}-1.ebuild").touch()
+        (tmp_path / "profiles").mkdir()
+        (tmp_path / "metadata").mkdir()
+        (tmp_path / ".git").mkdir()
+        return tmp_path
+
+    @pytest.fixture
+    def index_path(self, tmp_path_factory):
+        return str(tmp_path_factory.mktemp("cache") / "index.json")
+
+    @staticmethod
+    def age(path):
+        # mark dirs as old enough to be indexed
+        for root, dirs, _files in os.walk(path):
+            for d in dirs:
+                os.utime(os.path.join(root, d), (1000, 1000))
+        os.utime(path, (1000, 1000))
+
+    def test_missing(self, repo, index_path):
+        index = PackageIndex(str(repo), index_path)
+        assert index.packages("cat") is None
+        assert index.versions("cat", "pkg") is None
+
+    def test_invalid(self, repo, index_path, caplog):
+        with open(index_path, "w") as f:
+            f.write("{garbage")
+        assert PackageIndex(str(repo), index_path).packages("cat") is None
+        assert "failed loading package index" in caplog.text
+
+        # unknown index versions are ignored
+        with open(index_path, "w") as f:
+            json.dump({"version": -1, "categories": {"cat": [0, [], {}]}}, f)
+        assert PackageIndex(str(repo), index_path).packages("cat") is None
+
+    def test_update(self, repo, index_path):
+        self.age(repo)
+        PackageIndex(str(repo), index_path, ignore=("profiles", "metadata")).update()
+        assert os.path.exists(index_path)
+        # the repo itself is left untouched
+        assert not os.listdir(repo / "metadata")
+
+        index = PackageIndex(str(repo), index_path, ignore=("profiles", "metadata"))
+        assert index.packages("cat") == ("foo", "pkg")
+        assert index.packages("dev") == ("bar",)
+        assert index.versions("cat", "pkg") == ("1", "2")
+        assert index.versions("cat", "foo") == ("1.0-r1",)
+        assert index.versions("dev", "bar") == ()
+        for cat in ("profiles", "metadata", ".git", "nonexistent"):
+            assert index.packages(cat) is None
+        assert index.versions("cat", "nonexistent") is None
+
+    def test_invalid_versions(self, repo, index_path):
+        for name in ("pkg-x", "pkg-1.0-foo", "pkg-bar-1"):
+            (repo / "cat" / "pkg" / f"{name}.ebuild").touch()
+        self.age(repo)
+        index = PackageIndex(str(repo), index_path)
+        index.update()
+        # invalid versions are indexed as listed, for the repo to report
+        versions = package_versions(str(repo / "cat" / "pkg"), "pkg")
+        assert index.versions("cat", "pkg") == tuple(sorted(versions))
+        assert sorted(versions) == ["1", "1.0-foo", "2", "bar-1", "x"]
+
+    def test_stale(self, repo, index_path):
+        self.age(repo)
+        index = PackageIndex(str(repo), index_path)
+        index.update()
+
+        # modified dirs invalidate their entries
+        (repo / "cat" / "pkg" / "pkg-3.ebuild").touch()
+        assert index.versions("cat", "pkg") is None
+        assert index.versions("cat", "foo") == ("1.0-r1",)
+        (repo / "cat" / "new").mkdir()
+        assert index.packages("cat") is None
+        assert index.packages("dev") == ("bar",)
+
+    def test_recently_modified(self, repo, index_path):
+        # dirs modified too recently to reliably detect changes aren't cached
+        index = PackageIndex(str(repo), index_path)
+        index.update()
+        assert index.packages("cat") is None
+        assert index.versions("cat", "pkg") is None
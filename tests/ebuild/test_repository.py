@@ -1,9 +1,13 @@
+import os
 import textwrap
 from contextlib import chdir
 from pathlib import Path
 
 import pytest
+from snakeoil.chksum import LazilyHashedPath
 
+from pkgcore import cache
+from pkgcore.cache import flat_hash
 from pkgcore.ebuild import eclass_cache, repository, restricts
 from pkgcore.ebuild.atom import atom
 from pkgcore.repository import errors
@@ -182,6 +186,151 @@ class TestUnconfiguredTree:
         assert {"cat": ("pkg",), "empty": ("empty",)} == dict(repo.packages)
         assert {("cat", "pkg"): ("3",), ("empty", "empty"): ()} == dict(repo.versions)
 
+    def test_metadata_prefetch(self, tmp_path, pdir):
+        class Cache(cache.base):
+            autocommits = True
+            batched_lookups = True
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self._data = {}
+                self.batches = []
+                self.reads = []
+
+            def __getitem__(self, cpv):
+                self.reads.append(cpv)
+                return super().__getitem__(cpv)
+
+            def _getitem(self, cpv):
+                d = dict(self._data[cpv])
+                d[self._chf_key] = self._chf_deserializer(d[self._chf_key])
+                return d
+
+            def _get_many(self, cpvs):
+                self.batches.append(sorted(cpvs))
+                for cpv in cpvs:
+                    yield cpv, self._getitem(cpv)
+
+            def _setitem(self, cpv, values):
+                self._data[cpv] = dict(values)
+
+        (tmp_path / "cat" / "pkg").mkdir(parents=True)
+        cachedb = Cache()
+        for ver in ("1", "2"):
+            (ebuild := tmp_path / "cat" / "pkg" / f"pkg-{ver}.ebuild").touch()
+            os.utime(ebuild, (100, 100))
+            cachedb[f"cat/pkg-{ver}"] = {
+                "EAPI": "8",
+                "SLOT": ver,
+                "_chf_": LazilyHashedPath("/nonexistent", mtime=100),
+            }
+        repo = self.mk_tree(tmp_path, cache=(cachedb,))
+
+        # restrictions not matching against metadata don't prefetch
+        pkgs = repo.match(atom("cat/pkg"), pkg_filter=None)
+        assert [pkg.cpvstr for pkg in pkgs] == ["cat/pkg-1", "cat/pkg-2"]
+        assert not cachedb.batches
+        del pkgs
+
+        pkgs = repo.match(atom("cat/pkg:1"), pkg_filter=None)
+        assert [pkg.cpvstr for pkg in pkgs] == ["cat/pkg-1"]
+        assert cachedb.batches == [["cat/pkg-1", "cat/pkg-2"]]
+        # prefetched entries are consumed by matching with none left behind
+        assert not cachedb.reads
+        assert not repo.package_class._prefetched
+
+        # pkgs with loaded metadata aren't refetched
+        repo.match(atom("cat/pkg:2"), pkg_filter=None)
+        assert cachedb.batches[-1] == ["cat/pkg-2"]
+
+        # caches lacking batched lookups aren't prefetched from
+        cachedb.batched_lookups = False
+        repo.match(atom("cat/pkg:3"), pkg_filter=None)
+        assert len(cachedb.batches) == 2
+
+    def test_regen_state(self, tmp_path):
+        class Cache(cache.base):
+            autocommits = True
+
+        repo = self.mk_tree(tmp_path)
+        assert repo.regen_state is None
+        # writable caches lacking an on-disk location don't track state
+        repo = self.mk_tree(tmp_path, cache=(Cache(),))
+        assert repo.regen_state is None
+        cachedb = Cache()
+        cachedb.location = str(tmp_path / "cache")
+        repo = self.mk_tree(tmp_path, cache=(cachedb,))
+        assert repo.regen_state.path == str(tmp_path / "cache" / ".pkgcore-regen.json")
+
+    def test_eclass_usage(self, tmp_path, pdir):
+        class Cache(cache.base):
+            autocommits = True
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.location = str(tmp_path / "cache")
+                self._data = {}
+
+            def __contains__(self, cpv):
+                return cpv in self._data
+
+            def _getitem(self, cpv):
+                d = dict(self._data[cpv])
+                d[self._chf_key] = self._chf_deserializer(d[self._chf_key])
+                return d
+
+            def _setitem(self, cpv, values):
+                self._data[cpv] = dict(values)
+
+            def _delitem(self, cpv):
+                del self._data[cpv]
+
+        (tmp_path / "eclass").mkdir()
+        (tmp_path / "eclass" / "foo.eclass").touch()
+        (tmp_path / "cat" / "pkg").mkdir(parents=True)
+        cachedb = Cache()
+        for ver in ("1", "2"):
+            (ebuild := tmp_path / "cat" / "pkg" / f"pkg-{ver}.ebuild").touch()
+            os.utime(ebuild, (100, 100))
+            cachedb[f"cat/pkg-{ver}"] = {
+                "EAPI": "8",
+                "SLOT": "0",
+                "_chf_": LazilyHashedPath("/nonexistent", mtime=100),
+            }
+        repo = self.mk_tree(tmp_path, cache=(cachedb,))
+
+        # without recorded state, pkg metadata is used
+        assert repo.eclass_usage() == {}
+
+        state = repo.regen_state
+        pkgs = repo.match(atom("cat/pkg"), pkg_filter=None)
+        state.update(
+            state.ebuild_mtimes(pkgs),
+            state.eclass_mtimes(repo.eclass_cache),
+            {"cat/pkg-1": ["foo"], "cat/pkg-2": ["foo"]},
+        )
+        assert repo.eclass_usage() == {"foo": {"cat/pkg-1", "cat/pkg-2"}}
+        assert repo.eclass_consumers("foo") == {"cat/pkg-1", "cat/pkg-2"}
+        assert repo.eclass_consumers("bar") == frozenset()
+
+        # recorded entries for modified ebuilds are ignored
+        os.utime(tmp_path / "cat" / "pkg" / "pkg-2.ebuild", (200, 200))
+        # consumers are looked up in the previously generated mapping
+        assert repo.eclass_consumers("foo") == {"cat/pkg-1", "cat/pkg-2"}
+        assert repo.eclass_usage() == {"foo": {"cat/pkg-1"}}
+        assert repo.eclass_consumers("foo") == {"cat/pkg-1"}
+
+    def test_pkg_index(self, tmp_path, pdir):
+        (tmp_path / "cat" / "pkg").mkdir(parents=True)
+        (tmp_path / "cat" / "pkg" / "pkg-1.ebuild").touch()
+        # indexing requires an on-disk metadata cache to store it alongside
+        assert self.mk_tree(tmp_path, cache=()).pkg_index is None
+
+        cachedb = flat_hash.database(str(tmp_path / "cache"))
+        repo = self.mk_tree(tmp_path, cache=(cachedb,))
+        assert repo.pkg_index.path == str(tmp_path / "cache" / ".pkgcore-index.json")
+        assert dict(repo.versions) == {("cat", "pkg"): ("1",)}
+
     def test_package_mask(self, tmp_path, pdir):
         (pdir / "package.mask").write_text(
             textwrap.dedent(
@@ -0,0 +1,43 @@
+import pytest
+
+from pkgcore.ebuild import triggers
+from pkgcore.fs import fs
+from pkgcore.fs.contents import contentsSet
+from pkgcore.merge import errors
+from pkgcore.repository.util import SimpleTree
+
+
+class FakePkg:
+    def __init__(self, cat, pn, ver):
+        self.cpvstr = f"{cat}/{pn}-{ver}"
+        # packages named provided-* mimic package.provided entries
+        self.package_is_real = not pn.startswith("provided")
+        self.contents = contentsSet([fs.fsFile(f"/usr/bin/{pn}", strict=False)])
+
+
+class OwnersTree(SimpleTree):
+    def owners(self, paths):
+        owned = {f"/usr/bin/{pkg.cpvstr.split('/')[1][:-2]}": pkg for pkg in self}
+        return {x: {owned[x].cpvstr} for x in paths if x in owned}
+
+
+class TestProtectOwned:
+    cpvs = {"dev-util": {"diffball": ["1"], "provided": ["1"], "bsdiff": ["1"]}}
+
+    @pytest.mark.parametrize("repo_kls", (SimpleTree, OwnersTree))
+    def test_collision(self, repo_kls):
+        vdb = repo_kls(self.cpvs, pkg_klass=FakePkg)
+        trigger = triggers.ProtectOwned([vdb])
+        colliding = contentsSet(
+            fs.fsFile(f"/usr/bin/{x}", strict=False)
+            for x in ("diffball", "provided", "unowned")
+        )
+        with pytest.raises(errors.BlockModification) as excinfo:
+            trigger.collision(colliding)
+        # packages that aren't real are skipped
+        assert str(excinfo.value).endswith(
+            "protect-owned: ( file:/usr/bin/diffball ) owned by 'dev-util/diffball-1'"
+        )
+
+        # unowned files don't collide
+        trigger.collision(contentsSet([fs.fsFile("/usr/bin/unowned", strict=False)]))
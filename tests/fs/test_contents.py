@@ -295,6 +295,28 @@ class TestContentsSet:
     def test_isdisjoint(self, required, data1, data2):
         self.check_complex_set_op("isdisjoint", required, data1, data2)
 
+    def test_set_op_results(self):
+        c1 = contents.contentsSet([mk_dir("/tmp"), mk_file("/a")], mutable=False)
+        c2 = contents.contentsSet([mk_file("/tmp"), mk_file("/b")])
+        # intersections hold the objects of the passed in set
+        ret = c1.intersection(c2)
+        assert type(ret) is contents.contentsSet
+        assert list(ret) == [mk_file("/tmp")]
+        assert ret["/tmp"].is_reg
+        assert not ret.mutable
+        ret = c1.difference(c2)
+        assert list(ret) == [mk_file("/a")]
+        assert not ret.mutable
+        # set ops against themselves
+        assert not c2.difference(c2)
+        c2.symmetric_difference_update(c2)
+        assert not c2
+
+    def test_interned_locations(self):
+        c1 = contents.contentsSet([mk_file("/usr//" + "bin")])
+        c2 = contents.contentsSet([mk_file("/usr/bin/")])
+        assert next(iter(c1)).location is next(iter(c2)).location
+
     def test_child_nodes(self):
         assert {"/usr", "/usr/bin", "/usr/foo"} == {
             x.location
@@ -1,8 +1,9 @@
+import errno
 import os
 from pathlib import Path
 
 import pytest
-from snakeoil.data_source import local_source
+from snakeoil.data_source import bytes_data_source, local_source
 
 from pkgcore.fs import contents, fs, livefs, ops
 
@@ -116,6 +117,64 @@ class TestCopyFile:
             ops.copyfile(f)
 
 
+class TestCopyData:
+    content = b"data" * 1024
+
+    @pytest.fixture
+    def src(self, tmp_path):
+        (path := tmp_path / "src").write_bytes(self.content)
+        return local_source(str(path))
+
+    def test_kernel_copy(self, tmp_path, src):
+        dest = tmp_path / "dest"
+        dest.write_bytes(b"stale data" * 1024)
+        method = ops.copy_data(src, str(dest))
+        assert method in {name for name, _ in ops.copy_methods} | {"copy"}
+        assert dest.read_bytes() == self.content
+
+    def test_fallback(self, tmp_path, src, monkeypatch):
+        def partial_copy(src_fd, dst_fd, size):
+            os.write(dst_fd, b"partial")
+            raise OSError(errno.EXDEV, "unsupported")
+
+        def unsupported(src_fd, dst_fd, size):
+            raise OSError(errno.EOPNOTSUPP, "unsupported")
+
+        def copy(src_fd, dst_fd, size):
+            os.write(dst_fd, os.read(src_fd, size))
+
+        dest = tmp_path / "dest"
+        methods = [("partial", partial_copy), ("copy", copy)]
+        monkeypatch.setattr(ops, "copy_methods", methods)
+        assert ops.copy_data(src, str(dest)) == "copy"
+        assert dest.read_bytes() == self.content
+
+        # falling back to copying through userspace
+        monkeypatch.setattr(ops, "copy_methods", [("unsupported", unsupported)])
+        assert ops.copy_data(src, str(dest)) == "copy"
+        assert dest.read_bytes() == self.content
+
+        # other errors aren't suppressed
+        def failure(src_fd, dst_fd, size):
+            raise OSError(errno.EIO, "failure")
+
+        monkeypatch.setattr(ops, "copy_methods", [("failure", failure)])
+        with pytest.raises(OSError):
+            ops.copy_data(src, str(dest))
+
+    def test_non_local(self, tmp_path):
+        dest = tmp_path / "dest"
+        assert ops.copy_data(bytes_data_source(self.content), str(dest)) == "copy"
+        assert dest.read_bytes() == self.content
+
+    def test_copy_callback(self, tmp_path, src):
+        o = fs.fsFile(str(tmp_path / "dest"), data=src, strict=False)
+        copied = []
+        assert ops.copyfile(o, copy_callback=lambda *args: copied.append(args))
+        assert len(copied) == 1
+        assert copied[0][0] is o
+
+
 class ContentsMixin:
     entries_norm1 = {
         "file1": ["reg"],
@@ -218,6 +277,53 @@ class TestMergeContents(ContentsMixin):
         assert fs.issym(livefs.gen_obj(str(path)))
 
 
+class TestThreadedMergeContents(ContentsMixin):
+    def test_merge(self, tmp_path):
+        entries = dict(self.entries_norm1)
+        entries.update((f"dir/subdir/file{i}", ["reg"]) for i in range(50))
+        src = self.generate_tree(tmp_path / "src", entries)
+        for i in range(3):
+            os.link(os.path.join(src, "file1"), os.path.join(src, f"dir/hardlink{i}"))
+        cset = livefs.scan(src, offset=src)
+        (dest := tmp_path / "dest").mkdir()
+        merged = []
+        assert ops.merge_contents(
+            cset, offset=str(dest), callback=merged.append, threads=4
+        )
+        assert livefs.scan(src, offset=src) == livefs.scan(str(dest), offset=str(dest))
+        # callbacks are still run in order
+        assert [x.location for x in merged if x.is_dir] == sorted(
+            x.location for x in merged if x.is_dir
+        )
+        assert len(merged) == len(cset)
+        # hardlinks are preserved
+        inodes = {os.stat(dest / f"dir/hardlink{i}").st_ino for i in range(3)}
+        assert inodes == {os.stat(dest / "file1").st_ino}
+
+    def test_chksums(self, tmp_path):
+        src = self.generate_tree(tmp_path / "src", {"file1": ["reg"]})
+        (tmp_path / "src" / "file1").write_text("data")
+        cset = contents.contentsSet(
+            contents.offset_rewriter(
+                str(tmp_path / "dest"), livefs.scan(src, offset=src)
+            )
+        )
+        assert ops.merge_contents(cset, threads=2)
+        assert (tmp_path / "dest" / "file1").read_text() == "data"
+        # chksums are generated while merging when no offset is used
+        assert all(x.chksums._vals for x in cset.iterfiles())
+
+    def test_file_over_dir(self, tmp_path):
+        src = self.generate_tree(
+            tmp_path / "src", {"file1": ["reg"], "sym": ["sym", "dir"]}
+        )
+        cset = livefs.scan(src, offset=src)
+        (tmp_path / "dest" / "file1").mkdir(parents=True)
+        (tmp_path / "dest" / "dir").mkdir()
+        with pytest.raises(ops.CannotOverwrite):
+            ops.merge_contents(cset, offset=str(tmp_path / "dest"), threads=2)
+
+
 class TestUnmergeContents(ContentsMixin):
     @pytest.fixture
     def generic_unmerge_bits(self, request, tmp_path):
@@ -0,0 +1,107 @@
+import os
+import shutil
+
+import pytest
+
+from pkgcore.fs import livefs, tar
+
+compressors = (
+    "bzip2",
+    pytest.param(
+        "xz",
+        marks=pytest.mark.skipif(not shutil.which("xz"), reason="xz not installed"),
+    ),
+    pytest.param(
+        "zstd",
+        marks=pytest.mark.skipif(not shutil.which("zstd"), reason="zstd not installed"),
+    ),
+)
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "image"
+    (path / "usr/bin").mkdir(parents=True)
+    (path / "usr/share").mkdir()
+    (path / "usr/bin/foo").write_bytes(b"foo" * 1000)
+    (path / "usr/share/bar").write_text("bar\n")
+    os.link(path / "usr/bin/foo", path / "usr/bin/foo2")
+    (path / "usr/lib").symlink_to("share")
+    return livefs.scan(str(path), offset=str(path))
+
+
+@pytest.mark.parametrize("compressor", compressors)
+def test_roundtrip(tmp_path, image, compressor):
+    path = str(tmp_path / "pkg.tar")
+    tar.write_set(image, path, compressor=compressor, parallelize=True)
+    assert tar.detect_compressor(path) == compressor
+
+    cset = tar.generate_contents(path, None)
+    assert sorted(x.location for x in cset) == sorted(x.location for x in image)
+    assert cset["/usr/bin/foo"].data.bytes_fileobj().read() == b"foo" * 1000
+    assert cset["/usr/lib"].target == "share"
+
+
+def test_detect_compressor(tmp_path):
+    path = tmp_path / "pkg.tar"
+    path.write_bytes(b"\0" * 8)
+    assert tar.detect_compressor(str(path)) == "bzip2"
+    assert tar.detect_compressor(str(path), default=None) is None
+
+
+@pytest.mark.parametrize("threads", (1, 4))
+@pytest.mark.parametrize("compressor", compressors)
+def test_unpack_contents(tmp_path, image, compressor, threads, monkeypatch):
+    # force streaming of larger files from the archive reading thread
+    monkeypatch.setattr(tar, "max_buffered_member", 100)
+    # and waiting on buffered writes
+    monkeypatch.setattr(tar, "max_buffered_bytes", 1)
+    path = str(tmp_path / "pkg.tar")
+    tar.write_set(image, path, compressor=compressor)
+    cset = tar.generate_contents(path, compressor)
+
+    dest = tmp_path / "dest"
+    for x in cset.iterdirs():
+        (dest / x.location.lstrip("/")).mkdir(parents=True, exist_ok=True)
+    unpacked = tar.unpack_contents(cset, str(dest), threads=threads)
+    assert sorted(unpacked.iterfiles()) == sorted(cset.iterfiles())
+    assert (dest / "usr/bin/foo").read_bytes() == b"foo" * 1000
+    assert (dest / "usr/bin/foo2").read_bytes() == b"foo" * 1000
+    assert (dest / "usr/share/bar").read_text() == "bar\n"
+    # only regular files are extracted
+    assert not (dest / "usr/lib").exists()
+    stat = os.stat(dest / "usr/share/bar")
+    assert stat.st_mode & 0o7777 == cset["/usr/share/bar"].mode
+
+
+def test_unpack_contents_unknown_source(tmp_path, image):
+    # files not generated from a tarball are left alone
+    assert not tar.unpack_contents(image, str(tmp_path))
+
+
+@pytest.mark.parametrize("compressor", compressors[1:])
+def test_decompress_trailing_data(tmp_path, image, compressor):
+    path = tmp_path / "pkg.tar"
+    tar.write_set(image, str(path), compressor=compressor)
+    data = path.read_bytes()
+    xpak = b"XPAKPACK" + bytes(8) + b"XPAKSTOP" + (24).to_bytes(4, "big") + b"STOP"
+
+    # binpkg xpak segments trailing the compressed stream are ignored
+    path.write_bytes(data + xpak)
+    handle = tar.decompress_handle(compressor, str(path), parallelize=True)
+    assert handle.read()
+    handle.close()
+
+    # as long as the compressed stream is intact
+    path.write_bytes(data[:-8] + xpak)
+    handle = tar.decompress_handle(compressor, str(path), parallelize=True)
+    handle.read()
+    with pytest.raises(OSError):
+        handle.close()
+
+    # while other trailing data is an error
+    path.write_bytes(data + b"garbage")
+    handle = tar.decompress_handle(compressor, str(path), parallelize=True)
+    handle.read()
+    with pytest.raises(OSError):
+        handle.close()
@@ -0,0 +1,161 @@
+import os
+
+import pytest
+
+from pkgcore.cache import flat_hash
+from pkgcore.ebuild import ebuild_src, eclass_cache, processor, repository
+from pkgcore.operations import regen
+from pkgcore.package.errors import MetadataException
+from pkgcore.restrictions import packages
+
+
+class FakePkg:
+    def __init__(self, cpvstr):
+        self.cpvstr = cpvstr
+
+
+class Helper:
+    def __init__(self, repo):
+        self.repo = repo
+
+    def __call__(self, pkg):
+        if (data := self.generate(pkg)[0]) is not None:
+            self.store(pkg, data)
+
+    def generate(self, pkg):
+        if pkg.cpvstr.startswith("fresh/"):
+            return None, False
+        elif pkg.cpvstr.startswith("bad/"):
+            raise ValueError(f"failed {pkg.cpvstr}")
+        elif pkg.cpvstr.startswith("masked/"):
+            raise MetadataException(pkg, "SLOT", "missing")
+        elif pkg.cpvstr.startswith("dead/"):
+            os._exit(1)
+        return {"pid": os.getpid()}, True
+
+    def prune(self, pkg):
+        self.repo.pruned.append((pkg.cpvstr, os.getpid()))
+
+    def store(self, pkg, data):
+        self.repo.stored[pkg.cpvstr] = (data, os.getpid())
+
+    def finish(self):
+        pass
+
+
+class BatchHelper(Helper):
+    def regen_batch(self, pkgs):
+        self.repo.batches.append(len(pkgs))
+        for pkg in pkgs:
+            try:
+                self(pkg)
+            except MetadataException:
+                pass
+            except Exception as e:
+                yield pkg, e
+
+
+class FakeRepo:
+    def __init__(self, helper=Helper):
+        self.helper = helper
+        self.stored = {}
+        self.pruned = []
+        self.batches = []
+
+    def _regen_operation_helper(self):
+        return self.helper(self)
+
+
+class TestRegenRepository:
+    @pytest.mark.parametrize("multiprocess", (False, True))
+    def test_regen(self, multiprocess):
+        repo = FakeRepo()
+        pkgs = [FakePkg(f"cat/pkg-{i}") for i in range(20)]
+        pkgs += [FakePkg("bad/pkg-1"), FakePkg("masked/pkg-1"), FakePkg("fresh/pkg-1")]
+        errors = list(
+            regen.regen_repository(
+                repo, pkgs, None, threads=4, multiprocess=multiprocess
+            )
+        )
+        assert [(pkg.cpvstr, str(e)) for pkg, e in errors] == [
+            ("bad/pkg-1", "failed bad/pkg-1")
+        ]
+        assert sorted(repo.stored) == sorted(f"cat/pkg-{i}" for i in range(20))
+        # all cache writes occur in the calling process
+        assert {pid for _data, pid in repo.stored.values()} == {os.getpid()}
+        generators = {data["pid"] for data, _pid in repo.stored.values()}
+        assert (os.getpid() not in generators) == multiprocess
+        if multiprocess:
+            # the writer removes stale entries, including those of failed pkgs
+            assert sorted(repo.pruned) == sorted(
+                (x.cpvstr, os.getpid()) for x in pkgs if x.cpvstr != "fresh/pkg-1"
+            )
+
+    @pytest.mark.parametrize("helper", (Helper, BatchHelper))
+    def test_batches(self, helper):
+        repo = FakeRepo(helper)
+        pkgs = [FakePkg(f"cat/pkg-{i}") for i in range(10)]
+        pkgs += [FakePkg("bad/pkg-1"), FakePkg("masked/pkg-1")]
+        errors = list(regen.regen_repository(repo, pkgs, None, threads=2, batch_size=4))
+        assert [pkg.cpvstr for pkg, _e in errors] == ["bad/pkg-1"]
+        assert sorted(repo.stored) == sorted(f"cat/pkg-{i}" for i in range(10))
+        # helpers lacking batch support are passed pkgs separately
+        assert sorted(repo.batches) == ([] if helper is Helper else [4, 4, 4])
+
+    def test_dead_workers(self):
+        repo = FakeRepo()
+        pkgs = [FakePkg("dead/pkg-1")]
+        errors = list(
+            regen.regen_repository(repo, pkgs, None, threads=1, multiprocess=True)
+        )
+        assert [pkg.cpvstr for pkg, _e in errors] == ["dead/pkg-1"]
+        assert not repo.stored
+        assert repo.pruned == [("dead/pkg-1", os.getpid())]
+
+
+class TestRegenEbuildRepo:
+    @pytest.fixture(autouse=True)
+    def _shutdown_processors(self):
+        yield
+        processor.shutdown_all_processors()
+
+    def test_batch_failures(self, tmp_path, monkeypatch):
+        (path := tmp_path / "repo").mkdir()
+        for x in ("eclass", "metadata", "profiles"):
+            (path / x).mkdir()
+        (path / "metadata" / "layout.conf").write_text("masters =\n")
+        (path / "profiles" / "repo_name").write_text("test\n")
+        ebuilds = {
+            "a": "",
+            # both failures shut down the processor mid-batch
+            "b": 'die "broken"',
+            "c": "inherit missing",
+            "d": "",
+        }
+        for pn, data in ebuilds.items():
+            (path / "cat" / pn).mkdir(parents=True)
+            (path / "cat" / pn / f"{pn}-1.ebuild").write_text(
+                f'EAPI=8\nDESCRIPTION="{pn}"\nSLOT=0\n{data}\n'
+            )
+        cache = flat_hash.database(str(tmp_path / "cache"), "test", readonly=False)
+        repo = repository.UnconfiguredTree(
+            str(path),
+            eclass_cache=eclass_cache.cache(str(path / "eclass")),
+            cache=(cache,),
+        )
+
+        batches = []
+        generate = ebuild_src.package_factory._generate_metadata_batch
+
+        def generate_batch(self, pkgs, ebp):
+            batches.append([pkg.package for pkg in pkgs])
+            return generate(self, pkgs, ebp)
+
+        monkeypatch.setattr(
+            ebuild_src.package_factory, "_generate_metadata_batch", generate_batch
+        )
+        pkgs = sorted(repo.itermatch(packages.AlwaysTrue, pkg_filter=None))
+        assert not list(regen.regen_repository(repo, pkgs, None, batch_size=16))
+        # pkgs following one that killed the processor are resubmitted
+        assert batches == [["a", "b", "c", "d"], ["c", "d"], ["d"]]
+        assert sorted(cache.keys()) == ["cat/a-1", "cat/d-1"]
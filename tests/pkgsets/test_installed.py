@@ -42,3 +42,38 @@ class TestInstalled:
             "dev-util/bsdiff-1.2",
             "dev-util/bsdiff-1.3",
         }
+
+
+class OwnersTree(SimpleTree):
+    def owners(self, paths):
+        owned = {"/usr/bin/diffball": {"dev-util/diffball-1.0"}}
+        return {x: owned[x] for x in paths if x in owned}
+
+
+class FakeContentsPkg(FakePkg):
+    @property
+    def cpvstr(self):
+        return f"{self.cat}/{self.pn}-{self.ver}"
+
+    @property
+    def contents(self):
+        return [FakeFile(f"/usr/bin/{self.pn}")]
+
+
+class FakeFile:
+    def __init__(self, location):
+        self.location = location
+
+
+class TestFileOwners:
+    def test_iter(self):
+        cpvs = {"dev-util": {"diffball": ["1.0"], "bsdiff": ["1.2"]}}
+        files = ["/usr/bin/diffball", "/usr/bin/missing"]
+
+        # vdbs with an ownership index
+        fake_vdb = OwnersTree(cpvs, pkg_klass=FakeContentsPkg)
+        assert set(installed.FileOwners([fake_vdb], files)) == {"dev-util/diffball"}
+
+        # vdbs lacking an ownership index have their contents scanned
+        fake_vdb = SimpleTree(cpvs, pkg_klass=FakeContentsPkg)
+        assert set(installed.FileOwners([fake_vdb], files)) == {"dev-util/diffball"}
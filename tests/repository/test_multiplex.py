@@ -1,8 +1,12 @@
+import gc
+import threading
 from collections import OrderedDict
 from functools import partial
 
+import pytest
+
 from pkgcore.repository.multiplex import tree
-from pkgcore.repository.util import SimpleTree
+from pkgcore.repository.util import RepositoryGroup, SimpleTree
 from pkgcore.restrictions import packages, values
 
 rev_sorted = partial(sorted, reverse=True)
@@ -55,8 +59,88 @@ class TestMultiplex:
             y for y in sorted(self.tree1_list + self.tree2_list) if "/diffball" in y
         ]
 
+    def test_ordering(self):
+        # unsorted matching yields each tree's matches in order
+        assert [x.cpvstr for x in self.ctree.itermatch(packages.AlwaysTrue)] == [
+            x.cpvstr for x in self.tree1.itermatch(packages.AlwaysTrue)
+        ] + [x.cpvstr for x in self.tree2.itermatch(packages.AlwaysTrue)]
+
     def test_sorting(self):
         assert list(
             x.cpvstr
             for x in self.ctree.itermatch(packages.AlwaysTrue, sorter=rev_sorted)
         ) == rev_sorted(self.tree1_list + self.tree2_list)
+
+
+class TestConcurrentMultiplex(TestMultiplex):
+    kls = staticmethod(partial(tree, threads=2))
+
+    def test_errors(self):
+        class BrokenTree(SimpleTree):
+            def itermatch(self, *args, **kwds):
+                raise OSError("remote repo unavailable")
+
+        ctree = self.kls(self.tree1, BrokenTree({}))
+        matches = ctree.itermatch(packages.AlwaysTrue)
+        with pytest.raises(OSError):
+            list(matches)
+
+    def test_streaming(self):
+        matched = threading.Event()
+        release = threading.Event()
+
+        class SlowTree(SimpleTree):
+            def itermatch(self, *args, **kwds):
+                for pkg in super().itermatch(*args, **kwds):
+                    yield pkg
+                    matched.set()
+                    assert release.wait(5)
+
+        first = next(self.tree1.itermatch(packages.AlwaysTrue))
+        ctree = self.kls(SlowTree(self.d1), self.tree2)
+        matches = ctree.itermatch(packages.AlwaysTrue)
+        # matches are yielded before their tree is fully matched
+        assert next(matches) == first
+        assert matched.wait(5)
+        release.set()
+        assert len(list(matches)) == len(self.tree1_list + self.tree2_list) - 1
+
+    def test_abandoned_matching(self):
+        matched = []
+        blocked, gate = threading.Event(), threading.Event()
+
+        class GatedTree(SimpleTree):
+            def itermatch(self, *args, **kwds):
+                for pkg in super().itermatch(*args, **kwds):
+                    matched.append(pkg)
+                    yield pkg
+                    blocked.set()
+                    assert gate.wait(5)
+
+        ctree = self.kls(self.tree1, GatedTree(self.d2))
+        repo_iters = ctree.itermatch_repos(packages.AlwaysTrue)
+        next(repo_iters[0])
+        assert blocked.wait(5)
+        # closing a tree's results stops the workers of all trees
+        repo_iters[0].close()
+        gate.set()
+        ctree._executor.shutdown(wait=True)
+        assert len(matched) == 2
+
+    def test_executor_shutdown(self):
+        ctree = self.kls(self.tree1, self.tree2)
+        list(ctree.itermatch(packages.AlwaysTrue))
+        executor = ctree._executor
+        del ctree
+        gc.collect()
+        # worker threads are shut down alongside the tree
+        with pytest.raises(RuntimeError):
+            executor.submit(int)
+
+    def test_repository_group(self):
+        group = RepositoryGroup([self.tree1], threads=2) + [self.tree2]
+        assert group.threads == 2
+        assert group.combined.threads == 2
+        assert sorted(x.cpvstr for x in group.itermatch(packages.AlwaysTrue)) == sorted(
+            self.tree1_list + self.tree2_list
+        )
@@ -1,7 +1,8 @@
 import pytest
 
+from pkgcore.ebuild.atom import atom
 from pkgcore.resolver import plan
-from pkgcore.test.misc import FakePkg
+from pkgcore.test.misc import FakePkg, FakeRepo
 
 
 @pytest.mark.parametrize(
@@ -29,3 +30,54 @@ def test_pkg_sorting(sorter, vers, expected, iter_sort_target):
     if iter_sort_target:
         pkgs = [x[0] for x in pkgs]
     assert [int(x.fullver) for x in pkgs] == expected
+
+
+@pytest.mark.parametrize(
+    ("sorter", "expected"),
+    (
+        pytest.param(
+            plan.highest_iter_sort,
+            [("2", True), ("2", False), ("1", True), ("1", False)],
+            id="highest iter",
+        ),
+        pytest.param(
+            plan.lowest_iter_sort,
+            [("1", True), ("1", False), ("2", True), ("2", False)],
+            id="lowest iter",
+        ),
+    ),
+)
+def test_pkg_sorting_livefs(sorter, expected):
+    pkgs = [
+        [FakePkg(f"d-b/a-{ver}", repo=FakeRepo(livefs=livefs)), []]
+        for ver in ("1", "2")
+        for livefs in (False, True)
+    ]
+    pkgs = [x[0] for x in sorter(pkgs)]
+    assert [(x.fullver, x.repo.livefs) for x in pkgs] == expected
+
+
+def test_query_cache():
+    class CountingRepo:
+        def __init__(self, pkgs):
+            self.pkgs = pkgs
+            self.queries = 0
+
+        def itermatch(self, restrict):
+            self.queries += 1
+            return filter(restrict.match, self.pkgs)
+
+    repo = CountingRepo([FakePkg("d-b/a-1"), FakePkg("d-b/a-2"), FakePkg("d-b/b-1")])
+    cache = plan.query_cache()
+    a = atom("d-b/a")
+    matches = cache.match(repo, a)
+    assert [x.fullver for x in matches] == ["1", "2"]
+    assert cache.match(repo, atom("d-b/a")) is matches
+    assert list(cache.match(repo, atom("d-b/b"))) == [FakePkg("d-b/b-1")]
+    assert repo.queries == 2
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+    cache.match(repo, a)
+    assert repo.queries == 3
@@ -0,0 +1,91 @@
+import io
+import json
+from itertools import count
+
+import pytest
+
+from pkgcore.resolver.profile import ResolverProfile
+
+
+class FakeState:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def backtrack(self, state_pos):
+        del self.plan[state_pos:]
+
+
+class FakeQueryCache:
+    hits = 2
+    misses = 1
+
+    def __len__(self):
+        return 1
+
+
+@pytest.fixture
+def profile():
+    # every clock call advances a second
+    return ResolverProfile(clock=count().__next__)
+
+
+def test_rec_add_atom(profile):
+    def rec_add_atom(atom, stack, dbs, mode="none", drop_cycles=False):
+        if atom == "a":
+            profile.rec_add_atom(rec_add_atom, "b", stack, dbs, mode="rdepend")
+            profile.check_for_cycles(lambda: True)
+            return None
+        return ["failure"]
+
+    assert profile.rec_add_atom(rec_add_atom, "a", [], None) is None
+    a, b = profile.atoms["a"], profile.atoms["b"]
+    assert (a.calls, a.time, a.self_time) == (1, 5, 3)
+    assert (b.calls, b.time, b.self_time) == (1, 1, 1)
+    assert profile.total_time == 5
+    assert profile.counts["cycle_checks"] == 1
+    assert profile.timings["cycle_checks"] == 1
+    assert dict(profile.stacks) == {"a": 3, "a;rdepend:b": 1, "a;cycle-check": 1}
+
+
+def test_counters(profile):
+    state = FakeState([1, 2, 3])
+
+    def rec_add_atom(atom, stack, dbs, mode="none"):
+        profile.notify_trying_choice(lambda *args: None, stack, atom, None)
+        profile.notify_choice_failed(lambda *args: None, stack, atom, None, "msg")
+        # no-op backtracks aren't counted
+        profile.backtrack(state.backtrack, state, 3)
+        profile.backtrack(state.backtrack, state, 1)
+        return profile.query_dbs(lambda dbs, atom: [atom], dbs, atom)
+
+    assert profile.rec_add_atom(rec_add_atom, "a", [], None) == ["a"]
+    assert state.plan == [1]
+    assert profile.counts == {
+        "choices": 1,
+        "failures": 1,
+        "backtracks": 1,
+        "cycle_checks": 0,
+        "repo_queries": 1,
+    }
+    a = profile.atoms["a"]
+    assert (a.choices, a.failures, a.backtracks) == (1, 1, 1)
+
+
+def test_write(profile):
+    profile.rec_add_atom(lambda *args, **kwds: None, "a", [], None)
+
+    f = io.StringIO()
+    profile.write(f)
+    data = json.loads(f.getvalue())
+    assert data["total_time"] == 1
+    assert [x["atom"] for x in data["atoms"]] == ["a"]
+
+    f = io.StringIO()
+    profile.write(f, "folded")
+    assert f.getvalue() == "a 1000000\n"
+
+    profile.query_cache = FakeQueryCache()
+    assert profile.to_dict()["query_cache"] == {"hits": 2, "misses": 1, "entries": 1}
+
+    with pytest.raises(ValueError):
+        profile.write(f, "unknown")
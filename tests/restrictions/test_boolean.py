@@ -82,6 +82,12 @@ class TestAndRestriction(base):
         assert self.kls(false, false, node_type="foo", negate=True).match(None)
         assert not self.kls(true, true, node_type="foo", negate=True).match(None)
 
+    def test_compile_match(self):
+        for args in ((true, true), (false, true, true), (false, false)):
+            for negate in (False, True):
+                inst = self.kls(*args, node_type="foo", negate=negate)
+                assert inst.compile_match()(None) == inst.match(None)
+
     def test_dnf_solutions(self):
         assert self.kls(true, true).dnf_solutions() == [[true, true]]
         assert self.kls(self.kls(true, true), true).dnf_solutions() == [
@@ -125,6 +131,12 @@ class TestOrRestriction(base):
             assert not self.kls(node_type="foo", negate=True, *x).match(None)
         assert self.kls(false, false, node_type="foo", negate=True).match(None)
 
+    def test_compile_match(self):
+        for args in ((true, true), (false, true, true), (false, false)):
+            for negate in (False, True):
+                inst = self.kls(*args, node_type="foo", negate=negate)
+                assert inst.compile_match()(None) == inst.match(None)
+
     def test_dnf_solutions(self):
         assert self.kls(true, true).dnf_solutions() == [[true], [true]]
         assert list(
@@ -75,6 +75,32 @@ class TestPackageRestriction(TestRestriction):
 
         assert not self.kls("foon", AlwaysSelfIntersect).match(foo())
 
+    def test_compile_match(self, caplog):
+        strexact = values.StrExactMatch
+        pkg = SimpleNamespace(
+            category="foon", package="dar", sub=SimpleNamespace(x="y")
+        )
+        for inst in (
+            self.kls("category", strexact("foon")),
+            self.kls("package", strexact("foon")),
+            self.kls("package", strexact("dar"), negate=True),
+            self.kls("sub.x", strexact("y")),
+            self.kls("sub.x", strexact("y"), negate=True),
+            # restriction classes fall back to their match() method
+            self.kls("foon", AlwaysSelfIntersect),
+            self.kls("foon", AlwaysSelfIntersect, negate=True),
+        ):
+            assert inst.compile_match()(pkg) == inst.match(pkg)
+
+        # missing attributes are handled by the generic path
+        caplog.clear()
+        inst = self.kls("missing", strexact("foon"), negate=True)
+        assert inst.compile_match()(pkg)
+        assert not caplog.records
+        inst = self.kls("missing", strexact("foon"), ignore_missing=False)
+        assert not inst.compile_match()(pkg)
+        assert len(caplog.records) == 1
+
     @pytest.mark.parametrize("value", ("val", "val.dar"))
     def test_attr(self, value):
         assert self.kls(value, values.AlwaysTrue).attr == value
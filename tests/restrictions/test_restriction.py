@@ -46,6 +46,18 @@ class TestBase(TestRestriction):
         self.assertForceFalse(false, args)
 
 
+def test_compile_match():
+    true = restriction.AlwaysBool("foo", True)
+    # restrictions without specialized matchers use match() directly
+    assert restriction.compile_match(true) == true.match
+    # as do objects that aren't restrictions, e.g. restriction classes
+    assert restriction.compile_match(SillyBool) is SillyBool.match
+
+    for negate in (False, True):
+        inst = restriction.Negate(restriction.AlwaysBool("foo", negate))
+        assert restriction.compile_match(inst)(None) == inst.match(None)
+
+
 class TestAlwaysBool(TestRestriction):
     bool_kls = staticmethod(partial(restriction.AlwaysBool, "foo"))
 
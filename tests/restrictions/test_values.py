@@ -166,6 +166,14 @@ class TestStrExactMatch(TestRestriction):
             negated=negated,
         )
 
+    @pytest.mark.parametrize("negated", (True, False))
+    def test_compile_match(self, negated):
+        for exact, case_sensitive in (("package", True), ("Package", False)):
+            inst = self.kls(exact, case_sensitive=case_sensitive, negate=negated)
+            matcher = inst.compile_match()
+            for value in ("package", "Package", "other"):
+                assert matcher(value) == inst.match(value)
+
     @pytest.mark.parametrize("negate", (True, False))
     def test__eq__(self, negate):
         assert self.kls("rsync", negate=negate) == self.kls("rsync", negate=negate)
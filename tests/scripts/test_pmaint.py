@@ -266,3 +266,19 @@ class TestRegen(ArgParseMixin):
         options = self.parse("fake", "--threads", "2", domain=make_domain())
         assert isinstance(options.repos[0], util.SimpleTree)
         assert options.threads == 2
+        assert not options.multiprocess
+        assert not options.incremental
+        assert not options.fork_server
+        assert not options.eclass_index
+        assert options.batch_size == 16
+
+        options = self.parse("fake", "--fork-server", domain=make_domain())
+        assert options.fork_server
+
+        options = self.parse("fake", "--eclass-index", domain=make_domain())
+        assert options.eclass_index
+
+        options = self.parse("fake", "-m", "-i", "-t", "4", domain=make_domain())
+        assert options.multiprocess
+        assert options.incremental
+        assert options.threads == 4
@@ -16,6 +16,7 @@ class FakeDomain:
         object.__init__(self)
         self.source_repos = repos
         self.installed_repos = vdb
+        self.repo_threads = 1
 
 
 @configurable(typename="repo")
@@ -0,0 +1,31 @@
+import json
+
+from pkgcore.util.json_file import JsonFile
+
+
+class TestJsonFile:
+    def test_missing(self, tmp_path):
+        f = JsonFile(str(tmp_path / "missing.json"))
+        assert f._data == {}
+        assert f._mtime(f.path) is None
+
+    def test_write(self, tmp_path):
+        path = tmp_path / "cache" / "data.json"
+        f = JsonFile(str(path))
+        f._write({"foo": [1, 2]})
+        assert f._data == {"version": 1, "foo": [1, 2]}
+        assert JsonFile(str(path))._data == {"version": 1, "foo": [1, 2]}
+        assert f._mtime(str(path)) == path.stat().st_mtime_ns
+
+    def test_version(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps({"version": 0, "foo": 1}))
+        assert JsonFile(str(path))._data == {}
+        path.write_text(json.dumps([1]))
+        assert JsonFile(str(path))._data == {}
+
+    def test_corrupt(self, tmp_path, caplog):
+        path = tmp_path / "data.json"
+        path.write_text("{")
+        assert JsonFile(str(path))._data == {}
+        assert "failed loading json file" in caplog.text
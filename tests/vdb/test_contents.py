@@ -0,0 +1,144 @@
+import pytest
+from snakeoil.data_source import bytes_data_source
+
+from pkgcore.fs import fs
+from pkgcore.fs.contents import contentsSet
+from pkgcore.vdb.contents import ContentsFile, iter_contents, iter_paths
+
+CONTENTS = """\
+dir /usr
+dir /usr/bin
+obj /usr/bin/my file d41d8cd98f00b204e9800998ecf8427e 2
+sym /usr/bin/foo -> my file 1
+fif /run/foo
+"""
+
+
+@pytest.fixture
+def contents(tmp_path):
+    path = tmp_path / "CONTENTS"
+    path.write_text(CONTENTS)
+    return str(path)
+
+
+@pytest.mark.parametrize("use_mmap", (False, True))
+def test_iter_paths(contents, use_mmap):
+    assert list(iter_paths(contents, use_mmap)) == [
+        "/usr",
+        "/usr/bin",
+        "/usr/bin/my file",
+        "/usr/bin/foo",
+        "/run/foo",
+    ]
+
+
+@pytest.mark.parametrize("use_mmap", (False, True))
+def test_iter_contents(contents, use_mmap):
+    entries = list(iter_contents(contents, use_mmap))
+    assert [x.location for x in entries] == list(iter_paths(contents))
+    assert entries[2].is_reg
+    assert entries[2].chksums == {"md5": 0xD41D8CD98F00B204E9800998ECF8427E}
+    assert entries[2].mtime == 2
+    assert entries[3].is_sym
+    assert entries[3].target == "my file"
+    assert entries[4].is_fifo
+
+
+def test_iter_empty(tmp_path):
+    (path := tmp_path / "CONTENTS").touch()
+    assert list(iter_contents(str(path), use_mmap=True)) == []
+
+
+class TestContentsFile:
+    def test_lazy(self, contents):
+        cset = ContentsFile(contents, mutable=True)
+        assert len(cset) == 5
+        assert "/usr/bin/my file" in cset
+        assert "/usr/bin//foo" in cset
+        assert fs.fsDir("/usr", strict=False) in cset
+        assert "/usr/lib" not in cset
+        assert len(cset.dirs()) == 2
+        assert not cset._loaded
+
+        # lookups of specific entries parse the whole file
+        assert cset["/usr/bin/foo"].target == "my file"
+        assert cset._loaded
+        assert len(cset) == 5
+        assert "/usr/bin/my file" in cset
+
+    def test_modify(self, contents):
+        cset = ContentsFile(contents, mutable=True)
+        cset.remove("/run/foo")
+        assert cset._loaded
+        assert sorted(x.location for x in cset) == [
+            "/usr",
+            "/usr/bin",
+            "/usr/bin/foo",
+            "/usr/bin/my file",
+        ]
+
+    def test_clone(self, contents):
+        cset = ContentsFile(contents)
+        assert len(cset.clone(empty=True)) == 0
+        assert not cset._loaded
+        clone = cset.clone()
+        assert clone.mutable
+        clone.discard("/run/foo")
+        assert len(clone) == 4
+        assert len(cset) == 5
+        # clones are snapshots, parsing the file only once
+        assert cset._loaded
+
+        # loaded files are cloned from their parsed entries
+        cset = ContentsFile(contents, mutable=True)
+        cset.discard("/run/foo")
+        assert len(cset.clone()) == 4
+        with open(contents, "w"):
+            pass
+        assert len(cset.clone()) == 4
+
+    def test_intersection(self, contents):
+        cset = ContentsFile(contents)
+        other = [fs.fsDir("/usr", strict=False), fs.fsDir("/opt", strict=False)]
+        assert [x.location for x in cset.intersection(other)] == ["/usr"]
+        assert not cset._loaded
+
+    def test_set_ops(self, contents):
+        cset = ContentsFile(contents)
+        other = contentsSet([fs.fsDir("/usr", strict=False)])
+        assert sorted(x.location for x in cset.difference(other)) == [
+            "/run/foo",
+            "/usr/bin",
+            "/usr/bin/foo",
+            "/usr/bin/my file",
+        ]
+        assert cset.issuperset(other)
+        assert not cset.isdisjoint(other)
+        assert not cset._loaded
+        other.update(cset)
+        assert len(other) == 5
+        assert not cset._loaded
+
+    def test_flush(self, contents):
+        cset = ContentsFile(contents, mutable=True)
+        cset.discard("/run/foo")
+        cset.flush()
+        assert list(iter_paths(contents)) == [
+            "/usr",
+            "/usr/bin",
+            "/usr/bin/foo",
+            "/usr/bin/my file",
+        ]
+
+        # unparsed data sources are read before being truncated
+        source = bytes_data_source(b"dir /usr\n", mutable=True)
+        ContentsFile(source, mutable=True).flush()
+        assert source.bytes_fileobj().read() == b"dir /usr\n"
+
+    def test_create(self, tmp_path):
+        path = str(tmp_path / "CONTENTS")
+        cset = ContentsFile(path, mutable=True, create=True)
+        assert len(cset) == 0
+        cset.add(fs.fsDir("/usr", strict=False))
+        cset.flush()
+        assert list(ContentsFile(path)) == [fs.fsDir("/usr", strict=False)]
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+from pkgcore.vdb.index import VdbIndex
+from pkgcore.vdb.ondisk import tree
+
+
+@pytest.fixture
+def vdb(tmp_path):
+    for cpv, metadata in (
+        ("dev-libs/foo-1.0", {"SLOT": "0\n", "USE": "a b\n", "repository": "gentoo"}),
+        ("dev-libs/foo-2-r1", {"SLOT": "2\n", "RDEPEND": "dev-libs/bar\n"}),
+        ("sys-apps/bar-3", {"SLOT": "0\n"}),
+    ):
+        (pkgdir := tmp_path / "vdb" / cpv).mkdir(parents=True)
+        for key, value in metadata.items():
+            (pkgdir / key).write_text(value)
+    # in-progress merges are ignored
+    (tmp_path / "vdb" / "sys-apps" / ".tmp.bar-4").mkdir()
+    return tmp_path / "vdb"
+
+
+class TestVdbIndex:
+    def test_missing(self, vdb, tmp_path):
+        index = VdbIndex(str(vdb), str(tmp_path / "cache" / "index.json"))
+        assert index.writable
+        assert not index.fresh
+        assert index.categories() is None
+        assert index.packages("dev-libs") is None
+        assert index.metadata("dev-libs", "foo-1.0") is None
+
+    def test_update(self, vdb, tmp_path):
+        path = str(tmp_path / "cache" / "index.json")
+        assert VdbIndex(str(vdb), path).update()
+        index = VdbIndex(str(vdb), path)
+        assert index.fresh
+        assert sorted(index.categories()) == ["dev-libs", "sys-apps"]
+        assert index.packages("dev-libs") == {"foo": ["1.0", "2-r1"]}
+        assert index.packages("sys-apps") == {"bar": ["3"]}
+        assert index.metadata("dev-libs", "foo-1.0") == {
+            "SLOT": "0",
+            "USE": "a b",
+            "repository": "gentoo",
+        }
+        assert index.metadata("dev-libs", "foo-2-r1") == {
+            "SLOT": "2",
+            "RDEPEND": "dev-libs/bar",
+        }
+
+        # indexes for other vdbs are ignored
+        assert not VdbIndex(str(tmp_path), path).categories()
+
+    def test_stale(self, vdb, tmp_path):
+        index = VdbIndex(str(vdb), str(tmp_path / "index.json"))
+        index.update()
+        os.utime(vdb / "dev-libs", ns=(0, 0))
+        os.utime(vdb / "dev-libs" / "foo-1.0", ns=(0, 0))
+        assert index.packages("dev-libs") is None
+        assert index.metadata("dev-libs", "foo-1.0") is None
+        assert index.metadata("dev-libs", "foo-2-r1") is not None
+        assert index.packages("sys-apps") == {"bar": ["3"]}
+
+        # stale entries are rescanned
+        (vdb / "dev-libs" / "foo-1.0" / "SLOT").write_text("1\n")
+        os.utime(vdb / "dev-libs" / "foo-1.0", ns=(0, 0))
+        index.update()
+        assert index.packages("dev-libs") == {"foo": ["1.0", "2-r1"]}
+        assert index.metadata("dev-libs", "foo-1.0")["SLOT"] == "1"
+
+    def test_update_categories(self, vdb, tmp_path, monkeypatch):
+        index = VdbIndex(str(vdb), str(tmp_path / "index.json"))
+        # partial updates of missing indexes leave the category listing stale
+        assert index.update(categories=["dev-libs"])
+        assert index.categories() is None
+        assert index.packages("dev-libs") == {"foo": ["1.0", "2-r1"]}
+        assert index.packages("sys-apps") is None
+        assert index.update(categories=["sys-apps"])
+        assert sorted(index.categories()) == ["dev-libs", "sys-apps"]
+
+        (vdb / "sys-apps" / "baz-1").mkdir()
+        (vdb / "sys-apps" / "baz-1" / "SLOT").write_text("1\n")
+        (vdb / "app-misc" / "qux-1").mkdir(parents=True)
+        read_metadata = index._read_metadata
+        read = []
+
+        def _read_metadata(path):
+            read.append(os.path.basename(path))
+            return read_metadata(path)
+
+        monkeypatch.setattr(index, "_read_metadata", _read_metadata)
+        assert index.update(categories=["sys-apps"])
+        # only new packages are read
+        assert read == ["baz-1"]
+        assert index.packages("sys-apps") == {"bar": ["3"], "baz": ["1"]}
+        assert index.packages("dev-libs") == {"foo": ["1.0", "2-r1"]}
+        # and unindexed categories leave the listing stale
+        assert index.categories() is None
+        assert index.update(categories=["app-misc"])
+        assert sorted(index.categories()) == ["app-misc", "dev-libs", "sys-apps"]
+
+    def test_tree(self, vdb, tmp_path):
+        repo = tree(str(vdb), cache_location=str(tmp_path / "cache"))
+        assert sorted(x.cpvstr for x in repo) == [
+            "dev-libs/foo-1.0",
+            "dev-libs/foo-2-r1",
+            "sys-apps/bar-3",
+        ]
+        # writable indexes are refreshed when loading the vdb
+        assert repo.index.fresh
+        pkg = next(x for x in repo if x.cpvstr == "dev-libs/foo-2-r1")
+        assert repo._get_metadata(pkg)["fullslot"] == "2"
+
+        # stale entries fall back to the vdb without rescanning it
+        (vdb / "dev-libs" / "foo-3").mkdir()
+        repo = tree(str(vdb), cache_location=str(tmp_path / "cache"))
+        assert len(repo) == 4
+        assert repo.index.packages("dev-libs") is None
+
+        # while merges and unmerges update the index
+        pkg = next(x for x in repo if x.cpvstr == "dev-libs/foo-3")
+        repo.notify_add_package(pkg)
+        assert repo.index.packages("dev-libs") == {"foo": ["1.0", "2-r1", "3"]}
+        (vdb / "dev-libs" / "foo-3").rmdir()
+        repo.notify_remove_package(pkg)
+        assert repo.index.packages("dev-libs") == {"foo": ["1.0", "2-r1"]}
+
+        # indexing is disabled along with the cache
+        repo = tree(str(vdb), disable_cache=True)
+        assert repo.index is None
+        assert sorted(x.cpvstr for x in repo) == [
+            "dev-libs/foo-1.0",
+            "dev-libs/foo-2-r1",
+            "sys-apps/bar-3",
+        ]
@@ -0,0 +1,102 @@
+import os
+from contextlib import closing
+
+import pytest
+
+from pkgcore.vdb.owners import OwnersIndex
+
+
+@pytest.fixture
+def vdb(tmp_path):
+    for cpv, contents in (
+        ("dev-libs/foo-1.0", ["dir /usr", "obj /usr/bin/foo 0f 1", "dir /usr/bin"]),
+        ("dev-libs/bar-2", ["dir /usr", "sym /usr/bin/bar -> foo 1"]),
+        ("sys-apps/baz-3", ["obj /usr/bin/my file d4 2", "fif /run/baz"]),
+    ):
+        (pkgdir := tmp_path / "vdb" / cpv).mkdir(parents=True)
+        (pkgdir / "CONTENTS").write_text("\n".join(contents) + "\n")
+    # packages lacking a CONTENTS file own nothing
+    (tmp_path / "vdb" / "virtual" / "empty-0").mkdir(parents=True)
+    return tmp_path / "vdb"
+
+
+class TestOwnersIndex:
+    def test_owners(self, vdb, tmp_path):
+        index = OwnersIndex(str(vdb), str(tmp_path / "cache" / "owners.sqlite"))
+        assert index.writable
+        owners = index.owners(["/usr", "/usr/bin/bar", "/usr/bin/my file", "/nope"])
+        assert owners == {
+            "/usr": {"dev-libs/foo-1.0", "dev-libs/bar-2"},
+            "/usr/bin/bar": {"dev-libs/bar-2"},
+            "/usr/bin/my file": {"sys-apps/baz-3"},
+        }
+        assert os.path.exists(index.path)
+        # no changes
+        assert not index.update()
+        assert index.owners([]) == {}
+        assert index.owners(["/usr/bin//foo"]) == {"/usr/bin/foo": {"dev-libs/foo-1.0"}}
+
+    def test_update(self, vdb, tmp_path):
+        index = OwnersIndex(str(vdb), str(tmp_path / "owners.sqlite"))
+        assert index.update()
+
+        # unmerged packages are dropped
+        (vdb / "dev-libs" / "bar-2" / "CONTENTS").unlink()
+        (vdb / "dev-libs" / "bar-2").rmdir()
+        # modified packages are rescanned
+        contents = vdb / "dev-libs" / "foo-1.0" / "CONTENTS"
+        contents.write_text("obj /usr/bin/foo2 0f 1\n")
+        os.utime(contents, ns=(0, 0))
+        assert index.update()
+        assert index.owners(["/usr", "/usr/bin/foo", "/usr/bin/foo2"]) == {
+            "/usr/bin/foo2": {"dev-libs/foo-1.0"},
+        }
+
+    def test_update_packages(self, vdb, tmp_path, monkeypatch):
+        index = OwnersIndex(str(vdb), str(tmp_path / "owners.sqlite"))
+        assert index.update()
+        (vdb / "dev-libs" / "bar-2" / "CONTENTS").unlink()
+        (vdb / "dev-libs" / "bar-2").rmdir()
+        (vdb / "sys-apps" / "new-1").mkdir()
+        (vdb / "sys-apps" / "new-1" / "CONTENTS").write_text("dir /usr\n")
+        # only the given packages are rescanned
+        monkeypatch.setattr(OwnersIndex, "_scan", None)
+        assert index.update_packages(["dev-libs/bar-2", "sys-apps/new-1"])
+        assert not index.update_packages(["dev-libs/bar-2", "sys-apps/new-1"])
+        with closing(index._connect()) as conn:
+            assert sorted(index._indexed(conn)) == [
+                "dev-libs/foo-1.0",
+                "sys-apps/baz-3",
+                "sys-apps/new-1",
+                "virtual/empty-0",
+            ]
+
+    def test_readonly(self, vdb, tmp_path, monkeypatch):
+        path = tmp_path / "owners.sqlite"
+        OwnersIndex(str(vdb), str(path)).update()
+        contents = vdb / "dev-libs" / "foo-1.0" / "CONTENTS"
+        contents.write_text("obj /usr/bin/foo2 0f 1\n")
+        os.utime(contents, ns=(0, 0))
+        (vdb / "sys-apps" / "new-1").mkdir()
+        (vdb / "sys-apps" / "new-1" / "CONTENTS").write_text("dir /usr\n")
+
+        # stale and unindexed packages are scanned directly
+        monkeypatch.setattr(OwnersIndex, "writable", False)
+        index = OwnersIndex(str(vdb), str(path))
+        assert index.owners(["/usr", "/usr/bin/foo2"]) == {
+            "/usr": {"dev-libs/bar-2", "sys-apps/new-1"},
+            "/usr/bin/foo2": {"dev-libs/foo-1.0"},
+        }
+
+    def test_other_location(self, vdb, tmp_path):
+        path = str(tmp_path / "owners.sqlite")
+        OwnersIndex(str(vdb), path).update()
+        # indexes for other vdbs are ignored
+        index = OwnersIndex(str(tmp_path), path)
+        assert index._connect() is None
+        assert index.owners(["/usr"]) == {}
+
+    def test_missing_vdb(self, tmp_path):
+        index = OwnersIndex(str(tmp_path / "vdb"), str(tmp_path / "owners.sqlite"))
+        assert index.owners(["/usr"]) == {}
+        assert not index.update()